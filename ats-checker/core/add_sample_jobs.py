@@ -119,5 +119,6 @@ for job_data in jobs_data:
     else:
         print(f"- Already exists: {job.job_title}")
 
+print("\nRun `python manage.py refresh_job_requirements` to extract the required skills for new jobs.")
 print(f"\nTotal job positions: {JobDesCription.objects.count()}")
 print("Done!")
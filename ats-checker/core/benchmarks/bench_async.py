@@ -0,0 +1,173 @@
+"""Load comparison of one worker process serving /api/resume/ through WSGI (sync view) and ASGI (async view).
+
+Each mode runs in its own subprocess against its own fake LLM and throwaway SQLite database,
+with the Django application driven in-process through httpx's WSGI and ASGI transports:
+
+- sync: AnalyzeResmeAPI behind get_wsgi_application(), handling --threads requests at a time
+  (1 is a gunicorn sync worker, more is a gthread worker);
+- async: analyze_resume_async behind get_asgi_application() on one event loop, as under a
+  uvicorn worker.
+
+--concurrency clients keep requests outstanding in both modes; requests beyond what the worker
+can take wait in its queue, and that wait is part of the reported latency. Parsing PDFs is CPU
+work that no event loop can overlap on one core; --cached-text stores every resume's text up front
+so the run measures only how well each mode overlaps waiting on the LLM.
+
+Usage: python benchmarks/bench_async.py [--requests 48] [--concurrency 32] [--threads 1]
+                                        [--llm-latency 0.5] [--pdf-pool thread] [--cached-text]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_suite import JOB_DESCRIPTION, print_table, summarize
+from benchmarks.corpus import make_resume_pdf
+from benchmarks.fake_llm import start_fake_llm
+
+
+def setup(mode, args, workdir, llm_url):
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'core.settings',
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+        'GROQ_BASE_URL': llm_url,
+        'GROQ_API_KEY': 'fake',
+        'RESUME_STORAGE': 'none',
+        'DEBUG': 'False',
+        'ASYNC_ANALYZE_VIEW': str(mode == 'async'),
+        'ASYNC_PDF_POOL': args.pdf_pool,
+        # The governor's limit would otherwise cap both modes at the same concurrency
+        'LLM_INITIAL_CONCURRENCY': str(args.concurrency),
+        'LLM_MAX_CONCURRENCY': str(max(args.concurrency, 32)),
+    })
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    logging.disable(logging.INFO)
+    warnings.filterwarnings('ignore', message='No directory at')
+    call_command('migrate', verbosity=0)
+    settings.ALLOWED_HOSTS = ['*']
+    from resumechecker.models import JobDesCription
+    return JobDesCription.objects.create(job_title='Backend engineer', job_description=JOB_DESCRIPTION).id
+
+
+def check(response):
+    body = response.json()
+    return response.status_code == 200 and body.get('status') and body['data'].get('rank', 0) > 0
+
+
+def run_sync(pdfs, job_id, args):
+    import httpx
+    from django.core.wsgi import get_wsgi_application
+
+    app = get_wsgi_application()
+    local = threading.local()
+    worker = ThreadPoolExecutor(max_workers=args.threads)  # the worker's request threads
+
+    def handle(data):
+        if not hasattr(local, 'client'):
+            local.client = httpx.Client(transport=httpx.WSGITransport(app=app), base_url='http://bench')
+        response = local.client.post('/api/resume/', data={'job_description': job_id},
+                                     files={'resume': ('resume.pdf', data, 'application/pdf')})
+        return check(response)
+
+    def client(data):
+        t = time.perf_counter()
+        ok = worker.submit(handle, data).result()
+        return time.perf_counter() - t, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+        results = list(clients.map(client, pdfs))
+    wall = time.perf_counter() - start
+    worker.shutdown()
+    return results, wall
+
+
+def run_async(pdfs, job_id, args):
+    import httpx
+    from django.core.asgi import get_asgi_application
+
+    app = get_asgi_application()
+
+    async def main():
+        outstanding = asyncio.Semaphore(args.concurrency)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench',
+                                     timeout=None) as http:
+            async def client(data):
+                async with outstanding:
+                    t = time.perf_counter()
+                    response = await http.post('/api/resume/', data={'job_description': job_id},
+                                               files={'resume': ('resume.pdf', data, 'application/pdf')})
+                    return time.perf_counter() - t, check(response)
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(client(data) for data in pdfs))
+            return results, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def run_mode(mode, args):
+    workdir = tempfile.mkdtemp(prefix=f'ats-bench-{mode}-')
+    server, llm_url = start_fake_llm(latency=args.llm_latency, jitter=args.llm_jitter)
+    try:
+        job_id = setup(mode, args, workdir, llm_url)
+        pdfs = [make_resume_pdf(seed)[0] for seed in range(20_000, 20_000 + args.requests)]
+        if args.cached_text:
+            from resumechecker.analyzer import compute_content_hash
+            from resumechecker.models import ResumeText
+            from resumechecker.pdf import extract_text
+            ResumeText.objects.bulk_create(ResumeText(content_hash=compute_content_hash(data), text=extract_text(data))
+                                           for data in pdfs)
+        results, wall = (run_async if mode == 'async' else run_sync)(pdfs, job_id, args)
+        summary = summarize([elapsed for elapsed, _ in results], wall)
+        summary['errors'] = sum(1 for _, ok in results if not ok)
+        summary['max_llm_in_flight'] = server.config['max_in_flight']
+        return summary
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--concurrency', type=int, default=32, help='outstanding client requests')
+    parser.add_argument('--threads', type=int, default=1, help='request threads of the sync worker')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='fake LLM seconds per completion')
+    parser.add_argument('--llm-jitter', type=float, default=0.05)
+    parser.add_argument('--pdf-pool', default='thread', choices=['thread', 'process'], help='ASYNC_PDF_POOL')
+    parser.add_argument('--cached-text', action='store_true', help='skip PDF parsing: resume texts are cached')
+    parser.add_argument('--mode', choices=['sync', 'async'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+
+    # Settings and URLs are fixed at django.setup(), so each mode gets a fresh interpreter
+    rows = {}
+    for mode in ('sync', 'async'):
+        output = subprocess.run([sys.executable, __file__, '--mode', mode, *sys.argv[1:]],
+                                check=True, capture_output=True, text=True).stdout
+        rows[f'{mode}' + (f' x{args.threads}' if mode == 'sync' else '')] = json.loads(output.splitlines()[-1])
+    print_table(f'/api/resume/, one worker, {args.concurrency} concurrent clients, '
+                f'fake LLM {args.llm_latency}s', rows)
+    print('\n  most LLM calls in flight: ' + ', '.join(f"{name} {row['max_llm_in_flight']}" for name, row in rows.items()))
+
+
+if __name__ == '__main__':
+    main()
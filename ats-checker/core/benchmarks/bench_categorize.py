@@ -0,0 +1,84 @@
+"""Compare the original substring-scanning categorize_projects with the compiled matcher.
+
+Usage: python benchmarks/bench_categorize.py [num_candidates]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resumechecker.categories import ProjectCategorizer, categorize_projects_batch
+
+# The implementation that categorize_projects replaced, kept here as the baseline
+KEYWORDS_MAP = {
+    'AI/ML': ['ai', 'ml', 'machine learning', 'deep learning', 'neural', 'nlp', 'computer vision', 'tensorflow', 'pytorch'],
+    'Web Development': ['web', 'website', 'frontend', 'backend', 'react', 'angular', 'vue', 'django', 'flask', 'node'],
+    'Mobile': ['mobile', 'android', 'ios', 'app', 'flutter', 'react native'],
+    'Cloud': ['cloud', 'aws', 'azure', 'gcp', 'kubernetes', 'docker'],
+    'Data Science': ['data', 'analytics', 'visualization', 'pandas', 'numpy', 'sql', 'database'],
+    'DevOps': ['devops', 'ci/cd', 'jenkins', 'deployment', 'infrastructure']
+}
+
+
+def legacy_categorize_projects(projects, keywords_map=KEYWORDS_MAP):
+    categories = set()
+    for project in projects:
+        project_lower = project.lower()
+        for category, keywords in keywords_map.items():
+            if any(keyword in project_lower for keyword in keywords):
+                categories.add(category)
+    return list(categories) if categories else ['General Software Development']
+
+
+WORDS = ['built', 'a', 'scalable', 'platform', 'for', 'real-time', 'maintained', 'application', 'using', 'with',
+         'service', 'students', 'tracking', 'customer', 'portal', 'system', 'automated', 'report', 'engine',
+         'React', 'Django', 'AWS', 'Docker', 'Pandas', 'SQL', 'TensorFlow', 'CI/CD', 'Flutter', 'NLP', 'dashboard']
+
+
+def make_corpus(n, seed=42):
+    rng = random.Random(seed)
+    return [[" ".join(rng.choices(WORDS, k=rng.randint(6, 25))) for _ in range(rng.randint(1, 6))] for _ in range(n)]
+
+
+def make_large_taxonomy(categories=30, keywords=30, seed=7):
+    """The real taxonomy plus synthetic categories, to show how each approach scales with keywords."""
+    rng = random.Random(seed)
+    taxonomy = {category: list(words) for category, words in KEYWORDS_MAP.items()}
+    for i in range(categories):
+        taxonomy[f'Category {i}'] = ["".join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 9)))
+                                     for _ in range(keywords)]
+    return taxonomy
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    corpus = make_corpus(n)
+    projects = sum(len(p) for p in corpus)
+
+    legacy_time, legacy = timed(lambda: [legacy_categorize_projects(p) for p in corpus])
+    compiled_time, compiled = timed(lambda: categorize_projects_batch(corpus))
+    changed = sum(set(a) != set(b) for a, b in zip(legacy, compiled))
+
+    print(f"Candidates:  {n} ({projects} projects)")
+    print(f"Substring:   {legacy_time * 1000:8.1f} ms")
+    print(f"Compiled:    {compiled_time * 1000:8.1f} ms")
+    print(f"Speedup:     {legacy_time / compiled_time:8.1f}x")
+    print(f"Changed:     {changed} candidates ({changed / n:.1%}) now skip substring hits such as 'ai' in 'maintained'")
+
+    taxonomy = make_large_taxonomy()
+    keyword_count = sum(len(k) for k in taxonomy.values())
+    categorizer = ProjectCategorizer(taxonomy)
+    legacy_time, _ = timed(lambda: [legacy_categorize_projects(p, taxonomy) for p in corpus])
+    compiled_time, _ = timed(lambda: [categorizer.categorize(p) for p in corpus])
+    print(f"\nWith {keyword_count} keywords in {len(taxonomy)} categories:")
+    print(f"Substring:   {legacy_time * 1000:8.1f} ms")
+    print(f"Compiled:    {compiled_time * 1000:8.1f} ms")
+    print(f"Speedup:     {legacy_time / compiled_time:8.1f}x")
@@ -0,0 +1,59 @@
+"""Compare calculate_ats_score in a loop against the vectorized calculate_ats_scores.
+
+Usage: python benchmarks/bench_scoring.py [num_candidates]
+"""
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+django.setup()
+
+from resumechecker.analyzer import calculate_ats_score
+from resumechecker.scoring import calculate_ats_scores
+
+SKILLS = ['Python', 'Django', 'React', 'SQL', 'AWS', 'Docker', 'Java', 'Go', 'Kubernetes', 'Pandas',
+          'NumPy', 'TensorFlow', 'PyTorch', 'Git', 'Linux', 'PostgreSQL', 'Redis', 'GraphQL', 'Node.js', 'C++']
+EDUCATION = ['', 'PhD in Physics', 'MSc Data Science', 'MBA', 'B.Tech CSE', 'Bachelor of Arts', 'Diploma']
+
+
+def make_candidates(n, seed=42):
+    rng = random.Random(seed)
+    return [{
+        'job_required_skills': rng.sample(SKILLS, rng.randint(3, 10)),
+        'job_required_experience': rng.choice([0, 1, 2, 3, 5, 8]),
+        'resume_skills': rng.sample(SKILLS, rng.randint(2, 15)),
+        'resume_experience': rng.uniform(0, 12),
+        'resume_education': rng.choice(EDUCATION),
+        'resume_projects': ['project'] * rng.randint(0, 6),
+    } for _ in range(n)]
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    candidates = make_candidates(n)
+    # The scalar scorer logs at DEBUG for every call; silence it so only the scoring is timed
+    logging.disable(logging.DEBUG)
+
+    scalar_time, scalar = best_of(lambda: [calculate_ats_score(d) for d in candidates])
+    batch_time, batch = best_of(lambda: calculate_ats_scores(candidates))
+    assert batch.tolist() == scalar, "batch scores differ from calculate_ats_score"
+
+    print(f"Candidates:   {n}")
+    print(f"Scalar loop:  {scalar_time * 1000:8.1f} ms")
+    print(f"Vectorized:   {batch_time * 1000:8.1f} ms")
+    print(f"Speedup:      {scalar_time / batch_time:8.1f}x")
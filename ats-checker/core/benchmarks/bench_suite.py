@@ -0,0 +1,220 @@
+"""Offline benchmark suite: per-stage functions and the full /api/resume/ endpoint against a fake LLM.
+
+Everything runs locally: resumes come from benchmarks/corpus.py, the database is a throwaway
+SQLite file and Groq is replaced by benchmarks/fake_llm.py. Each run prints throughput and
+p50/p95/p99 latencies; --save-baseline stores them under benchmarks/baselines/, and later runs
+compare against the stored baseline and exit non-zero with --check when a figure regresses by
+more than --tolerance.
+
+Usage: python benchmarks/bench_suite.py [--resumes 30] [--requests 40] [--concurrency 1,4,8]
+                                        [--llm-latency 0.3] [--llm-url URL] [--stages-only]
+                                        [--baseline default] [--save-baseline] [--check]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import SKILLS, make_resume_pdf
+from benchmarks.fake_llm import canned_extraction, start_fake_llm
+
+# Latency changes smaller than this are timer noise, whatever their relative size
+NOISE_FLOOR_MS = 0.5
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+JOB_DESCRIPTION = ("Backend engineer with 3 years of experience. Requirements: "
+                   + ", ".join(SKILLS[:8]) + ". Nice to have: " + ", ".join(SKILLS[8:12]) + ".")
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers (q in 0-100)."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, wall):
+    return {
+        'count': len(latencies),
+        'throughput': round(len(latencies) / wall, 2) if wall else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def time_calls(fn, items):
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_stages(corpus):
+    from django.test import override_settings
+    from resumechecker.analyzer import calculate_ats_score
+    from resumechecker.categories import categorize_projects
+    from resumechecker.compaction import compact_text
+    from resumechecker.local_engine import extract_resume_locally
+    from resumechecker.pdf import extract_text
+    from resumechecker.skills import find_skills
+
+    texts = [extract_text(data) for data, _ in corpus]
+    extractions = [{**canned_extraction(f"Resume:\n{text}"), 'job_required_skills': SKILLS[:8],
+                    'job_required_experience': 3} for text in texts]
+    extract_resume_locally(texts[0])  # loads the spaCy pipeline outside the timings
+    return {
+        'extract': time_calls(lambda item: extract_text(item[0]), corpus),
+        'compact': time_calls(lambda text: compact_text(text, 2500), texts),
+        'find_skills': time_calls(find_skills, texts),
+        'local_extract': time_calls(extract_resume_locally, texts),
+        'score': time_calls(calculate_ats_score, extractions),
+        'semantic_score': override_settings(SKILL_MATCHING='semantic')(time_calls)(calculate_ats_score, extractions),
+        'categorize': time_calls(lambda data: categorize_projects(data['resume_projects']), extractions),
+    }
+
+
+def bench_endpoint(corpus, concurrency, job_id):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client
+
+    local = threading.local()
+
+    def post(item):
+        data, _ = item
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        upload = SimpleUploadedFile('resume.pdf', data, content_type='application/pdf')
+        t = time.perf_counter()
+        response = local.client.post('/api/resume/', {'resume': upload, 'job_description': job_id})
+        elapsed = time.perf_counter() - t
+        body = response.json()
+        return elapsed, response.status_code == 200 and body.get('status') and body['data'].get('rank', 0) > 0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(post, corpus))
+    summary = summarize([elapsed for elapsed, _ in results], time.perf_counter() - start)
+    summary['errors'] = sum(1 for _, ok in results if not ok)
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """Yield (name, metric, baseline, current, regressed) for every figure in both runs."""
+    for section in ('stages', 'endpoint'):
+        for name, current in results.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous:
+                continue
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput'):
+                if metric not in previous or not previous[metric]:
+                    continue
+                ratio = current[metric] / previous[metric]
+                if metric == 'throughput':
+                    regressed = ratio < 1 - tolerance
+                else:
+                    regressed = ratio > 1 + tolerance and current[metric] - previous[metric] > NOISE_FLOOR_MS
+                yield f'{section}/{name}', metric, previous[metric], current[metric], regressed
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"  {'':<14}{'n':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, s in rows.items():
+        errors = f"   errors: {s['errors']}" if s.get('errors') else ''
+        print(f"  {name:<14}{s['count']:>6}{s['throughput']:>10}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=30, help='resumes for the stage benchmarks')
+    parser.add_argument('--requests', type=int, default=40, help='requests per concurrency level')
+    parser.add_argument('--concurrency', default='1,4,8', help='comma-separated concurrency levels')
+    parser.add_argument('--max-pages', type=int, default=3)
+    parser.add_argument('--llm-latency', type=float, default=0.3, help='fake LLM seconds per completion')
+    parser.add_argument('--llm-jitter', type=float, default=0.05)
+    parser.add_argument('--llm-url', help='use an already running fake or real endpoint instead')
+    parser.add_argument('--stages-only', action='store_true')
+    parser.add_argument('--baseline', default='default', help='baseline name under benchmarks/baselines/')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help='exit 1 when a figure regresses')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative change before flagging')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ats-bench-')
+    server = None
+    if args.llm_url:
+        llm_url = args.llm_url
+    else:
+        server, llm_url = start_fake_llm(latency=args.llm_latency, jitter=args.llm_jitter)
+    # Settings are read at setup, so everything that points away from real services goes in first
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'core.settings',
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}",
+        'GROQ_BASE_URL': llm_url,
+        'GROQ_API_KEY': os.environ.get('GROQ_API_KEY', 'fake') if args.llm_url else 'fake',
+        'RESUME_STORAGE': 'none',
+        'DEBUG': 'False',
+    })
+    import django
+    django.setup()
+    from django.core.management import call_command
+    logging.disable(logging.INFO)
+    warnings.filterwarnings('ignore', message='No directory at')  # whitenoise, collectstatic not run
+    call_command('migrate', verbosity=0)
+
+    results = {'config': {k: v for k, v in vars(args).items() if k not in ('save_baseline', 'check', 'baseline')}}
+    corpus = [make_resume_pdf(seed, pages=seed % args.max_pages + 1) for seed in range(args.resumes)]
+    results['stages'] = bench_stages(corpus)
+    print_table('Stages (per call)', results['stages'])
+
+    if not args.stages_only:
+        from django.conf import settings
+        from resumechecker.models import JobDesCription
+        settings.ALLOWED_HOSTS = ['*']
+        job = JobDesCription.objects.create(job_title='Backend engineer', job_description=JOB_DESCRIPTION)
+        results['endpoint'] = {}
+        for level, concurrency in enumerate(int(c) for c in args.concurrency.split(',')):
+            # Fresh resumes per level so no level is served from the text and extraction caches
+            seeds = range(10_000 + level * args.requests, 10_000 + (level + 1) * args.requests)
+            requests = [make_resume_pdf(seed, pages=seed % args.max_pages + 1) for seed in seeds]
+            results['endpoint'][f'c={concurrency}'] = bench_endpoint(requests, concurrency, job.id)
+        print_table(f'/api/resume/ (fake LLM at {llm_url})', results['endpoint'])
+
+    if server is not None:
+        server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    path = os.path.join(BASELINE_DIR, f'{args.baseline}.json')
+    regressions = []
+    if os.path.exists(path) and not args.save_baseline:
+        with open(path) as f:
+            baseline = json.load(f)
+        print(f"\nAgainst baseline {path}")
+        for name, metric, before, after, regressed in compare(results, baseline, args.tolerance):
+            flag = '  REGRESSION' if regressed else ''
+            print(f"  {name:<22}{metric:<12}{before:>10}{after:>10}{after / before - 1:>+9.0%}{flag}")
+            if regressed:
+                regressions.append((name, metric))
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {path}")
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
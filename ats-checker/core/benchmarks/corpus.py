@@ -0,0 +1,105 @@
+"""Synthetic resume PDFs for benchmarks and tests, written without any PDF library."""
+import os
+import random
+
+SKILLS = ['Python', 'Django', 'React', 'JavaScript', 'TypeScript', 'SQL', 'PostgreSQL', 'AWS', 'Docker',
+          'Kubernetes', 'Java', 'Spring Boot', 'Pandas', 'NumPy', 'TensorFlow', 'PyTorch', 'Git', 'Linux',
+          'Redis', 'GraphQL', 'Node.js', 'C++', 'Tableau', 'Power BI', 'Machine Learning', 'FastAPI']
+DEGREES = ['B.Tech in Computer Science', 'Bachelor of Science in Mathematics', 'MSc Data Science',
+           'Master of Computer Applications', 'PhD in Physics']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries']
+DOMAINS = ['e-commerce checkout', 'fraud detection', 'inventory tracking', 'chat application',
+           'recommendation engine', 'analytics dashboard', 'mobile banking app', 'CI/CD pipeline']
+VERBS = ['Built', 'Designed', 'Led', 'Optimized', 'Maintained', 'Migrated', 'Automated']
+
+LINES_PER_PAGE = 58
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages, image_only=False, in_form=False):
+    """Build a PDF with one Helvetica text line per list item; image_only pages carry just an image.
+
+    With in_form, each page draws its text through a Form XObject that holds the font resource.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    if image_only:
+        pixel = b"\x80\x80\x80"
+        objects.append(b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceRGB "
+                       b"/BitsPerComponent 8 /Length 3 >>\nstream\n" + pixel + b"\nendstream")
+    kids = []
+    for lines in pages:
+        if image_only:
+            stream = "q 612 0 0 792 0 0 cm /Im1 Do Q"
+            resources = f"<< /XObject << /Im1 {4} 0 R >> >>"
+        else:
+            stream = "BT /F1 9 Tf 40 770 Td 13 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+            resources = "<< /Font << /F1 3 0 R >> >>"
+            if in_form:
+                objects.append(f"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources {resources} "
+                               f"/Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+                stream = "/Fm1 Do"
+                resources = f"<< /XObject << /Fm1 {len(objects)} 0 R >> >>"
+        kids.append(len(objects) + 1)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources {resources} "
+                       f"/Contents {len(objects) + 2} 0 R >>".encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_resume(seed, pages=1):
+    """Return (lines, facts) for a synthetic resume; facts holds the ground truth for checks."""
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    years = rng.randint(0, 12)
+    degree = rng.choice(DEGREES)
+    name = f"Candidate {seed}"
+    lines = [name, f"candidate{seed}@example.com | +1 555 0100", "", "SUMMARY",
+             f"Software engineer with {years} years of experience in {', '.join(skills[:3])}.", "",
+             "SKILLS", ", ".join(skills), "", "EXPERIENCE"]
+    projects = []
+    while len(lines) < LINES_PER_PAGE * pages - 8:
+        company = rng.choice(COMPANIES)
+        start = 2024 - rng.randint(1, 12)
+        lines += [f"Software Engineer, {company}   Jan {start} - Dec {start + rng.randint(1, 3)}"]
+        for _ in range(rng.randint(2, 4)):
+            domain = rng.choice(DOMAINS)
+            projects.append(domain)
+            lines.append(f"- {rng.choice(VERBS)} a {domain} using {rng.choice(skills)} and {rng.choice(skills)}.")
+        lines.append("")
+    lines += ["EDUCATION", f"{degree}, State University, {2024 - years - 4}"]
+    facts = {'skills': skills, 'years': years, 'education': degree, 'projects': sorted(set(projects))}
+    return lines, facts
+
+
+def make_resume_pdf(seed, pages=1):
+    lines, facts = make_resume(seed, pages)
+    chunks = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    return make_pdf(chunks), facts
+
+
+def write_corpus(directory, count, pages=1, seed=0):
+    """Write `count` resume PDFs to `directory` and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        data, _ = make_resume_pdf(seed + i, pages)
+        path = os.path.join(directory, f"resume_{seed + i:05d}.pdf")
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+    return paths
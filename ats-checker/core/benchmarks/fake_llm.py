@@ -0,0 +1,192 @@
+"""A local stand-in for the Groq chat completions API, for benchmarks and load tests.
+
+It answers POST /openai/v1/chat/completions (the path the groq SDK calls under GROQ_BASE_URL)
+after a configurable delay, with canned extraction JSON built from the prompt: skills, years,
+degree and project domains from the synthetic corpus are found by simple scans, so scores vary
+between resumes the way they would with a real model.
+
+Requests with "stream": true are answered as server-sent events, one chunk per word after
+--latency and then every --token-latency seconds, like the real API's streaming mode. Streamed
+requests without a JSON response format get plain-text suggestions, one per line.
+
+Rate limiting can be injected as 429s with a Retry-After header, either at random
+(--rate-limit-rate) or for the first N requests (--fail-first), to exercise the LLM governor.
+
+Usage: python benchmarks/fake_llm.py [--port 8765] [--latency 0.8] [--jitter 0.2] [--error-rate 0]
+                                     [--rate-limit-rate 0] [--fail-first 0] [--retry-after 1]
+                                     [--token-latency 0.02]
+then run the server with GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=fake.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import DEGREES, DOMAINS, SKILLS
+
+COMPLETIONS_PATH = '/openai/v1/chat/completions'
+
+_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)\+?\s*years", re.IGNORECASE)
+
+
+def _found(names, text):
+    lowered = text.lower()
+    return [name for name in names if re.search(r'(?<![\w+#])' + re.escape(name.lower()) + r'(?![\w+#])', lowered)]
+
+
+def canned_extraction(prompt):
+    """The JSON a well-behaved model would return for one of the analyzer's prompts."""
+    if 'Job Description:' in prompt:
+        job_text = prompt.split('Job Description:', 1)[1].split('Return valid JSON', 1)[0]
+        years = _YEARS_RE.search(job_text)
+        return {
+            'job_required_skills': _found(SKILLS, job_text),
+            'job_required_experience': float(years.group(1)) if years else 0,
+        }
+    resume_text = prompt.split('Resume:', 1)[-1].split('Return valid JSON', 1)[0]
+    years = _YEARS_RE.search(resume_text)
+    degrees = _found(DEGREES, resume_text)
+    return {
+        'resume_skills': _found(SKILLS, resume_text),
+        'resume_experience': float(years.group(1)) if years else 0,
+        'resume_education': degrees[0] if degrees else '',
+        'resume_projects': _found(DOMAINS, resume_text),
+        'improvement_suggestions': ['Quantify the impact of each project.'],
+    }
+
+
+def canned_suggestions(prompt):
+    """Plain-text suggestions, one per line: the job's skills missing from the resume, then a generic one."""
+    required = prompt.split('Skills:', 1)[1].split('\n', 1)[0] if 'Skills:' in prompt else ''
+    resume_text = prompt.split('Resume:', 1)[-1]
+    missing = [skill for skill in _found(SKILLS, required) if not _found([skill], resume_text)]
+    suggestions = [f'Show where you have used {skill}, with the project and its outcome.' for skill in missing[:4]]
+    return '\n'.join(f'- {s}' for s in suggestions + ['Quantify the impact of each project.'])
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def _stream(self, request, content, config):
+        """Send `content` as chat.completion.chunk events, one word at a time."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        base = {'id': f"chatcmpl-fake-{config['requests']}", 'object': 'chat.completion.chunk',
+                'created': int(time.time()), 'model': request.get('model', 'fake')}
+        for i, token in enumerate(re.findall(r'\s*\S+', content)):
+            if i:
+                time.sleep(config['token_latency'])
+            delta = {'role': 'assistant', 'content': token} if i == 0 else {'content': token}
+            chunk = {**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]}
+            self._write_chunk(f'data: {json.dumps(chunk)}\n\n'.encode())
+        final = {**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+        self._write_chunk(f'data: {json.dumps(final)}\n\ndata: [DONE]\n\n'.encode())
+        self._write_chunk(b'')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {'error': {'message': f'Unknown path {self.path}'}})
+            return
+        config = self.server.config
+        with config['lock']:
+            config['requests'] += 1
+            rate_limited = config['requests'] <= config['fail_first'] or random.random() < config['rate_limit_rate']
+        if rate_limited:
+            config['rate_limited'] += 1
+            self._send_json(429, {'error': {'message': 'Rate limit reached (injected)', 'type': 'tokens'}},
+                            headers=[('Retry-After', str(config['retry_after']))])
+            return
+        with config['lock']:
+            config['in_flight'] += 1
+            config['max_in_flight'] = max(config['max_in_flight'], config['in_flight'])
+        try:
+            time.sleep(max(0.0, config['latency'] + random.uniform(-config['jitter'], config['jitter'])))
+            if random.random() < config['error_rate']:
+                self._send_json(503, {'error': {'message': 'Service unavailable (injected)', 'type': 'server_error'}})
+                return
+
+            prompt = '\n'.join(m.get('content', '') for m in request.get('messages', []))
+            if request.get('stream'):
+                json_mode = (request.get('response_format') or {}).get('type') == 'json_object'
+                self._stream(request, json.dumps(canned_extraction(prompt)) if json_mode else canned_suggestions(prompt),
+                             config)
+                return
+        finally:
+            with config['lock']:
+                config['in_flight'] -= 1
+        content = json.dumps(canned_extraction(prompt))
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        self._send_json(200, {
+            'id': f"chatcmpl-fake-{config['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+
+def start_fake_llm(port=0, latency=0.8, jitter=0.2, error_rate=0.0, rate_limit_rate=0.0, fail_first=0,
+                   retry_after=1, token_latency=0.02):
+    """Serve the fake API from a daemon thread; returns (server, base URL). Stop with server.shutdown().
+
+    `server.config` holds the settings (which may be changed while running), the `requests` and
+    `rate_limited` counts and `max_in_flight`, the most completions it was serving at once.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeLLMHandler)
+    server.daemon_threads = True
+    server.config = {'latency': latency, 'jitter': jitter, 'error_rate': error_rate,
+                     'rate_limit_rate': rate_limit_rate, 'fail_first': fail_first, 'retry_after': retry_after,
+                     'token_latency': token_latency, 'requests': 0, 'rate_limited': 0, 'in_flight': 0,
+                     'max_in_flight': 0, 'lock': threading.Lock()}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.8, help='mean seconds per completion')
+    parser.add_argument('--jitter', type=float, default=0.2, help='uniform +/- seconds around the mean')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--fail-first', type=int, default=0, help='answer the first N requests with 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--token-latency', type=float, default=0.02, help='seconds between streamed tokens')
+    args = parser.parse_args()
+    server, url = start_fake_llm(args.port, args.latency, args.jitter, args.error_rate,
+                                 args.rate_limit_rate, args.fail_first, args.retry_after, args.token_latency)
+    print(f"Fake LLM listening on {url} (GROQ_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -52,8 +52,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'resumechecker.middleware.ServerTimingMiddleware',  # Server-Timing header and /metrics request stats
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise
+    'resumechecker.middleware.WhiteNoiseMiddleware',  # WhiteNoise, usable without a thread hop under ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +94,11 @@ DATABASES = {
         conn_health_checks=True,
     )
 }
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Take the write lock when a transaction starts. Deferred transactions that read and then
+    # write fail at once with "database is locked" when another request is writing, which the
+    # async view (one thread per in-flight request) makes routine.
+    DATABASES['default'].setdefault('OPTIONS', {})['transaction_mode'] = 'IMMEDIATE'
 
 
 # Password validation
@@ -159,6 +165,97 @@ if not DEBUG:
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = False  # Keep this False for security
 
+# Groq client (one pooled client per process, see resumechecker/llm.py)
+GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
+GROQ_BASE_URL = os.environ.get('GROQ_BASE_URL')
+GROQ_TIMEOUT = float(os.environ.get('GROQ_TIMEOUT', '60'))
+GROQ_CONNECT_TIMEOUT = float(os.environ.get('GROQ_CONNECT_TIMEOUT', '5'))
+GROQ_MAX_RETRIES = int(os.environ.get('GROQ_MAX_RETRIES', '2'))
+GROQ_MAX_CONNECTIONS = int(os.environ.get('GROQ_MAX_CONNECTIONS', '20'))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('GROQ_MAX_KEEPALIVE_CONNECTIONS', '10'))
+GROQ_KEEPALIVE_EXPIRY = float(os.environ.get('GROQ_KEEPALIVE_EXPIRY', '30'))
+
+# LLM call governor (resumechecker/governor.py). Quotas are per worker process; 0 disables a bucket.
+GROQ_RPM_LIMIT = int(os.environ.get('GROQ_RPM_LIMIT', '0'))
+GROQ_TPM_LIMIT = int(os.environ.get('GROQ_TPM_LIMIT', '0'))
+LLM_INITIAL_CONCURRENCY = int(os.environ.get('LLM_INITIAL_CONCURRENCY', '4'))
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '32'))
+LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', '0.5'))
+LLM_BACKOFF_CAP = float(os.environ.get('LLM_BACKOFF_CAP', '20'))
+LLM_MAX_QUEUE_WAIT = float(os.environ.get('LLM_MAX_QUEUE_WAIT', '30'))
+LLM_CIRCUIT_FAILURES = int(os.environ.get('LLM_CIRCUIT_FAILURES', '5'))
+LLM_CIRCUIT_RESET = float(os.environ.get('LLM_CIRCUIT_RESET', '30'))
+# When the LLM is unavailable, score from locally extracted skills and experience instead of returning 0
+LLM_DEGRADE_TO_LOCAL = os.environ.get('LLM_DEGRADE_TO_LOCAL', 'True') == 'True'
+
+# Analysis engine: "llm" (the LLM extracts everything), "local" (spaCy extraction and rule-based
+# suggestions, no network) or "hybrid" (local extraction and scoring, the LLM only writes suggestions,
+# unless the local confidence is below LOCAL_CONFIDENCE_THRESHOLD). SPACY_MODEL optionally names an
+# installed model to tokenize with; by default a blank English pipeline is used.
+ANALYSIS_MODE = os.environ.get('ANALYSIS_MODE', 'llm')
+LOCAL_CONFIDENCE_THRESHOLD = float(os.environ.get('LOCAL_CONFIDENCE_THRESHOLD', '0.75'))
+SPACY_MODEL = os.environ.get('SPACY_MODEL', '')
+
+# Skill matching in the ATS score: "exact" (normalized names must be equal) or "semantic" (a job
+# skill also counts when a resume skill's embedding has cosine similarity of at least
+# SKILL_SIMILARITY_THRESHOLD, see embeddings.py). Skill vectors are kept in a per-process LRU of
+# SKILL_VECTOR_CACHE_SIZE entries; word vectors are used when SPACY_MODEL has them.
+SKILL_MATCHING = os.environ.get('SKILL_MATCHING', 'exact')
+SKILL_SIMILARITY_THRESHOLD = float(os.environ.get('SKILL_SIMILARITY_THRESHOLD', '0.65'))
+SKILL_VECTOR_CACHE_SIZE = int(os.environ.get('SKILL_VECTOR_CACHE_SIZE', '4096'))
+
+# Serve /api/resume/ with the native async view (views.analyze_resume_async). Only pays off under an
+# ASGI server, e.g. gunicorn core.asgi:application -k uvicorn.workers.UvicornWorker; under WSGI every
+# request would start its own event loop. Uncached PDFs are parsed in a "process" or "thread" pool.
+ASYNC_ANALYZE_VIEW = os.environ.get('ASYNC_ANALYZE_VIEW', 'False') == 'True'
+ASYNC_PDF_POOL = os.environ.get('ASYNC_PDF_POOL', 'process')
+ASYNC_PDF_WORKERS = int(os.environ.get('ASYNC_PDF_WORKERS', str(min(4, os.cpu_count() or 2))))
+
+# PDF extraction. Backends: pdfplumber (layout-aware), pdfium (fast native), pdfminer (raw, no layout).
+# PDF_TRIAGE rejects encrypted, image-only and oversized files from their structure before parsing.
+# PDF_EXTRACT_ISOLATED runs extraction in a resource-limited subprocess.
+PDF_EXTRACT_BACKEND = os.environ.get('PDF_EXTRACT_BACKEND', 'pdfplumber')
+PDF_TRIAGE = os.environ.get('PDF_TRIAGE', 'True') == 'True'
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', '20'))
+PDF_MAX_BYTES = int(os.environ.get('PDF_MAX_BYTES', str(10 * 1024 * 1024)))
+PDF_MAX_SECONDS = float(os.environ.get('PDF_MAX_SECONDS', '20'))
+PDF_EXTRACT_ISOLATED = os.environ.get('PDF_EXTRACT_ISOLATED', 'False') == 'True'
+PDF_MAX_MEMORY_MB = int(os.environ.get('PDF_MAX_MEMORY_MB', '512'))
+
+# What happens to the uploaded PDF once it has been parsed from memory:
+# "deferred" writes it to MEDIA_ROOT from a background thread after the response,
+# "sync" writes it during the request and "none" keeps only its hash and extracted text.
+# Queued (async=true) analyses always store it during the request, since the worker reads it from disk.
+RESUME_STORAGE = os.environ.get('RESUME_STORAGE', 'deferred')
+
+# Seconds a rendered /api/jobs/ listing is reused. Edits made in the same process clear it at once;
+# this bounds how long other worker processes can serve the old listing.
+CATALOGUE_CACHE_TTL = int(os.environ.get('CATALOGUE_CACHE_TTL', '60'))
+
+# Token budgets for the resume and job text pasted into LLM prompts (0 = clean up only, never trim)
+PROMPT_RESUME_TOKEN_BUDGET = int(os.environ.get('PROMPT_RESUME_TOKEN_BUDGET', '2500'))
+PROMPT_JOB_TOKEN_BUDGET = int(os.environ.get('PROMPT_JOB_TOKEN_BUDGET', '1200'))
+
+# LLM extraction cache (in-process LRU in front of the LLMExtraction table)
+LLM_CACHE_SIZE = int(os.environ.get('LLM_CACHE_SIZE', '512'))
+LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', '3600'))
+
+# Identical concurrent analyses share one LLM call within a process. With LLM_LEASE_ENABLED they
+# also do across workers: one holds a database lease while the rest poll the extraction cache.
+LLM_LEASE_ENABLED = os.environ.get('LLM_LEASE_ENABLED', 'False') == 'True'
+LLM_LEASE_TTL = float(os.environ.get('LLM_LEASE_TTL', '90'))
+LLM_LEASE_POLL_INTERVAL = float(os.environ.get('LLM_LEASE_POLL_INTERVAL', '0.25'))
+
+# Async analysis queue (see `manage.py run_analysis_worker`)
+ANALYSIS_JOB_TIMEOUT = int(os.environ.get('ANALYSIS_JOB_TIMEOUT', '300'))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_JOB_MAX_ATTEMPTS', '3'))
+
+# Bulk ranking endpoint (/api/resume/batch/)
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', '500'))
+BATCH_MAX_FILE_SIZE = int(os.environ.get('BATCH_MAX_FILE_SIZE', str(10 * 1024 * 1024)))
+BATCH_PDF_WORKERS = int(os.environ.get('BATCH_PDF_WORKERS', str(os.cpu_count() or 2)))
+BATCH_LLM_CONCURRENCY = int(os.environ.get('BATCH_LLM_CONCURRENCY', '4'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -14,10 +14,11 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.http import JsonResponse
-from resumechecker.views import JobDescriptionAPI,AnalyzeResmeAPI,AnalysisHistoryAPI
+from resumechecker.views import JobDescriptionAPI,JobDescriptionDetailAPI,AnalyzeResmeAPI,AnalyzeResumeStreamAPI,BatchRankAPI,MatchJobsAPI,AnalysisHistoryAPI,TalentSearchAPI,JobLeaderboardAPI,AnalysisJobAPI,CacheStatsAPI,analyze_resume_async,metrics
 
 def home(request):
     return JsonResponse({
@@ -25,8 +26,17 @@ def home(request):
         'status': 'running',
         'endpoints': {
             'jobs': '/api/jobs/',
+            'job_detail': '/api/jobs/<job_id>/',
             'analyze': '/api/resume/',
+            'analyze_stream': '/api/resume/stream/',
+            'batch_rank': '/api/resume/batch/',
+            'match_jobs': '/api/resume/match-jobs/',
+            'analysis_status': '/api/analysis/<job_id>/',
             'history': '/api/history/',
+            'talent_search': '/api/history/search/',
+            'leaderboard': '/api/jobs/<job_id>/leaderboard/',
+            'cache_stats': '/api/cache/stats/',
+            'metrics': '/metrics',
             'admin': '/admin/'
         }
     })
@@ -34,7 +44,17 @@ def home(request):
 urlpatterns = [
     path('', home, name='home'),
     path('api/jobs/', JobDescriptionAPI.as_view(), name='job-list'),
-    path('api/resume/', AnalyzeResmeAPI.as_view(), name='analyze-resume'),
+    path('api/jobs/<int:job_id>/', JobDescriptionDetailAPI.as_view(), name='job-detail'),
+    path('api/jobs/<int:job_id>/leaderboard/', JobLeaderboardAPI.as_view(), name='job-leaderboard'),
+    path('api/resume/', analyze_resume_async if settings.ASYNC_ANALYZE_VIEW else AnalyzeResmeAPI.as_view(),
+         name='analyze-resume'),
+    path('api/resume/stream/', AnalyzeResumeStreamAPI.as_view(), name='analyze-resume-stream'),
+    path('api/resume/batch/', BatchRankAPI.as_view(), name='batch-rank'),
+    path('api/resume/match-jobs/', MatchJobsAPI.as_view(), name='match-jobs'),
+    path('api/analysis/<int:job_id>/', AnalysisJobAPI.as_view(), name='analysis-job'),
     path('api/history/', AnalysisHistoryAPI.as_view(), name='analysis-history'),
+    path('api/history/search/', TalentSearchAPI.as_view(), name='talent-search'),
+    path('api/cache/stats/', CacheStatsAPI.as_view(), name='cache-stats'),
+    path('metrics', metrics, name='metrics'),
     path('admin/', admin.site.urls),
 ]
@@ -0,0 +1,8 @@
+# Loaded automatically by gunicorn when started from this directory.
+
+
+def post_fork(server, worker):
+    # With --preload the app (and any LLM client) is created in the master; give each
+    # worker its own connection pool instead of sharing the parent's sockets.
+    from resumechecker.llm import reset_clients
+    reset_clients()
@@ -1,6 +1,25 @@
+import logging
+
 from django.contrib import admin
 
 # Register your models here.
 from .models import Resume, JobDesCription
+
+logger = logging.getLogger(__name__)
+
 admin.site.register(Resume)
-admin.site.register(JobDesCription)
+
+
+@admin.register(JobDesCription)
+class JobDesCriptionAdmin(admin.ModelAdmin):
+    list_display = ['job_title', 'required_experience']
+    readonly_fields = ['required_skills', 'required_experience']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Extract requirements now so the first candidate for this job does not pay for it
+        from .analyzer import ensure_job_requirements
+        try:
+            ensure_job_requirements(obj)
+        except Exception as e:
+            logger.warning("Could not extract requirements for job %s: %s", obj.pk, e)
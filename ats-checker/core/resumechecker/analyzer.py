@@ -1,9 +1,21 @@
-import pdfplumber
-import spacy
-from groq import Groq
+import hashlib
 import json
 import logging
-import os
+from django.conf import settings
+from django.db.models import F, Q
+from .cache import extraction_cache, make_cache_key
+from .compaction import compact_text, estimate_tokens
+from .embeddings import job_skill_vectors, matched_job_skills, skill_keys
+from .categories import categorize_projects
+from .governor import LLMUnavailable, get_governor
+from .job_index import jobs_matching_skills
+from .llm import get_client
+from .local_engine import extract_resume_locally, job_requirements_locally, local_suggestions
+from .metrics import ANALYSIS_ENGINE, CACHE_LOOKUPS, FALLBACK_RESULTS, LLM_ERRORS, LLM_REQUESTS, timed
+from .models import JobDesCription, LLMExtraction, ResumeText
+from .pdf import PDFRejected, extract_text, extract_text_isolated
+from .singleflight import SingleFlight, run_with_lease
+from .skills import find_skills, merge_skills, normalize_skill
 
 
 # Configure logging
@@ -11,182 +23,618 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 
 
 def extraxt_text_from_pdf(pdf_path):
-    text="" 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    return text.strip()
-
-# Load API key from environment variable for security
-API_KEY = os.getenv('GROQ_API_KEY')
-if not API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is not set. Please set it in your environment or .env file.")
-
-def analyze_resume_with_llm(resume_text: str, job_description: str) -> dict:
-    logging.debug("Starting analysis with LLM")
-    
-    # First, extract structured data from both resume and job description
-    extraction_prompt = f"""
-    Extract structured information from this resume and job description. Be consistent and thorough.
+    limits = {
+        'max_pages': settings.PDF_MAX_PAGES,
+        'max_bytes': settings.PDF_MAX_BYTES,
+        'max_seconds': settings.PDF_MAX_SECONDS,
+        'backend': settings.PDF_EXTRACT_BACKEND,
+        'triage': settings.PDF_TRIAGE,
+    }
+    if settings.PDF_EXTRACT_ISOLATED:
+        return extract_text_isolated(pdf_path, max_memory_mb=settings.PDF_MAX_MEMORY_MB, **limits)
+    return extract_text(pdf_path, **limits)
+
+def compute_content_hash(source):
+    """SHA-256 hex digest of a PDF given as bytes, a path or an uploaded/open file."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    if hasattr(source, 'chunks'):
+        for chunk in source.chunks():
+            digest.update(chunk)
+        source.seek(0)
+    elif hasattr(source, 'read'):
+        for chunk in iter(lambda: source.read(64 * 1024), b''):
+            digest.update(chunk)
+        source.seek(0)
+    else:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def get_resume_text(pdf_path, content_hash=None):
+    """Return the PDF text, running pdfplumber only the first time a given file content is seen."""
+    if content_hash is None:
+        content_hash = compute_content_hash(pdf_path)
+    cached = ResumeText.objects.filter(content_hash=content_hash).values_list('text', flat=True).first()
+    if cached is not None:
+        logging.debug("Resume text cache hit: %s", content_hash)
+        CACHE_LOOKUPS.inc(cache='resume_text', result='hit')
+        return cached
+    CACHE_LOOKUPS.inc(cache='resume_text', result='miss')
+    if pdf_path is None:
+        raise ValueError("Resume text is not cached and the original PDF was not stored")
+    text = extraxt_text_from_pdf(pdf_path)
+    ResumeText.objects.get_or_create(content_hash=content_hash, defaults={'text': text})
+    return text
+
+LLM_MODEL = "llama-3.3-70b-versatile"
+# Bump whenever the extraction prompts change so cached extractions are not reused
+PROMPT_VERSION = 4
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+LLM_MAX_TOKENS = 2000
+# Tokens reserved for the completion before the real usage is known
+EXPECTED_COMPLETION_TOKENS = 400
+
+def completion_request(prompt: str, stream: bool = False) -> dict:
+    """Arguments for chat.completions.create, shared by the sync and async clients.
+
+    Streamed completions are plain text: a reader can use each token of it as it arrives, but not
+    of a JSON object.
+    """
+    request = {
+        'model': LLM_MODEL,
+        'messages': [{"role": "user", "content": prompt}],
+        'temperature': 0,  # Completely deterministic
+        'max_tokens': LLM_MAX_TOKENS,
+    }
+    if stream:
+        request['stream'] = True
+    else:
+        request['response_format'] = {"type": "json_object"}
+    return request
+
+def governed(prompt: str) -> dict:
+    """Token estimate and usage hook for the governor's `call`/`acall`."""
+    return {
+        'estimated_tokens': estimate_tokens(prompt) + EXPECTED_COMPLETION_TOKENS,
+        'used_tokens': lambda r: r.usage.total_tokens if r.usage is not None else None,
+    }
+
+def parse_completion(response) -> dict:
+    result = response.choices[0].message.content
+    if response.usage is not None:
+        logging.info("LLM usage: %s prompt + %s completion tokens",
+                     response.usage.prompt_tokens, response.usage.completion_tokens)
+    logging.debug("LLM extraction result: %s", result)
+    with timed('parse'):
+        return json.loads(result)
+
+def _complete_json(prompt: str) -> dict:
+    LLM_REQUESTS.inc()
+    try:
+        with timed('llm'):
+            response = get_governor().call(
+                lambda: get_client().chat.completions.create(**completion_request(prompt)), **governed(prompt))
+        return parse_completion(response)
+    except Exception:
+        LLM_ERRORS.inc()
+        raise
+
+# Identical LLM calls (same cache key) and identical analyses in flight at once run only once
+llm_flight = SingleFlight('llm')
+analysis_flight = SingleFlight('analysis')
+
+def _extract_once(cache_key: str, compute) -> dict:
+    """Run `compute` and cache its result, sharing one call between concurrent requests for the same key."""
+    def lookup():
+        return LLMExtraction.objects.filter(cache_key=cache_key).values_list('payload', flat=True).first()
+
+    def store():
+        payload = compute()
+        extraction_cache.set(cache_key, payload, LLM_MODEL, PROMPT_VERSION)
+        return payload
+
+    def leader():
+        # A call for this key may have finished between the caller's cache miss and now
+        payload = lookup()
+        if payload is not None:
+            return payload
+        if settings.LLM_LEASE_ENABLED:
+            return run_with_lease('llm', cache_key, lookup, store,
+                                  settings.LLM_LEASE_TTL, settings.LLM_LEASE_POLL_INTERVAL)
+        return store()
+
+    return llm_flight.do(cache_key, leader)
+
+def job_requirements_prompt(job_description: str):
+    """Return (cache key, prompt) for extracting a job description's requirements."""
+    job_text, _ = compact_text(job_description, settings.PROMPT_JOB_TOKEN_BUDGET, kind='job')
+    cache_key = make_cache_key('job', normalize_text(job_text), LLM_MODEL, PROMPT_VERSION)
+    return cache_key, f"""
+    Extract the requirements from this job description. Be consistent and thorough.
 
     Job Description:
-    {job_description}
+    {job_text}
+
+    Return valid JSON with:
+    {{
+        "job_required_skills": ["list ALL technical skills, tools, languages, frameworks mentioned in job description"],
+        "job_required_experience": <minimum years required, 0 if not specified>
+    }}
+
+    """
+
+def job_requirements_from(data: dict, job_description: str) -> dict:
+    """Job requirements from the LLM's JSON, with skills completed by a local scan of the text."""
+    return {
+        'job_required_skills': merge_skills(data.get('job_required_skills', []), find_skills(job_description)),
+        'job_required_experience': data.get('job_required_experience', 0),
+    }
+
+def extract_job_requirements(job_description: str) -> dict:
+    """Extract required skills and experience from a job description, calling Groq only on a cache miss."""
+    cache_key, requirements_prompt = job_requirements_prompt(job_description)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        logging.debug("Job requirements cache hit: %s", cache_key)
+        return cached
+
+    return _extract_once(cache_key, lambda: job_requirements_from(_complete_json(requirements_prompt), job_description))
+
+REQUIREMENTS_FIELDS = ['content_hash', 'required_skills', 'required_experience', 'requirements_hash']
+
+def set_job_requirements(job: JobDesCription, requirements: dict):
+    """Copy extracted requirements onto a job; the caller saves REQUIREMENTS_FIELDS."""
+    job.required_skills = requirements['job_required_skills']
+    job.required_experience = requirements['job_required_experience'] or 0
+    job.requirements_hash = job.compute_content_hash()
+
+def ensure_job_requirements(job: JobDesCription) -> dict:
+    """Return the stored requirements of a catalogue job, re-extracting them only when its text changed."""
+    if not job.requirements_current:
+        set_job_requirements(job, extract_job_requirements(job.job_description))
+        job.save(update_fields=REQUIREMENTS_FIELDS)
+    return job.requirements
+
+def resume_extraction_prompt(resume_text: str, job_requirements: dict, suggestions: bool = True):
+    """Return (cache key, prompt) for extracting a resume against a job's requirements.
+
+    Without `suggestions` the completion is much shorter, for callers that ask for suggestions
+    separately (streaming.py).
+    """
+    resume_text, _ = compact_text(resume_text, settings.PROMPT_RESUME_TOKEN_BUDGET, kind='resume')
+    return _compacted_extraction_prompt(resume_text, job_requirements, suggestions)
+
+def _compacted_extraction_prompt(resume_text: str, job_requirements: dict, suggestions: bool = True):
+    requirements_key = json.dumps(job_requirements, sort_keys=True)
+    key_parts = (normalize_text(resume_text), requirements_key, LLM_MODEL, PROMPT_VERSION)
+    cache_key = make_cache_key(*key_parts) if suggestions else make_cache_key('no_suggestions', *key_parts)
+    suggestions_field = (',\n        "improvement_suggestions": ["5 specific actionable suggestions for this role"]'
+                         if suggestions else '')
+    return cache_key, f"""
+    Extract structured information from this resume. Be consistent and thorough.
+
+    The candidate is applying for a role that requires:
+    Skills: {", ".join(job_requirements.get('job_required_skills', [])) or "not specified"}
+    Minimum experience: {job_requirements.get('job_required_experience', 0)} years
 
     Resume:
     {resume_text}
 
     Return valid JSON with:
     {{
-        "job_required_skills": ["list ALL technical skills, tools, languages, frameworks mentioned in job description"],
-        "job_required_experience": <minimum years required, 0 if not specified>,
         "resume_skills": ["list ALL technical skills, tools, languages, frameworks found in resume"],
         "resume_experience": <total years of experience>,
         "resume_education": "<highest degree and field>",
-        "resume_projects": ["brief description of each project domain"],
-        "improvement_suggestions": ["5 specific actionable suggestions"]
+        "resume_projects": ["brief description of each project domain"]{suggestions_field}
     }}
-    
-    Normalize skill names (e.g., "React.js" and "React" → "React", "JavaScript" and "JS" → "JavaScript").
+
     """
-    
-    try:
-        client = Groq(api_key=API_KEY)
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": extraction_prompt}],
-            temperature=0,  # Completely deterministic
-            max_tokens=2000,
-            response_format={"type": "json_object"}
-        )
-        result = response.choices[0].message.content
-        logging.debug("LLM extraction result: %s", result)
-        data = json.loads(result)
-        
+
+def extract_with_llm(resume_text: str, job_requirements: dict) -> dict:
+    """Return the raw resume extraction JSON for a job's requirements, calling Groq only on a cache miss."""
+    cache_key, extraction_prompt = resume_extraction_prompt(resume_text, job_requirements)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        logging.debug("LLM extraction cache hit: %s", cache_key)
+        return cached
+
+    return _extract_once(cache_key, lambda: _complete_json(extraction_prompt))
+
+def resume_data_from(extraction: dict, resume_text: str) -> dict:
+    """LLM extraction with skills canonicalized and completed by a local scan of the resume text."""
+    data = dict(extraction)
+    data['resume_skills'] = merge_skills(data.get('resume_skills', []), find_skills(resume_text))
+    return data
+
+def extract_resume_data(resume_text: str, job_requirements: dict) -> dict:
+    return resume_data_from(extract_with_llm(resume_text, job_requirements), resume_text)
+
+def extract_resume_data_first(resume_text: str, job_requirements: dict):
+    """Return (resume data, suggestions), leaving the suggestions to a separate call where possible.
+
+    A cached full extraction comes with its suggestions; otherwise the resume is extracted without
+    them, a much shorter completion, and suggestions is None.
+    """
+    # Compacted once: both cache keys are derived from the same prompt text
+    compacted, _ = compact_text(resume_text, settings.PROMPT_RESUME_TOKEN_BUDGET, kind='resume')
+    full_key, _ = _compacted_extraction_prompt(compacted, job_requirements)
+    extraction = extraction_cache.get(full_key)
+    if extraction is not None:
+        return resume_data_from(extraction, resume_text), extraction.get('improvement_suggestions', [])
+    cache_key, extraction_prompt = _compacted_extraction_prompt(compacted, job_requirements, suggestions=False)
+    extraction = extraction_cache.get(cache_key)
+    if extraction is None:
+        extraction = _extract_once(cache_key, lambda: _complete_json(extraction_prompt))
+    return resume_data_from(extraction, resume_text), None
+
+def suggestions_prompt(resume_text: str, data: dict, as_lines: bool = False):
+    """Return (cache key, prompt) for improvement suggestions on an already scored resume.
+
+    `as_lines` asks for plain text, one suggestion per line, for streaming. Both forms are cached
+    under the same key as {"improvement_suggestions": [...]}.
+    """
+    resume_text, _ = compact_text(resume_text, settings.PROMPT_RESUME_TOKEN_BUDGET, kind='resume')
+    requirements_key = json.dumps({k: data.get(k) for k in ('job_required_skills', 'job_required_experience')},
+                                  sort_keys=True)
+    cache_key = make_cache_key('suggestions', normalize_text(resume_text), requirements_key, LLM_MODEL, PROMPT_VERSION)
+    if as_lines:
+        answer_format = """Answer with 5 specific actionable suggestions for this role, one per line, each starting
+    with "- ", and nothing else."""
+    else:
+        answer_format = """Return valid JSON with:
+    {
+        "improvement_suggestions": ["5 specific actionable suggestions for this role"]
+    }"""
+    return cache_key, f"""
+    Suggest improvements to this resume for a role that requires:
+    Skills: {", ".join(data.get('job_required_skills', [])) or "not specified"}
+    Minimum experience: {data.get('job_required_experience', 0)} years
+
+    The candidate's resume shows these skills: {", ".join(data.get('resume_skills', [])) or "none found"}
+
+    Resume:
+    {resume_text}
+
+    {answer_format}
+
+    """
+
+def suggest_with_llm(resume_text: str, data: dict) -> list:
+    """Improvement suggestions for a locally scored resume, calling Groq only on a cache miss."""
+    cache_key, prompt = suggestions_prompt(resume_text, data)
+    cached = extraction_cache.get(cache_key)
+    if cached is None:
+        cached = _extract_once(cache_key, lambda: _complete_json(prompt))
+    return cached.get('improvement_suggestions', [])
+
+def job_requirements_for(job_description, use_llm: bool) -> dict:
+    """Stored requirements of a catalogue job, else LLM-extracted (if allowed and reachable), else local ones."""
+    if isinstance(job_description, JobDesCription) and job_description.requirements_current:
+        return job_description.requirements
+    if use_llm:
+        try:
+            if isinstance(job_description, JobDesCription):
+                return ensure_job_requirements(job_description)
+            return extract_job_requirements(job_description)
+        except Exception as e:
+            logging.warning("Falling back to local job requirements: %s", e)
+    job_text = job_description.job_description if isinstance(job_description, JobDesCription) else job_description
+    return job_requirements_locally(job_text)
+
+def _score_local(data: dict, suggestions: list, job_vectors=None) -> dict:
+    with timed('score'):
+        score = calculate_ats_score(data, job_vectors)
+        project_categories = categorize_projects(data['resume_projects'])
+    return {
+        "rank": score,
+        "skills": data['resume_skills'],
+        "total_experience": data['resume_experience'],
+        "project_categories": project_categories,
+        "suggestions": suggestions,
+    }
+
+def analyze_resume_locally(resume_text: str, job_description, degraded: bool = False) -> dict:
+    """Score a resume with the spaCy engine alone: no network calls, rule-based suggestions.
+
+    `degraded` marks a result produced because the LLM was unavailable rather than by choice.
+    """
+    with timed('local'):
+        data = {**job_requirements_for(job_description, use_llm=False), **extract_resume_locally(resume_text)}
+    result = _score_local(data, local_suggestions(data), job_skill_vectors(job_description))
+    if degraded:
+        result['suggestions'].insert(0, "The AI analysis service is busy, so this score comes from a local "
+                                        "analysis only. Try again in a few minutes for a full analysis.")
+        result['degraded'] = True
+    return result
+
+def analyze_resume(resume_text: str, job_description, mode: str = None) -> dict:
+    """Analyze a resume with the engine chosen by ANALYSIS_MODE (or `mode`).
+
+    local: spaCy extraction and rule-based suggestions, no network.
+    llm: the LLM extracts everything (analyze_resume_with_llm).
+    hybrid: spaCy extraction scores the resume and the LLM only writes the suggestions, unless
+    the local extraction's confidence is below LOCAL_CONFIDENCE_THRESHOLD, when the LLM does it all.
+    """
+    mode = mode or settings.ANALYSIS_MODE
+    if mode == 'local':
+        ANALYSIS_ENGINE.inc(engine='local')
+        return analyze_resume_locally(resume_text, job_description)
+    if mode == 'hybrid':
+        with timed('local'):
+            local = extract_resume_locally(resume_text)
+        if local['confidence'] >= settings.LOCAL_CONFIDENCE_THRESHOLD:
+            ANALYSIS_ENGINE.inc(engine='hybrid')
+            data = {**job_requirements_for(job_description, use_llm=True), **local}
+            try:
+                suggestions = suggest_with_llm(resume_text, data)
+            except Exception as e:
+                logging.warning("Using local suggestions: %s", e)
+                suggestions = local_suggestions(data)
+            return _score_local(data, suggestions or local_suggestions(data), job_skill_vectors(job_description))
+        logging.debug("Local extraction confidence %.2f is low, using the LLM", local['confidence'])
+    ANALYSIS_ENGINE.inc(engine='llm')
+    return analyze_resume_with_llm(resume_text, job_description)
+
+def score_extraction(data: dict, job_vectors=None) -> dict:
+    """The analysis result for merged resume extraction and job requirements."""
+    with timed('score'):
         # Calculate score using deterministic algorithm
-        score = calculate_ats_score(data)
-        
+        score = calculate_ats_score(data, job_vectors)
+
         # Categorize projects
         project_categories = categorize_projects(data.get('resume_projects', []))
-        
-        return {
-            "rank": score,
-            "skills": data.get('resume_skills', []),
-            "total_experience": data.get('resume_experience', 0),
-            "project_categories": project_categories,
-            "suggestions": data.get('improvement_suggestions', [])
-        }
-        
-    except Exception as e:
-        logging.error("Error during LLM analysis: %s", e)
+
+    return {
+        "rank": score,
+        "skills": data.get('resume_skills', []),
+        "total_experience": data.get('resume_experience', 0),
+        "project_categories": project_categories,
+        "suggestions": data.get('improvement_suggestions', [])
+    }
+
+def analysis_key(resume_text: str, job_description) -> str:
+    if isinstance(job_description, JobDesCription):
+        job_hash = job_description.content_hash or job_description.compute_content_hash()
+    else:
+        job_hash = make_cache_key(job_description)
+    return make_cache_key('analysis', make_cache_key(resume_text), job_hash)
+
+def analysis_fallback(error: Exception, resume_text: str, job_description) -> dict:
+    """The result returned when an LLM analysis raised `error`."""
+    if isinstance(error, LLMUnavailable):
+        logging.warning("LLM unavailable: %s", error)
+        if settings.LLM_DEGRADE_TO_LOCAL:
+            FALLBACK_RESULTS.inc(reason='local_degraded')
+            return analyze_resume_locally(resume_text, job_description, degraded=True)
+        FALLBACK_RESULTS.inc(reason='llm_unavailable')
         return {
             "rank": 0,
             "skills": [],
             "total_experience": 0,
             "project_categories": [],
-            "suggestions": ["Unable to analyze resume. Please try again."]
+            "suggestions": ["The AI analysis service is busy. Please try again in a few minutes."]
         }
+    logging.error("Error during LLM analysis: %s", error)
+    FALLBACK_RESULTS.inc(reason='analysis_error')
+    return {
+        "rank": 0,
+        "skills": [],
+        "total_experience": 0,
+        "project_categories": [],
+        "suggestions": ["Unable to analyze resume. Please try again."]
+    }
 
-def calculate_ats_score(data: dict) -> int:
-    """Calculate ATS score using deterministic algorithm like professional ATS systems"""
+def analyze_resume_with_llm(resume_text: str, job_description) -> dict:
+    """Analyze a resume against a catalogue JobDesCription or a custom job description text."""
+    logging.debug("Starting analysis with LLM")
+
+    def analyze():
+        if isinstance(job_description, JobDesCription):
+            job_requirements = ensure_job_requirements(job_description)
+        else:
+            job_requirements = extract_job_requirements(job_description)
+        return score_extraction({**extract_resume_data(resume_text, job_requirements), **job_requirements},
+                                job_skill_vectors(job_description))
+
+    try:
+        # A double-click or client retry sends the same pair while the first is still running
+        return analysis_flight.do(analysis_key(resume_text, job_description), analyze)
+    except Exception as e:
+        return analysis_fallback(e, resume_text, job_description)
+
+def match_resume_to_jobs(resume_text: str, top_k: int = 5, mode: str = None) -> dict:
+    """Score one resume against every catalogue job using a single extraction and the skill index.
+
+    With exact skill matching, only jobs sharing a skill with the resume (or listing none) are
+    scored at first. A job sharing none gets no skill points, so it scores at most the best
+    experience points plus the resume's project and education points; the remaining jobs are only
+    scored when that bound could reach the top k.
+
+    The engine follows ANALYSIS_MODE (or `mode`) as in analyze_resume: in local mode the resume
+    and any job whose stored requirements are stale are read locally, with no LLM call.
+    """
+    mode = mode or settings.ANALYSIS_MODE
+    top_k = max(1, top_k)
+    stale = ~Q(requirements_hash=F('content_hash'))
+    if mode != 'local':
+        for job in JobDesCription.objects.filter(stale):
+            job_requirements_for(job, use_llm=True)
+
+    no_requirements = {'job_required_skills': [], 'job_required_experience': 0}
+    if mode == 'llm':
+        resume_data = extract_resume_data(resume_text, no_requirements)
+    else:
+        with timed('local'):
+            resume_data = extract_resume_locally(resume_text)
+        if mode == 'hybrid' and resume_data['confidence'] < settings.LOCAL_CONFIDENCE_THRESHOLD:
+            resume_data = extract_resume_data(resume_text, no_requirements)
+    resume_skills = {normalize_skill(s) for s in resume_data.get('resume_skills', [])}
+
+    def score(job):
+        # Stored requirements, or local ones for a job whose stored requirements are stale
+        requirements = job_requirements_for(job, use_llm=False)
+        job_vectors = job_skill_vectors(job) if job.requirements_current else None
+        if settings.SKILL_MATCHING == 'semantic':
+            mask = matched_job_skills(requirements['job_required_skills'], resume_data.get('resume_skills', []),
+                                      job_vectors)
+            matched_keys = {key for key, matched in zip(skill_keys(requirements['job_required_skills']), mask)
+                            if matched}
+        else:
+            matched_keys = resume_skills
+        return {
+            'job_id': job.id,
+            'job_title': job.job_title,
+            'rank': calculate_ats_score({**resume_data, **requirements}, job_vectors),
+            'matched_skills': [s for s in requirements['job_required_skills'] if normalize_skill(s) in matched_keys],
+        }
+
+    if settings.SKILL_MATCHING == 'semantic':
+        # The skill index only knows exact names, so every job is scored against its stored skill matrix
+        matches = [score(job) for job in JobDesCription.objects.all()]
+    else:
+        overlap = jobs_matching_skills(resume_data.get('resume_skills', []))
+        # A stale job's index entries may not match the requirements it is scored on
+        candidates = JobDesCription.objects.filter(Q(id__in=overlap) | Q(skill_index__isnull=True) | stale).distinct()
+        matches = sorted((score(job) for job in candidates), key=lambda m: (-m['rank'], m['job_id']))
+        candidate_exp = resume_data.get('resume_experience', 0)
+        bound = max(experience_points(0, candidate_exp), experience_points(candidate_exp, candidate_exp)) + \
+            profile_points(resume_data)
+        # Ties are broken by job id, so a job reaching the k-th rank could still displace it
+        if len(matches) < top_k or matches[top_k - 1]['rank'] <= bound:
+            scored = [m['job_id'] for m in matches]
+            matches += [score(job) for job in JobDesCription.objects.exclude(id__in=scored)]
+    matches.sort(key=lambda m: (-m['rank'], m['job_id']))
+
+    return {
+        'skills': resume_data.get('resume_skills', []),
+        'total_experience': resume_data.get('resume_experience', 0),
+        'project_categories': categorize_projects(resume_data.get('resume_projects', [])),
+        'matches': matches[:top_k],
+    }
+
+def calculate_ats_score(data: dict, job_vectors=None) -> int:
+    """Calculate ATS score using deterministic algorithm like professional ATS systems
+
+    With SKILL_MATCHING=semantic, job skills also count as matched by a similar resume skill;
+    `job_vectors` is the job's stored skill matrix, if there is one (embeddings.job_skill_vectors).
+    """
     score = 0
     
-    job_skills = set([s.lower().strip() for s in data.get('job_required_skills', [])])
-    resume_skills = set([s.lower().strip() for s in data.get('resume_skills', [])])
+    job_skills = set([normalize_skill(s) for s in data.get('job_required_skills', [])])
+    resume_skills = set([normalize_skill(s) for s in data.get('resume_skills', [])])
     
     # 1. Keyword/Skill Match (50 points maximum)
     if len(job_skills) > 0:
-        matched_skills = job_skills.intersection(resume_skills)
-        skill_match_rate = len(matched_skills) / len(job_skills)
+        if settings.SKILL_MATCHING == 'semantic':
+            matched_count = int(matched_job_skills(data.get('job_required_skills', []), data.get('resume_skills', []),
+                                                   job_vectors).sum())
+        else:
+            matched_count = len(job_skills.intersection(resume_skills))
+        skill_match_rate = matched_count / len(job_skills)
         score += int(skill_match_rate * 50)
-        logging.debug(f"Skill match: {len(matched_skills)}/{len(job_skills)} = {skill_match_rate:.2%} → {int(skill_match_rate * 50)} points")
+        logging.debug(f"Skill match: {matched_count}/{len(job_skills)} = {skill_match_rate:.2%} → {int(skill_match_rate * 50)} points")
     else:
         score += 25  # Default if no specific skills listed
     
     # 2. Experience Match (25 points maximum)
     required_exp = data.get('job_required_experience', 0)
     candidate_exp = data.get('resume_experience', 0)
+    score += experience_points(required_exp, candidate_exp)
+    
+    logging.debug(f"Experience: {candidate_exp}/{required_exp} years → {25 if candidate_exp >= required_exp else 20} points")
     
+    # 3. Project Diversity (15 points maximum) and 4. Education (10 points maximum)
+    score += profile_points(data)
+    
+    # Cap at 100
+    final_score = min(100, score)
+    logging.debug(f"Final ATS Score: {final_score}/100")
+    
+    return final_score
+
+def experience_points(required_exp, candidate_exp) -> int:
+    """Experience part of calculate_ats_score (25 points maximum)."""
     if required_exp == 0:
-        score += 20  # No specific requirement
+        return 20  # No specific requirement
     elif candidate_exp >= required_exp:
-        score += 25  # Meets or exceeds
+        return 25  # Meets or exceeds
     elif candidate_exp >= required_exp * 0.75:
-        score += 20  # Close match
+        return 20  # Close match
     elif candidate_exp >= required_exp * 0.5:
-        score += 15  # Partial match
+        return 15  # Partial match
     elif candidate_exp >= required_exp * 0.25:
-        score += 10  # Some experience
+        return 10  # Some experience
     else:
-        score += 5  # Limited experience
-    
-    logging.debug(f"Experience: {candidate_exp}/{required_exp} years → {25 if candidate_exp >= required_exp else 20} points")
-    
-    # 3. Project Diversity (15 points maximum)
-    projects = data.get('resume_projects', [])
-    num_projects = len(projects)
+        return 5  # Limited experience
+
+def profile_points(data: dict) -> int:
+    """Project diversity (15 points maximum) and education (10 points maximum) parts of
+    calculate_ats_score, which depend on the resume only."""
+    points = 0
+    num_projects = len(data.get('resume_projects', []))
     if num_projects >= 5:
-        score += 15
+        points += 15
     elif num_projects >= 3:
-        score += 12
+        points += 12
     elif num_projects >= 2:
-        score += 9
+        points += 9
     elif num_projects >= 1:
-        score += 6
-    
-    # 4. Education (10 points maximum)
+        points += 6
+
     education = data.get('resume_education', '').lower()
     if any(degree in education for degree in ['phd', 'doctorate', 'ph.d']):
-        score += 10
+        points += 10
     elif any(degree in education for degree in ['master', 'msc', 'mba', 'ms']):
-        score += 9
+        points += 9
     elif any(degree in education for degree in ['bachelor', 'bsc', 'ba', 'bs', 'btech', 'be']):
-        score += 7
+        points += 7
     elif education:
-        score += 5
-    
-    # Cap at 100
-    final_score = min(100, score)
-    logging.debug(f"Final ATS Score: {final_score}/100")
-    
-    return final_score
+        points += 5
+    return points
 
-def categorize_projects(projects: list) -> list:
-    """Categorize projects into domains"""
-    categories = set()
-    keywords_map = {
-        'AI/ML': ['ai', 'ml', 'machine learning', 'deep learning', 'neural', 'nlp', 'computer vision', 'tensorflow', 'pytorch'],
-        'Web Development': ['web', 'website', 'frontend', 'backend', 'react', 'angular', 'vue', 'django', 'flask', 'node'],
-        'Mobile': ['mobile', 'android', 'ios', 'app', 'flutter', 'react native'],
-        'Cloud': ['cloud', 'aws', 'azure', 'gcp', 'kubernetes', 'docker'],
-        'Data Science': ['data', 'analytics', 'visualization', 'pandas', 'numpy', 'sql', 'database'],
-        'DevOps': ['devops', 'ci/cd', 'jenkins', 'deployment', 'infrastructure']
-    }
-    
-    for project in projects:
-        project_lower = project.lower()
-        for category, keywords in keywords_map.items():
-            if any(keyword in project_lower for keyword in keywords):
-                categories.add(category)
-    
-    return list(categories) if categories else ['General Software Development']
+def processing_fallback(error: Exception, source) -> dict:
+    """The result returned when reading or analyzing the resume at `source` raised `error`."""
+    if isinstance(error, PDFRejected):
+        logging.warning("Rejected PDF %s: %s", source, error)
+        FALLBACK_RESULTS.inc(reason='pdf_rejected')
+        return {
+            "rank": 0,
+            "skills": [],
+            "total_experience": 0,
+            "project_categories": [],
+            "suggestions": [f"Resume could not be read: {error}. Please upload a text-based PDF within the size limits."]
+        }
+    logging.error("Error during resume processing: %s", error)
+    FALLBACK_RESULTS.inc(reason='processing_error')
+    return {
+        "rank": 0,
+        "skills": [],
+        "total_experience": 0,
+        "project_categories": [],
+        "suggestions": ["Error processing resume. Please ensure your PDF is readable and try again."]
+    }  # Return a default structure in case of failure
 
-def process_resume(pdf_path, job_description):
+def process_resume(pdf_path, job_description, content_hash=None, progress=None):
     try:
         logging.debug("Extracting text from PDF: %s", pdf_path)
-        resume_text = extraxt_text_from_pdf(pdf_path)
+        if progress:
+            progress('extracting')
+        with timed('extract'):
+            resume_text = get_resume_text(pdf_path, content_hash)
         logging.debug("Extracted resume text: %s", resume_text[:500])  # Log first 500 characters
-        analysis_result = analyze_resume_with_llm(resume_text, job_description)
+        if progress:
+            progress('analyzing')
+        analysis_result = analyze_resume(resume_text, job_description)
         if analysis_result is None:
             logging.error("Analysis result is None. Check LLM function.")
         else:
             logging.debug("Analysis result: %s", analysis_result)
         return analysis_result
     except Exception as e:
-        logging.error("Error during resume processing: %s", e)
-        return {
-            "rank": 0,
-            "skills": [],
-            "total_experience": 0,
-            "project_categories": [],
-            "suggestions": ["Error processing resume. Please ensure your PDF is readable and try again."]
-        }  # Return a default structure in case of failure
+        return processing_fallback(e, pdf_path)
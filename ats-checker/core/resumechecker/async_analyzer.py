@@ -0,0 +1,170 @@
+"""Async counterpart of `analyzer.process_resume`, used by the ASGI analyze view.
+
+Nothing here blocks the event loop while it waits, so one worker process can hold as many
+analyses in flight as the LLM governor admits:
+
+- LLM completions go through AsyncGroq and the governor's `acall`, sharing its quotas, AIMD
+  limit and circuit breaker with any sync callers in the process;
+- uncached PDFs are parsed in a bounded pool (ASYNC_PDF_POOL, ASYNC_PDF_WORKERS);
+- ORM reads and writes use Django's async query API, and cache lookups that can fall through to
+  the database run through sync_to_async.
+
+Identical concurrent calls are coalesced per event loop. The cross-process LLM lease
+(LLM_LEASE_ENABLED) is only taken by the sync path.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .analyzer import (LLM_MODEL, PROMPT_VERSION, REQUIREMENTS_FIELDS, analysis_fallback, analysis_key,
+                       analyze_resume, completion_request, extraxt_text_from_pdf, governed,
+                       job_requirements_from, job_requirements_prompt, parse_completion, processing_fallback,
+                       resume_data_from, resume_extraction_prompt, score_extraction, set_job_requirements)
+from .cache import extraction_cache
+from .embeddings import job_skill_vectors
+from .governor import get_governor
+from .llm import get_async_client
+from .metrics import ANALYSIS_ENGINE, CACHE_LOOKUPS, LLM_ERRORS, LLM_REQUESTS, timed
+from .models import JobDesCription, LLMExtraction, ResumeText
+from .singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+allm_flight = AsyncSingleFlight('llm')
+aanalysis_flight = AsyncSingleFlight('analysis')
+ajob_flight = AsyncSingleFlight('job_requirements')
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _extract_pdf_bytes(data):
+    return extraxt_text_from_pdf(io.BytesIO(data))
+
+
+def get_pdf_pool():
+    """The per-process pool PDFs are parsed in, created on first use (after any fork)."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            if settings.ASYNC_PDF_POOL == 'process':
+                # Spawned, not forked: a fork of a process running an event loop and threads can
+                # inherit locks held by those threads and hang
+                _pdf_pool = ProcessPoolExecutor(max_workers=settings.ASYNC_PDF_WORKERS, initializer=django.setup,
+                                                mp_context=multiprocessing.get_context('spawn'))
+            else:
+                _pdf_pool = ThreadPoolExecutor(max_workers=settings.ASYNC_PDF_WORKERS, thread_name_prefix='pdf')
+        return _pdf_pool
+
+
+async def aget_resume_text(data: bytes, content_hash: str) -> str:
+    """`get_resume_text` for uploaded bytes: parsed in the PDF pool only on a cache miss."""
+    cached = await ResumeText.objects.filter(content_hash=content_hash).values_list('text', flat=True).afirst()
+    if cached is not None:
+        CACHE_LOOKUPS.inc(cache='resume_text', result='hit')
+        return cached
+    CACHE_LOOKUPS.inc(cache='resume_text', result='miss')
+    text = await asyncio.get_running_loop().run_in_executor(get_pdf_pool(), _extract_pdf_bytes, data)
+    await ResumeText.objects.aget_or_create(content_hash=content_hash, defaults={'text': text})
+    return text
+
+
+async def _acomplete_json(prompt: str) -> dict:
+    LLM_REQUESTS.inc()
+    try:
+        with timed('llm'):
+            response = await get_governor().acall(
+                lambda: get_async_client().chat.completions.create(**completion_request(prompt)), **governed(prompt))
+        return parse_completion(response)
+    except Exception:
+        LLM_ERRORS.inc()
+        raise
+
+
+async def _aextract_once(cache_key: str, compute) -> dict:
+    async def leader():
+        # A call for this key may have finished between the caller's cache miss and now
+        payload = await LLMExtraction.objects.filter(cache_key=cache_key).values_list('payload', flat=True).afirst()
+        if payload is not None:
+            return payload
+        payload = await compute()
+        await sync_to_async(extraction_cache.set)(cache_key, payload, LLM_MODEL, PROMPT_VERSION)
+        return payload
+
+    return await allm_flight.do(cache_key, leader)
+
+
+async def aextract_job_requirements(job_description: str) -> dict:
+    cache_key, prompt = job_requirements_prompt(job_description)
+    cached = await sync_to_async(extraction_cache.get)(cache_key)
+    if cached is not None:
+        return cached
+
+    async def compute():
+        return job_requirements_from(await _acomplete_json(prompt), job_description)
+
+    return await _aextract_once(cache_key, compute)
+
+
+async def aensure_job_requirements(job: JobDesCription) -> dict:
+    if job.requirements_current:
+        return job.requirements
+
+    async def update():
+        set_job_requirements(job, await aextract_job_requirements(job.job_description))
+        await job.asave(update_fields=REQUIREMENTS_FIELDS)
+        return job.requirements
+
+    # Every request for a newly edited job arrives with its own stale copy; only one saves it
+    return await ajob_flight.do((job.id, job.compute_content_hash()), update)
+
+
+async def aextract_resume_data(resume_text: str, job_requirements: dict) -> dict:
+    cache_key, prompt = resume_extraction_prompt(resume_text, job_requirements)
+    extraction = await sync_to_async(extraction_cache.get)(cache_key)
+    if extraction is None:
+        extraction = await _aextract_once(cache_key, lambda: _acomplete_json(prompt))
+    return resume_data_from(extraction, resume_text)
+
+
+async def aanalyze_resume_with_llm(resume_text: str, job_description) -> dict:
+    async def analyze():
+        if isinstance(job_description, JobDesCription):
+            job_requirements = await aensure_job_requirements(job_description)
+        else:
+            job_requirements = await aextract_job_requirements(job_description)
+        data = await aextract_resume_data(resume_text, job_requirements)
+        return score_extraction({**data, **job_requirements}, job_skill_vectors(job_description))
+
+    try:
+        return await aanalysis_flight.do(analysis_key(resume_text, job_description), analyze)
+    except Exception as e:
+        return await sync_to_async(analysis_fallback, thread_sensitive=False)(e, resume_text, job_description)
+
+
+async def aanalyze_resume(resume_text: str, job_description) -> dict:
+    """`analyze_resume` without blocking the loop on the LLM.
+
+    Only the llm mode has a native async path. The local engine is CPU-bound and hybrid makes at
+    most one suggestions call, so both run in a worker thread.
+    """
+    if settings.ANALYSIS_MODE == 'llm':
+        ANALYSIS_ENGINE.inc(engine='llm')
+        return await aanalyze_resume_with_llm(resume_text, job_description)
+    return await sync_to_async(analyze_resume, thread_sensitive=False)(resume_text, job_description)
+
+
+async def aprocess_resume(data: bytes, job_description, content_hash: str) -> dict:
+    try:
+        with timed('extract'):
+            resume_text = await aget_resume_text(data, content_hash)
+        return await aanalyze_resume(resume_text, job_description)
+    except Exception as e:
+        return processing_fallback(e, content_hash)
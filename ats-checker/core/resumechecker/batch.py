@@ -0,0 +1,187 @@
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.db import connection
+
+from .analyzer import (analyze_resume, compute_content_hash, ensure_job_requirements, extraxt_text_from_pdf,
+                       job_requirements_for)
+from .models import ResumeText
+
+logger = logging.getLogger(__name__)
+
+
+class BatchUploadError(ValueError):
+    pass
+
+
+class SpooledPDF(str):
+    """Path of a temporary copy of a large PDF from an archive, deleted by `release_uploads`."""
+
+
+def _too_large(filename):
+    return BatchUploadError(f"{filename} is larger than {settings.BATCH_MAX_FILE_SIZE} bytes")
+
+
+def collect_uploads(files, archive=None):
+    """Return (filename, source) pairs from uploaded PDFs and an optional ZIP of PDFs.
+
+    A source is the PDF's bytes, or the path of a copy on disk for files larger than
+    FILE_UPLOAD_MAX_MEMORY_SIZE, so a batch never holds every large PDF in memory at once.
+    """
+    uploads = []
+    try:
+        for f in files:
+            if f.size > settings.BATCH_MAX_FILE_SIZE:
+                raise _too_large(f.name)
+            # Django has already spooled large multipart files to disk
+            path = f.temporary_file_path() if hasattr(f, 'temporary_file_path') else None
+            uploads.append((f.name, path or f.read()))
+        if archive is not None:
+            try:
+                with zipfile.ZipFile(archive) as zf:
+                    for info in zf.infolist():
+                        if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+                            continue
+                        if info.file_size > settings.BATCH_MAX_FILE_SIZE:
+                            raise _too_large(info.filename)
+                        uploads.append((info.filename, _read_entry(zf, info)))
+                        if len(uploads) > settings.BATCH_MAX_FILES:
+                            break
+            except zipfile.BadZipFile:
+                raise BatchUploadError("Archive is not a valid ZIP file")
+        if not uploads:
+            raise BatchUploadError("No PDF resumes were uploaded")
+        if len(uploads) > settings.BATCH_MAX_FILES:
+            raise BatchUploadError(f"At most {settings.BATCH_MAX_FILES} resumes can be ranked at once")
+    except BaseException:
+        release_uploads(uploads)
+        raise
+    return uploads
+
+
+def _read_entry(zf, info):
+    if info.file_size <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+        return zf.read(info)
+    with zf.open(info) as src, tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as dst:
+        shutil.copyfileobj(src, dst)
+    return SpooledPDF(dst.name)
+
+
+def release_uploads(uploads):
+    """Delete the temporary copies made by `collect_uploads`."""
+    for _, source in uploads:
+        if isinstance(source, SpooledPDF):
+            try:
+                os.unlink(source)
+            except FileNotFoundError:
+                pass
+
+
+def _extract_pdf(source):
+    return extraxt_text_from_pdf(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _analyze(resume_text, job):
+    try:
+        return analyze_resume(resume_text, job)
+    finally:
+        connection.close()
+
+
+def _line(payload):
+    return json.dumps(payload) + '\n'
+
+
+def _analyze_uploads(uploads, job, results):
+    """Yield result and error lines for each upload as it finishes, appending results to `results`."""
+    # Spawned, not forked, as in async_analyzer: under ASGI this process runs an event loop and threads
+    pdf_pool = ProcessPoolExecutor(max_workers=settings.BATCH_PDF_WORKERS, initializer=django.setup,
+                                   mp_context=multiprocessing.get_context('spawn'))
+    llm_pool = ThreadPoolExecutor(max_workers=settings.BATCH_LLM_CONCURRENCY)
+    try:
+        parsing, analyzing = {}, {}
+        for filename, source in uploads:
+            content_hash = compute_content_hash(source)
+            cached = ResumeText.objects.filter(content_hash=content_hash).values_list('text', flat=True).first()
+            if cached is not None:
+                analyzing[llm_pool.submit(_analyze, cached, job)] = filename
+            else:
+                parsing[pdf_pool.submit(_extract_pdf, source)] = (filename, content_hash)
+
+        while parsing or analyzing:
+            done, _ = wait(list(parsing) + list(analyzing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    filename, content_hash = parsing.pop(future)
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        logger.error("Error extracting %s: %s", filename, e)
+                        yield _line({'type': 'error', 'filename': filename, 'message': f'Could not read PDF: {e}'})
+                        continue
+                    ResumeText.objects.get_or_create(content_hash=content_hash, defaults={'text': text})
+                    analyzing[llm_pool.submit(_analyze, text, job)] = filename
+                else:
+                    filename = analyzing.pop(future)
+                    try:
+                        result = {'filename': filename, **future.result()}
+                    except Exception as e:
+                        logger.error("Error analyzing %s: %s", filename, e)
+                        yield _line({'type': 'error', 'filename': filename, 'message': f'Could not analyze resume: {e}'})
+                        continue
+                    results.append(result)
+                    yield _line({'type': 'result', **result})
+    finally:
+        # Also reached when the client disconnects: drop queued parses and LLM calls instead of
+        # waiting for them (calls already running finish in the background)
+        pdf_pool.shutdown(wait=False, cancel_futures=True)
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def rank_resumes(uploads, job):
+    """Yield one NDJSON line per analyzed resume as soon as it finishes, then a ranked summary.
+
+    Uncached PDFs are parsed in a process pool; LLM extraction runs in a thread pool bounded
+    by BATCH_LLM_CONCURRENCY and starts for each resume as soon as its text is available. A
+    resume that cannot be read or analyzed gets an error line, and the summary always comes last.
+    """
+    results = []
+    try:
+        try:
+            # Loaded once here rather than by every resume's analysis. The LLM engine needs the LLM's
+            # requirements, so a failure there stops the batch; the others fall back to local ones
+            mode = settings.ANALYSIS_MODE
+            if mode == 'llm':
+                ensure_job_requirements(job)
+            else:
+                job_requirements_for(job, use_llm=mode != 'local')
+        except Exception as e:
+            # The response has already started, so the failure is reported in the stream
+            logger.error("Could not load requirements of job %s: %s", job.id, e)
+            yield _line({'type': 'error', 'filename': None, 'message': f'Could not load job requirements: {e}'})
+        else:
+            yield from _analyze_uploads(uploads, job, results)
+    finally:
+        release_uploads(uploads)
+
+    ranking = sorted(results, key=lambda r: r['rank'], reverse=True)
+    yield _line({
+        'type': 'summary',
+        'job_id': job.id,
+        'job_title': job.job_title,
+        'total': len(uploads),
+        'analyzed': len(results),
+        'ranking': [
+            {'position': i, 'filename': r['filename'], 'rank': r['rank']}
+            for i, r in enumerate(ranking, start=1)
+        ],
+    })
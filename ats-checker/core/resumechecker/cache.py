@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import LLMExtraction
+
+
+def make_cache_key(*parts) -> str:
+    """Stable SHA-256 key over the given parts, separated so that ('ab', 'c') != ('a', 'bc')."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=512, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class ExtractionCache:
+    """Two-tier cache for raw LLM extraction JSON: in-process LRU backed by the LLMExtraction table."""
+
+    def __init__(self, memory: LRUCache):
+        self.memory = memory
+        self.db_hits = 0
+        self.db_misses = 0
+
+    def get(self, key):
+        payload = self.memory.get(key)
+        if payload is not None:
+            return payload
+        payload = LLMExtraction.objects.filter(cache_key=key).values_list('payload', flat=True).first()
+        if payload is None:
+            self.db_misses += 1
+            return None
+        self.db_hits += 1
+        self.memory.set(key, payload)
+        return payload
+
+    def set(self, key, payload, model_name, prompt_version):
+        LLMExtraction.objects.update_or_create(
+            cache_key=key,
+            defaults={'payload': payload, 'model_name': model_name, 'prompt_version': prompt_version},
+        )
+        self.memory.set(key, payload)
+
+    def stats(self) -> dict:
+        return {
+            'memory': self.memory.stats(),
+            'db_hits': self.db_hits,
+            'db_misses': self.db_misses,
+        }
+
+
+extraction_cache = ExtractionCache(LRUCache(settings.LLM_CACHE_SIZE, settings.LLM_CACHE_TTL))
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+from .models import CatalogueDeletion, JobDesCription
+from .serializer import JobDescriptionSerializer
+
+COMPACT_FIELDS = ['id', 'job_title']
+
+_accepts_gzip = _lazy_re_compile(r"\bgzip\b")
+
+
+class RenderedJSON:
+    """A JSON response body rendered once, with its gzipped copy and conditional-GET validators."""
+
+    def __init__(self, payload, last_modified=None):
+        self.body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+        self.gzipped = compress_string(self.body)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.last_modified = int(last_modified.timestamp()) if last_modified else None
+        self.built_at = time.monotonic()
+
+
+def conditional_json_response(request, rendered):
+    """Serve a RenderedJSON as 304 when the client's copy is current, gzipped when it accepts gzip."""
+    gzip = bool(_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    # The gzipped body is a different representation, so it gets its own ETag
+    etag = f'{rendered.etag[:-1]}-gzip"' if gzip else rendered.etag
+    response = get_conditional_response(request, etag=etag, last_modified=rendered.last_modified)
+    if response is None:
+        response = HttpResponse(rendered.gzipped if gzip else rendered.body, content_type='application/json')
+        if gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.headers['ETag'] = etag
+    if rendered.last_modified:
+        response.headers['Last-Modified'] = http_date(rendered.last_modified)
+    # Let browsers keep a copy but always revalidate it, which is a cheap 304 when nothing changed
+    response.headers['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def record_deletion():
+    CatalogueDeletion.objects.update_or_create(pk=1, defaults={'deleted_at': timezone.now()})
+
+
+def render_catalogue(view):
+    jobs = JobDesCription.objects.order_by('id')
+    if view == 'compact':
+        data = list(jobs.values(*COMPACT_FIELDS))
+    else:
+        data = JobDescriptionSerializer(jobs, many=True).data
+    changes = [JobDesCription.objects.aggregate(last=Max('updated_at'))['last'],
+               CatalogueDeletion.objects.values_list('deleted_at', flat=True).first()]
+    last_modified = max((c for c in changes if c), default=None)
+    return RenderedJSON({'status': True, 'data': data}, last_modified)
+
+
+class CatalogueCache:
+    """Per-process cache of the rendered /api/jobs/ listing, one entry per view (full or compact).
+
+    Entries are dropped by the JobDesCription save/delete signals. Saves made in another process
+    do not reach this one, so entries also expire after CATALOGUE_CACHE_TTL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, view):
+        with self._lock:
+            entry = self._entries.get(view)
+            if entry is not None and time.monotonic() - entry.built_at < settings.CATALOGUE_CACHE_TTL:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self._generation
+        entry = render_catalogue(view)
+        with self._lock:
+            # A save that landed while rendering may not be in this entry, so only keep it if none did
+            if generation == self._generation:
+                self._entries[view] = entry
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+catalogue_cache = CatalogueCache()
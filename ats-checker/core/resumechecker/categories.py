@@ -0,0 +1,74 @@
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from .matcher import KeywordMatcher
+
+PROJECT_TAXONOMY_PATH = Path(__file__).resolve().parent / 'data' / 'project_categories.json'
+DEFAULT_CATEGORY = 'General Software Development'
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def _words(text: str) -> list:
+    return _WORD_RE.findall(text.lower())
+
+
+class ProjectCategorizer:
+    """Maps project descriptions to taxonomy categories on whole-word keyword matches.
+
+    Each project is tokenized once. Single-word keywords are found with one set intersection
+    against the project's words, and multi-word keywords ("machine learning", "ci/cd") with a
+    phrase trie that only runs when a phrase's first word occurs. Cost does not grow with the
+    number of keywords in the taxonomy. The plural of each keyword, and of a phrase's last word, is
+    added to the tables up front ("apps", "databases", "neural networks"), unless it is a keyword
+    word itself ("aws").
+    """
+
+    def __init__(self, taxonomy: dict):
+        self.order = tuple(taxonomy)
+        words, phrases = {}, {}
+        for category, keywords in taxonomy.items():
+            for keyword in keywords:
+                tokens = _words(keyword)
+                if tokens:
+                    target = words if len(tokens) == 1 else phrases
+                    target.setdefault(" ".join(tokens), set()).add(category)
+        vocabulary = set(words) | {word for phrase in phrases for word in phrase.split()}
+        for table in (words, phrases):
+            for keyword, categories in list(table.items()):
+                if keyword.rsplit(" ", 1)[-1] + 's' not in vocabulary:
+                    table.setdefault(keyword + 's', set()).update(categories)
+        self._words = {word: frozenset(categories) for word, categories in words.items()}
+        self._word_set = frozenset(self._words)
+        self._phrase_starts = frozenset(phrase.split()[0] for phrase in phrases)
+        self._phrases = KeywordMatcher({p: frozenset(c) for p, c in phrases.items()}, tokenizer=_words)
+
+    def categorize(self, projects: list) -> list:
+        found = set()
+        for project in projects:
+            tokens = _words(str(project))
+            for word in self._word_set.intersection(tokens):
+                found |= self._words[word]
+            if not self._phrase_starts.isdisjoint(tokens):
+                for categories in self._phrases.scan(tokens):
+                    found |= categories
+        return [c for c in self.order if c in found] or [DEFAULT_CATEGORY]
+
+
+@lru_cache(maxsize=None)
+def load_categorizer(path=PROJECT_TAXONOMY_PATH) -> ProjectCategorizer:
+    with open(path, encoding='utf-8') as f:
+        return ProjectCategorizer(json.load(f))
+
+
+def categorize_projects(projects: list) -> list:
+    """Categorize projects into domains"""
+    return load_categorizer().categorize(projects)
+
+
+def categorize_projects_batch(project_lists: list) -> list:
+    """Categorize many candidates' projects at once with a single compiled categorizer."""
+    categorize = load_categorizer().categorize
+    return [categorize(projects) for projects in project_lists]
@@ -0,0 +1,199 @@
+"""Shrink resume and job description text before it is pasted into an LLM prompt.
+
+Compaction runs in three passes, each only as aggressive as it needs to be:
+
+1. whitespace is collapsed and blank-line runs squeezed;
+2. page furniture (running headers/footers, page numbers) is removed;
+3. if the text is still over its token budget, whole low-value sections
+   (references, hobbies, "About the company", benefits, ...) are dropped, then
+   the longest remaining sections are trimmed from the end.
+
+Local skill scanning still runs on the full text, so trimming only ever costs the
+LLM context, never the skills that `find_skills` would have found.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PAGE_BREAK = '\f'
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"[ \t\u00a0\u200b]+")
+# "3", "- 3 -", "(3)", "3/5", "3 of 5" and "Page 3 (of 5)"; never four digits, which are usually years
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*\d{1,3}(?:\s*\(?of\s*\d{1,3}\)?)?|[-–(]?\s*\d{1,3}\s*[-–)]?"
+                             r"|\d{1,3}\s*(?:/|of)\s*\d{1,3})$", re.IGNORECASE)
+
+# Section headings by how much the extraction prompt needs them. Sections not listed keep priority 1.
+SECTION_PRIORITIES = {
+    'resume': {
+        0: ['references', 'hobbies', 'interests', 'personal details', 'personal information',
+            'declaration', 'languages known', 'extracurricular activities'],
+        2: ['skills', 'technical skills', 'core competencies', 'experience', 'work experience',
+            'professional experience', 'employment history', 'projects', 'education'],
+    },
+    'job': {
+        0: ['about the job', 'about the company', 'about us', 'who we are', 'our culture', 'benefits',
+            'perks', 'what we offer', 'equal opportunity', 'equal opportunity employer', 'how to apply',
+            'compensation', 'salary'],
+        2: ['requirements', 'qualifications', 'required skills', 'skills', 'what you bring',
+            'responsibilities', 'what you will do', 'must have', 'nice to have', 'preferred qualifications'],
+    },
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count: one per word or punctuation mark, plus one per 6 extra characters."""
+    return sum(1 + len(piece) // 6 for piece in _TOKEN_RE.findall(text))
+
+
+def _clean_lines(page: str) -> list:
+    return [_SPACE_RE.sub(' ', line).strip() for line in page.splitlines()]
+
+
+def _furniture_key(line: str) -> str:
+    return _DIGITS_RE.sub('#', line.lower())
+
+
+def _strip_furniture(pages: list) -> list:
+    """Drop page numbers, and header/footer lines that repeat at the edges of most pages."""
+    edge = 2
+    if len(pages) > 1:
+        counts = Counter()
+        for lines in pages:
+            content = [line for line in lines if line]
+            counts.update({_furniture_key(line) for line in content[:edge] + content[-edge:]})
+        repeated = {key for key, n in counts.items() if n >= max(2, len(pages) // 2 + 1)}
+    else:
+        repeated = set()
+
+    kept, seen = [], set()
+    for lines in pages:
+        for line in lines:
+            key = _furniture_key(line)
+            if _PAGE_NUMBER_RE.match(line):
+                continue
+            if key in repeated:
+                # Keep the first copy: a running header is usually the candidate's name or the job title
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+    return kept
+
+
+def _squeeze_blank_lines(lines: list) -> list:
+    squeezed = []
+    for line in lines:
+        if line or (squeezed and squeezed[-1]):
+            squeezed.append(line)
+    while squeezed and not squeezed[-1]:
+        squeezed.pop()
+    return squeezed
+
+
+def _heading_key(line: str) -> str:
+    return line.strip(' :-–#*').lower()
+
+
+def _section_priority(line: str, priorities: dict):
+    """Return the priority of a line that is a section heading, or None for body text."""
+    if len(line) > 40:
+        return None
+    key = _heading_key(line)
+    for priority, headings in priorities.items():
+        if key in headings:
+            return priority
+    if line.isupper() and any(c.isalpha() for c in line):
+        return 1
+    return None
+
+
+def _split_sections(lines: list, priorities: dict) -> list:
+    sections = [{'heading': '', 'priority': 2, 'lines': []}]  # text before the first heading: name, contact, title
+    for line in lines:
+        priority = _section_priority(line, priorities) if line else None
+        if priority is None:
+            sections[-1]['lines'].append(line)
+        else:
+            sections.append({'heading': line, 'priority': priority, 'lines': [line]})
+    return sections
+
+
+def _sections_tokens(sections: list) -> int:
+    return sum(section['tokens'] for section in sections)
+
+
+def _fit_to_budget(sections: list, budget: int) -> list:
+    """Drop the lowest-priority sections, then trim the longest ones, until the text fits the budget."""
+    for section in sections:
+        section['tokens'] = estimate_tokens('\n'.join(section['lines']))
+    dropped = []
+    for section in sorted((s for s in sections if s['priority'] == 0), key=lambda s: -s['tokens']):
+        if _sections_tokens(sections) <= budget:
+            break
+        sections.remove(section)
+        dropped.append(_heading_key(section['heading']))
+
+    while _sections_tokens(sections) > budget:
+        trimmable = [s for s in sections if len(s['lines']) > 1]
+        if not trimmable:
+            break
+        # Weighted by priority, so skills and experience are the last to lose lines
+        longest = max(trimmable, key=lambda s: (s['tokens'] / (s['priority'] + 1), s['tokens']))
+        removed = longest['lines'].pop()
+        longest['tokens'] -= estimate_tokens(removed)
+    return dropped
+
+
+class CompactionStats:
+    """Running totals of prompt tokens before and after compaction, per prompt kind."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, kind, before, after):
+        with self._lock:
+            totals = self._totals.setdefault(kind, {'requests': 0, 'tokens_before': 0, 'tokens_after': 0})
+            totals['requests'] += 1
+            totals['tokens_before'] += before
+            totals['tokens_after'] += after
+
+    def stats(self):
+        with self._lock:
+            return {kind: dict(totals) for kind, totals in self._totals.items()}
+
+
+compaction_stats = CompactionStats()
+
+
+def compact_text(text: str, budget: int = 0, kind: str = 'resume') -> tuple:
+    """Return (compacted text, report) for a resume (kind='resume') or job description (kind='job').
+
+    Pages are expected to be separated by form feeds, as `pdf.extract_text` does. A budget of 0
+    only cleans the text. The report holds estimated token counts before and after, and the
+    headings of any dropped sections.
+    """
+    pages = [_clean_lines(page) for page in text.split(PAGE_BREAK)]
+    lines = _squeeze_blank_lines(_strip_furniture(pages))
+
+    dropped = []
+    if budget and estimate_tokens('\n'.join(lines)) > budget:
+        sections = _split_sections(lines, SECTION_PRIORITIES[kind])
+        dropped = _fit_to_budget(sections, budget)
+        lines = _squeeze_blank_lines([line for section in sections for line in section['lines']])
+
+    compacted = '\n'.join(lines)
+    report = {
+        'tokens_before': estimate_tokens(text),
+        'tokens_after': estimate_tokens(compacted),
+        'dropped_sections': dropped,
+    }
+    compaction_stats.record(kind, report['tokens_before'], report['tokens_after'])
+    logger.info("Compacted %s prompt text: %s -> %s tokens%s", kind, report['tokens_before'],
+                report['tokens_after'], f" (dropped {', '.join(dropped)})" if dropped else '')
+    return compacted, report
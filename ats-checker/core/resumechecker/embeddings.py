@@ -0,0 +1,162 @@
+"""Skill embeddings for semantic skill matching (SKILL_MATCHING=semantic).
+
+Exact matching gives no credit for a job skill the resume names differently ("Docker Compose" for
+Docker, "Python 3" for Python). Semantic matching also counts a job skill as matched when a resume
+skill's embedding is close enough to it (SKILL_SIMILARITY_THRESHOLD). A skill is embedded from
+its normalized name as:
+
+- hashed character 3-5-grams and whole words, 256 dimensions of signed feature hashing with
+  every word weighted equally, so spelling variants and qualified names ("Redis Cluster",
+  "Python 3.12") land close to the bare skill;
+- and, when SPACY_MODEL is a model with word vectors (en_core_web_md, en_core_web_lg), the
+  average of its word vectors, which relates different words for the same thing.
+
+Each part is unit length, and two skills are as similar as the larger cosine of the two parts.
+Two different skills that are both in the skill catalogue never match: the catalogue already
+says they are different things (Java and JavaScript, SQL and NoSQL).
+
+Vectors are cached per process in a bounded LRU (SKILL_VECTOR_CACHE_SIZE). A catalogue job's
+matrix is computed when its requirements are saved and stored on the job (`skill_vectors`),
+along with a key over the embedder and skills that tells when it is stale.
+"""
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+from .cache import LRUCache, make_cache_key
+from .local_engine import get_nlp
+from .models import JobDesCription
+from .skills import load_aliases, normalize_skill
+
+NGRAM_DIM = 256
+NGRAM_SIZES = (3, 4, 5)
+# Bump when the n-gram embedding changes, so stored job matrices are recomputed
+EMBEDDING_VERSION = 1
+
+# Vectors only change with SPACY_MODEL, which is fixed for the life of the process
+skill_vector_cache = LRUCache(settings.SKILL_VECTOR_CACHE_SIZE, ttl=365 * 24 * 3600)
+
+
+@lru_cache(maxsize=None)
+def word_vectors():
+    """The spaCy pipeline whose word vectors are used, or None when SPACY_MODEL has none."""
+    nlp = get_nlp()
+    return nlp if nlp.vocab.vectors.shape[0] else None
+
+
+@lru_cache(maxsize=None)
+def embedder_name() -> str:
+    nlp = word_vectors()
+    name = f"ngram{NGRAM_DIM}-v{EMBEDDING_VERSION}"
+    return f"{name}+{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}" if nlp else name
+
+
+@lru_cache(maxsize=None)
+def _catalogue_keys() -> frozenset:
+    aliases, _ = load_aliases()
+    return frozenset(canonical.lower() for canonical in aliases.values())
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@lru_cache(maxsize=None)
+def _word_vector(word: str) -> np.ndarray:
+    vector = np.zeros(NGRAM_DIM, dtype=np.float32)
+    padded = f"<{word}>"
+    features = [f"w:{word}"]
+    for n in NGRAM_SIZES:
+        features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    for feature in features:
+        h = zlib.crc32(feature.encode('utf-8'))  # stable across processes, unlike hash()
+        vector[h % NGRAM_DIM] += 1.0 if h & 0x80000000 else -1.0
+    return _unit(vector)
+
+
+def _ngram_vector(key: str) -> np.ndarray:
+    # Words are weighted equally whatever their length, so "redis cluster" is as close to "redis"
+    # as "python 3.12" is to "python"
+    words = key.split()
+    if not words:
+        return np.zeros(NGRAM_DIM, dtype=np.float32)
+    return _unit(np.sum([_word_vector(word) for word in words], axis=0))
+
+
+def _embed(key: str) -> np.ndarray:
+    nlp = word_vectors()
+    if nlp is None:
+        return _ngram_vector(key)
+    return np.concatenate([_ngram_vector(key), _unit(nlp.make_doc(key).vector.astype(np.float32))])
+
+
+def skill_vector(key: str) -> np.ndarray:
+    """The embedding of a normalized skill name, from the LRU when it was seen recently."""
+    vector = skill_vector_cache.get(key)
+    if vector is None:
+        vector = _embed(key)
+        skill_vector_cache.set(key, vector)
+    return vector
+
+
+def skill_keys(skills) -> list:
+    """Normalized skill names without duplicates, in first-seen order: the rows of a skill matrix."""
+    return list(dict.fromkeys(normalize_skill(s) for s in skills))
+
+
+def embed_skills(keys: list) -> np.ndarray:
+    if not keys:
+        return np.zeros((0, len(skill_vector(''))), dtype=np.float32)
+    return np.vstack([skill_vector(key) for key in keys])
+
+
+def skill_vectors_key(keys: list) -> str:
+    return make_cache_key(embedder_name(), *keys)
+
+
+def job_skill_vectors(job):
+    """The stored skill matrix of a catalogue job, or None when matching is exact, the job is
+    free text or the stored matrix is missing or stale."""
+    if settings.SKILL_MATCHING != 'semantic' or not isinstance(job, JobDesCription) or not job.skill_vectors:
+        return None
+    keys = skill_keys(job.required_skills)
+    if job.skill_vectors_key != skill_vectors_key(keys):
+        return None
+    return np.frombuffer(bytes(job.skill_vectors), dtype=np.float32).reshape(len(keys), -1)
+
+
+def store_job_skill_vectors(job):
+    """Compute a job's skill matrix and save it without touching the rest of the row."""
+    keys = skill_keys(job.required_skills) if job.requirements_current else []
+    job.skill_vectors = embed_skills(keys).tobytes()
+    job.skill_vectors_key = skill_vectors_key(keys) if keys else ''
+    JobDesCription.objects.filter(pk=job.pk).update(skill_vectors=job.skill_vectors,
+                                                    skill_vectors_key=job.skill_vectors_key)
+
+
+def matched_job_skills(job_skills, resume_skills, job_vectors=None, threshold=None) -> np.ndarray:
+    """Boolean mask over `skill_keys(job_skills)`: whether the resume has each job skill or one close enough.
+
+    `job_vectors` is the job's stored matrix (`job_skill_vectors`); without it the job's skills
+    are embedded here.
+    """
+    job_keys, resume_keys = skill_keys(job_skills), skill_keys(resume_skills)
+    resume_set = set(resume_keys)
+    exact = np.fromiter((key in resume_set for key in job_keys), dtype=bool, count=len(job_keys))
+    if not job_keys or not resume_keys or exact.all():
+        return exact
+    threshold = settings.SKILL_SIMILARITY_THRESHOLD if threshold is None else threshold
+    jobs = job_vectors if job_vectors is not None else embed_skills(job_keys)
+    resumes = embed_skills(resume_keys)
+    # Rows are unit length per part, so these products are cosine similarities
+    similarity = jobs[:, :NGRAM_DIM] @ resumes[:, :NGRAM_DIM].T
+    if jobs.shape[1] > NGRAM_DIM:
+        similarity = np.maximum(similarity, jobs[:, NGRAM_DIM:] @ resumes[:, NGRAM_DIM:].T)
+    known = _catalogue_keys()
+    job_known = np.fromiter((key in known for key in job_keys), dtype=bool, count=len(job_keys))
+    resume_known = np.fromiter((key in known for key in resume_keys), dtype=bool, count=len(resume_keys))
+    similarity[np.outer(job_known, resume_known)] = 0
+    return exact | (similarity >= threshold).any(axis=1)
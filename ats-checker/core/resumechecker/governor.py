@@ -0,0 +1,397 @@
+"""Admission control for LLM calls: rate limits, adaptive concurrency, retries and a circuit breaker.
+
+Every completion goes through `LLMGovernor.call`, which
+
+1. waits for the request and token buckets sized to the Groq per-minute quotas,
+2. waits for a slot under an AIMD concurrency limit: +1/limit per success, halved on a 429
+   or timeout (at most once per `decrease_interval`),
+3. retries rate-limit, timeout, connection and 5xx errors with full-jitter exponential backoff,
+   honouring Retry-After, and
+4. counts consecutive failed calls in a circuit breaker. While the breaker is open, calls fail
+   at once with `LLMUnavailable` instead of queueing behind a failing API.
+
+`LLMGovernor.acall` does the same for coroutines, so async views and threads in one process share
+the same quotas, limit and breaker.
+
+Limits are per process: divide the account quota by the number of worker processes.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from .metrics import (LLM_CIRCUIT_STATE, LLM_CONCURRENCY_LIMIT, LLM_RATE_LIMIT_WAIT_SECONDS, LLM_REJECTED,
+                      LLM_RETRIES)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not be called: circuit open, rate limit wait too long, or retries exhausted."""
+
+
+def classify_error(error):
+    """Return a short reason for a retryable LLM error, or None if retrying cannot help."""
+    status = getattr(error, 'status_code', None)
+    if status == 429:
+        return 'rate_limited'
+    if status in RETRYABLE_STATUS:
+        return 'server_error'
+    try:
+        import groq
+        if isinstance(error, groq.APITimeoutError):
+            return 'timeout'
+        if isinstance(error, groq.APIConnectionError):
+            return 'connection'
+    except ImportError:
+        pass
+    if isinstance(error, TimeoutError):
+        return 'timeout'
+    return None
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait, from a Retry-After header, or None."""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('retry-after') if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` tokens a minute up to `capacity`; callers sleep off any debt `reserve` reports."""
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        """Take `amount` tokens now, going into debt if needed; returns the seconds until the debt is repaid."""
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount):
+        """Return tokens reserved for a call that used fewer than estimated (or charge more if negative)."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AIMDLimiter:
+    """A concurrency limit that grows by one per `limit` successes and halves on overload."""
+
+    def __init__(self, initial, minimum=1, maximum=64, decrease_interval=2.0, clock=time.monotonic):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+        self._clock = clock
+        self._last_decrease = float('-inf')
+        self._cond = threading.Condition()
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    def acquire(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self, timeout=None, poll_interval=0.01):
+        """`acquire` for coroutines: polls instead of blocking the event loop on the condition."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll_interval)
+
+    def release(self, overloaded=False):
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                now = self._clock()
+                # One burst of 429s is one congestion signal, not one halving per failed request
+                if now - self._last_decrease >= self.decrease_interval:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            LLM_CONCURRENCY_LIMIT.set(self.limit)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state):
+        self.state = state
+        LLM_CIRCUIT_STATE.set({self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[state])
+
+    def allow(self):
+        """Whether a call may go through now. While half-open only one probe call is let through."""
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        """Let another probe through if the current one ended without a success or failure."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                logger.info("LLM circuit closed")
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("LLM circuit opened after %s consecutive failures", self.failures)
+                self._opened_at = self._clock()
+                self._set_state(self.OPEN)
+
+
+class LLMGovernor:
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, initial_concurrency=4, max_concurrency=32,
+                 max_retries=3, backoff_base=0.5, backoff_cap=20.0, max_wait=30.0,
+                 failure_threshold=5, reset_timeout=30.0, sleep=time.sleep):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.limiter = AIMDLimiter(initial_concurrency, maximum=max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_wait = max_wait
+        self._sleep = sleep
+
+    def _reserve_quota(self, estimated_tokens):
+        """Take one request and the estimated tokens from the buckets; returns the seconds to wait first."""
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        if wait > self.max_wait:
+            if self.requests:
+                self.requests.refund(1)
+            if self.tokens:
+                self.tokens.refund(estimated_tokens)
+            LLM_REJECTED.inc(reason='quota')
+            raise LLMUnavailable(f"LLM quota exhausted for the next {wait:.0f}s")
+        if wait:
+            LLM_RATE_LIMIT_WAIT_SECONDS.observe(wait)
+        return wait
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        server_delay = retry_after(error)
+        return max(delay, server_delay) if server_delay is not None else delay
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            LLM_REJECTED.inc(reason='circuit_open')
+            raise LLMUnavailable("LLM circuit breaker is open")
+
+    def _retry_delay(self, attempt, error):
+        """Seconds to wait before retrying after `error`, or raise if the call should not be retried."""
+        reason = classify_error(error)
+        if reason is None:
+            # The API answered, but retrying this request (bad request, auth) will not help
+            self.breaker.record_success()
+            raise error
+        if attempt >= self.max_retries:
+            self.breaker.record_failure()
+            raise LLMUnavailable(f"LLM call failed after {attempt + 1} attempts: {error}") from error
+        LLM_RETRIES.inc(reason=reason)
+        delay = self._backoff(attempt, error)
+        logger.warning("LLM call failed (%s), retry %s in %.2fs", reason, attempt + 1, delay)
+        return delay
+
+    def _succeeded(self, result, estimated_tokens, used_tokens):
+        self.breaker.record_success()
+        if self.tokens and used_tokens is not None:
+            used = used_tokens(result)
+            if used is not None:
+                self.tokens.refund(estimated_tokens - used)
+
+    def call(self, fn, estimated_tokens=0, used_tokens=None):
+        """Run `fn()` under the quotas, concurrency limit, retry policy and circuit breaker.
+
+        `used_tokens(result)` may return the tokens the call actually used, to correct the
+        token bucket for the difference from `estimated_tokens`.
+        """
+        self._check_circuit()
+        try:
+            return self._call_with_retries(fn, estimated_tokens, used_tokens)
+        finally:
+            self.breaker.release_probe()
+
+    def _call_with_retries(self, fn, estimated_tokens, used_tokens):
+        attempt = 0
+        while True:
+            wait = self._reserve_quota(estimated_tokens)
+            if wait:
+                self._sleep(wait)
+            if not self.limiter.acquire(timeout=self.max_wait):
+                LLM_REJECTED.inc(reason='concurrency')
+                raise LLMUnavailable("Timed out waiting for an LLM concurrency slot")
+            overloaded = False
+            try:
+                result = fn()
+            except Exception as e:
+                overloaded = classify_error(e) in ('rate_limited', 'timeout')
+                delay = self._retry_delay(attempt, e)
+            else:
+                self._succeeded(result, estimated_tokens, used_tokens)
+                return result
+            finally:
+                self.limiter.release(overloaded=overloaded)
+            self._sleep(delay)
+            attempt += 1
+
+    def stream(self, fn, estimated_tokens=0):
+        """`call` for streamed completions: yields the chunks of the stream `fn()` opens.
+
+        Only opening the stream is retried; once chunks have been handed out, an error ends the
+        stream. The concurrency slot is held until the stream is exhausted or closed, and the
+        estimated tokens stay charged since a stream reports no usage up front.
+        """
+        self._check_circuit()
+        try:
+            attempt = 0
+            while True:
+                wait = self._reserve_quota(estimated_tokens)
+                if wait:
+                    self._sleep(wait)
+                if not self.limiter.acquire(timeout=self.max_wait):
+                    LLM_REJECTED.inc(reason='concurrency')
+                    raise LLMUnavailable("Timed out waiting for an LLM concurrency slot")
+                overloaded = False
+                try:
+                    try:
+                        chunks = fn()
+                    except Exception as e:
+                        overloaded = classify_error(e) in ('rate_limited', 'timeout')
+                        delay = self._retry_delay(attempt, e)
+                    else:
+                        try:
+                            yield from chunks
+                        except Exception as e:
+                            overloaded = classify_error(e) in ('rate_limited', 'timeout')
+                            if classify_error(e) is not None:
+                                self.breaker.record_failure()
+                            raise
+                        finally:
+                            close = getattr(chunks, 'close', None)
+                            if close is not None:
+                                close()
+                        self.breaker.record_success()
+                        return
+                finally:
+                    self.limiter.release(overloaded=overloaded)
+                self._sleep(delay)
+                attempt += 1
+        finally:
+            self.breaker.release_probe()
+
+    async def acall(self, fn, estimated_tokens=0, used_tokens=None):
+        """`call` for async clients: `fn()` returns an awaitable and every wait is an asyncio.sleep."""
+        self._check_circuit()
+        try:
+            attempt = 0
+            while True:
+                wait = self._reserve_quota(estimated_tokens)
+                if wait:
+                    await asyncio.sleep(wait)
+                if not await self.limiter.acquire_async(timeout=self.max_wait):
+                    LLM_REJECTED.inc(reason='concurrency')
+                    raise LLMUnavailable("Timed out waiting for an LLM concurrency slot")
+                overloaded = False
+                try:
+                    result = await fn()
+                except Exception as e:
+                    overloaded = classify_error(e) in ('rate_limited', 'timeout')
+                    delay = self._retry_delay(attempt, e)
+                else:
+                    self._succeeded(result, estimated_tokens, used_tokens)
+                    return result
+                finally:
+                    self.limiter.release(overloaded=overloaded)
+                await asyncio.sleep(delay)
+                attempt += 1
+        finally:
+            self.breaker.release_probe()
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """The process-wide governor, built from settings on first use."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            from django.conf import settings
+            _governor = LLMGovernor(
+                requests_per_minute=settings.GROQ_RPM_LIMIT,
+                tokens_per_minute=settings.GROQ_TPM_LIMIT,
+                initial_concurrency=settings.LLM_INITIAL_CONCURRENCY,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                max_retries=settings.GROQ_MAX_RETRIES,
+                backoff_base=settings.LLM_BACKOFF_BASE,
+                backoff_cap=settings.LLM_BACKOFF_CAP,
+                max_wait=settings.LLM_MAX_QUEUE_WAIT,
+                failure_threshold=settings.LLM_CIRCUIT_FAILURES,
+                reset_timeout=settings.LLM_CIRCUIT_RESET,
+            )
+        return _governor
+
+
+def reset_governor():
+    global _governor
+    with _governor_lock:
+        _governor = None
@@ -0,0 +1,207 @@
+import base64
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import AnalysisCategory, AnalysisHistory, AnalysisSkill, ProjectCategory, Skill
+from .skills import normalize_skill
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+MAX_LEADERBOARD_SIZE = 100
+
+
+def encode_cursor(entry):
+    raw = f"{entry.analyzed_at.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        analyzed_at, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        analyzed_at = datetime.fromisoformat(analyzed_at)
+        return analyzed_at, int(entry_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_rank_cursor(rank, entry_id):
+    raw = f"{rank}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_rank_cursor(cursor):
+    try:
+        rank, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return int(rank), int(entry_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _parse_moment(value, end_of_day=False):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _parse_int(params, name, default=None):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def filter_history(params):
+    """History rows matching the `job`, `min_rank`, `max_rank`, `since` and `until` query parameters."""
+    queryset = AnalysisHistory.objects.select_related('job_description')
+    job_id = _parse_int(params, 'job')
+    if job_id is not None:
+        queryset = queryset.filter(job_description_id=job_id)
+    min_rank = _parse_int(params, 'min_rank')
+    if min_rank is not None:
+        queryset = queryset.filter(rank__gte=min_rank)
+    max_rank = _parse_int(params, 'max_rank')
+    if max_rank is not None:
+        queryset = queryset.filter(rank__lte=max_rank)
+    if params.get('since'):
+        queryset = queryset.filter(analyzed_at__gte=_parse_moment(params['since']))
+    if params.get('until'):
+        queryset = queryset.filter(analyzed_at__lte=_parse_moment(params['until'], end_of_day=True))
+    return queryset
+
+
+def history_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (rows, next cursor) for one page of newest-first history.
+
+    Pages continue from the (analyzed_at, id) of the previous page's last row instead of
+    using an OFFSET, so every page is one index range scan however deep it is.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    queryset = queryset.order_by('-analyzed_at', '-id')
+    if cursor:
+        analyzed_at, entry_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(analyzed_at__lt=analyzed_at) | Q(analyzed_at=analyzed_at, id__lt=entry_id))
+    rows = list(queryset[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def job_leaderboard(job, k=10):
+    """The k best-scoring resumes for a job, each with its best analysis.
+
+    Reads the (job_description, rank, id) index from the top and stops as soon as k distinct
+    resumes are found, so the cost depends on k rather than on the size of the history.
+    """
+    k = max(1, min(k, MAX_LEADERBOARD_SIZE))
+    queryset = AnalysisHistory.objects.filter(job_description=job).order_by('-rank', '-id')
+    entries, seen = [], set()
+    offset, chunk = 0, k * 2
+    while len(entries) < k:
+        rows = list(queryset[offset:offset + chunk])
+        for row in rows:
+            if row.resume_id not in seen:
+                seen.add(row.resume_id)
+                entries.append(row)
+                if len(entries) == k:
+                    break
+        if len(rows) < chunk:
+            break
+        offset += chunk
+    return entries
+
+
+def skill_key(skill) -> str:
+    return normalize_skill(skill)[:100]
+
+
+def category_key(category) -> str:
+    return str(category).lower().strip()[:100]
+
+
+def _intern(model, names) -> list:
+    """Ids of the Skill or ProjectCategory rows with these names, creating the missing ones."""
+    if not names:
+        return []
+    model.objects.bulk_create([model(name=name) for name in sorted(names)], ignore_conflicts=True)
+    return list(model.objects.filter(name__in=names).values_list('id', flat=True))
+
+
+def index_history_entry(entry):
+    """Link a new history row to its normalized skills and project categories."""
+    skills = {skill_key(s) for s in entry.skills or []} - {''}
+    categories = {category_key(c) for c in entry.project_categories or []} - {''}
+    links = {'analysis': entry, 'job_description_id': entry.job_description_id, 'rank': entry.rank}
+    with transaction.atomic():
+        skill_ids = _intern(Skill, skills)
+        AnalysisSkill.objects.bulk_create([AnalysisSkill(skill_id=i, **links) for i in skill_ids])
+        Skill.objects.filter(id__in=skill_ids).update(analysis_count=F('analysis_count') + 1)
+        category_ids = _intern(ProjectCategory, categories)
+        AnalysisCategory.objects.bulk_create([AnalysisCategory(category_id=i, **links) for i in category_ids])
+        ProjectCategory.objects.filter(id__in=category_ids).update(analysis_count=F('analysis_count') + 1)
+
+
+def _parse_names(params, name) -> list:
+    values = params.getlist(name) if hasattr(params, 'getlist') else [params.get(name) or '']
+    return [part for value in values for part in value.split(',')]
+
+
+def search_history(params, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (rows, next cursor) for one page of history rows that have all the `skills` and all
+    the `categories` asked for (comma-separated or repeated), optionally for one `job` and within
+    `min_rank` and `max_rank`, best rank first.
+
+    The search reads the link rows of the least common skill or category asked for, from the
+    (tag, job, rank) index in rank order, and checks the other tags with one unique-index probe per
+    row. It stops after a page of matches, so its cost follows the page and the rarest tag rather
+    than the size of the history.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    skills = {skill_key(s) for s in _parse_names(params, 'skills')} - {''}
+    categories = {category_key(c) for c in _parse_names(params, 'categories')} - {''}
+    job_id = _parse_int(params, 'job')
+    min_rank = _parse_int(params, 'min_rank')
+    max_rank = _parse_int(params, 'max_rank')
+
+    # (analysis count, link model, tag column, tag id) for every tag asked for
+    tags = [(count, AnalysisSkill, 'skill_id', tag_id)
+            for tag_id, count in Skill.objects.filter(name__in=skills).values_list('id', 'analysis_count')]
+    tags += [(count, AnalysisCategory, 'category_id', tag_id)
+             for tag_id, count in ProjectCategory.objects.filter(name__in=categories).values_list('id', 'analysis_count')]
+    if len(tags) < len(skills) + len(categories):
+        return [], None  # a tag no analysis has
+
+    if tags:
+        tags.sort(key=lambda tag: tag[0])
+        _, model, column, tag_id = tags[0]
+        queryset, entry_id = model.objects.filter(**{column: tag_id}), 'analysis_id'
+        for _, model, column, tag_id in tags[1:]:
+            queryset = queryset.filter(Exists(model.objects.filter(analysis_id=OuterRef('analysis_id'), **{column: tag_id})))
+    else:
+        queryset, entry_id = AnalysisHistory.objects.all(), 'id'
+    if job_id is not None:
+        queryset = queryset.filter(job_description_id=job_id)
+    if min_rank is not None:
+        queryset = queryset.filter(rank__gte=min_rank)
+    if max_rank is not None:
+        queryset = queryset.filter(rank__lte=max_rank)
+    if cursor:
+        rank, last_id = decode_rank_cursor(cursor)
+        queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, **{f'{entry_id}__lt': last_id}))
+
+    keys = list(queryset.order_by('-rank', f'-{entry_id}').values_list('rank', entry_id)[:limit + 1])
+    entries = AnalysisHistory.objects.select_related('job_description').in_bulk([i for _, i in keys[:limit]])
+    rows = [entries[i] for _, i in keys[:limit] if i in entries]
+    next_cursor = encode_rank_cursor(*keys[limit - 1]) if len(keys) > limit else None
+    return rows, next_cursor
@@ -0,0 +1,22 @@
+from collections import Counter
+
+from django.db import transaction
+
+from .models import JobSkill
+from .skills import normalize_skill
+
+
+def index_job_skills(job):
+    """Replace a job's entries in the skill index with its current required skills."""
+    skills = {normalize_skill(s) for s in job.required_skills} if job.requirements_current else set()
+    skills.discard('')
+    # One transaction, so two saves of the same job cannot interleave their deletes and inserts
+    with transaction.atomic():
+        JobSkill.objects.filter(job=job).delete()
+        JobSkill.objects.bulk_create([JobSkill(skill=skill[:100], job=job) for skill in sorted(skills)])
+
+
+def jobs_matching_skills(skills) -> Counter:
+    """Count, per job id, how many of the given skills the job requires."""
+    keys = {normalize_skill(s) for s in skills}
+    return Counter(JobSkill.objects.filter(skill__in=keys).values_list('job_id', flat=True))
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import threading
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients = {}
+# Async clients hold connections bound to the event loop that opened them, so there is one per loop
+_async_clients = weakref.WeakKeyDictionary()
+_owner_pid = None
+
+
+def _groq_options(http_client_class):
+    import httpx
+
+    if not settings.GROQ_API_KEY:
+        raise ValueError("GROQ_API_KEY environment variable is not set. Please set it in your environment or .env file.")
+    timeout = httpx.Timeout(settings.GROQ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT)
+    http_client = http_client_class(
+        limits=httpx.Limits(
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY,
+        ),
+        timeout=timeout,
+    )
+    return {
+        'api_key': settings.GROQ_API_KEY,
+        'base_url': settings.GROQ_BASE_URL or None,
+        'timeout': timeout,
+        'max_retries': 0,  # retries are the governor's job (governor.py), with backoff shared across calls
+        'http_client': http_client,
+    }
+
+
+def _build_groq_client():
+    # Imported here so workers that never call the LLM do not pay for groq/pydantic at boot
+    import httpx
+    from groq import Groq
+
+    return Groq(**_groq_options(httpx.Client))
+
+
+def _build_async_groq_client():
+    import httpx
+    from groq import AsyncGroq
+
+    return AsyncGroq(**_groq_options(httpx.AsyncClient))
+
+
+_FACTORIES = {
+    'groq': _build_groq_client,
+}
+
+
+def get_client(name='groq'):
+    """Return the process-wide LLM client, creating it on first use.
+
+    Clients hold pooled keep-alive connections, so they are shared by every request in the
+    process. A client is never reused across fork(): sockets inherited from the parent would be
+    shared by several workers, so a changed pid discards the registry before handing one out.
+    """
+    global _owner_pid
+    with _lock:
+        if _owner_pid != os.getpid():
+            _clients.clear()
+            _owner_pid = os.getpid()
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = _FACTORIES[name]()
+            logger.debug("Created %s client for pid %s", name, _owner_pid)
+        return client
+
+
+def get_async_client():
+    """Return the AsyncGroq client for the running event loop, creating it on first use.
+
+    Under an ASGI server each worker runs one loop, so this is one pooled client per worker.
+    """
+    global _owner_pid
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if _owner_pid != os.getpid():
+            _clients.clear()
+            _async_clients.clear()
+            _owner_pid = os.getpid()
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = _build_async_groq_client()
+            logger.debug("Created async groq client for pid %s", _owner_pid)
+        return client
+
+
+def reset_clients():
+    """Close and forget every client; called from gunicorn's post_fork hook."""
+    global _owner_pid
+    with _lock:
+        if _owner_pid == os.getpid():
+            for client in _clients.values():
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.debug("Error closing LLM client: %s", e)
+        _clients.clear()
+        # Closing an async client needs its own loop; dropping it lets the loop's shutdown close the sockets
+        _async_clients.clear()
+        _owner_pid = os.getpid()
@@ -0,0 +1,219 @@
+"""Local resume extraction with spaCy: no network, a few milliseconds per resume.
+
+Produces the same `resume_*` fields as the LLM extraction, so `calculate_ats_score` can score
+either one:
+
+- skills: a spaCy PhraseMatcher over every alias in the skill catalogue, matched on the
+  lowercased text and resolved to canonical names, longest match first;
+- experience: employment date ranges ("Jan 2019 - Mar 2022", "2018 - Present", "05/2020 - 06/2021")
+  between 1950 and this year, outside the education section, merged so overlapping jobs count once,
+  falling back to a stated "N years of experience";
+- education: the highest degree mentioned, preferring lines in the education section; elsewhere a
+  degree only counts in a degree context ("PhD in Physics", "MBA, Wharton School");
+- projects: bullet points under experience and project headings.
+
+`confidence` is the share of those four signals that were found. The spaCy pipeline is built once
+per process: SPACY_MODEL names an installed model (loaded with every component excluded, since only
+its tokenizer and vocab are used) and the default, a blank English pipeline, needs no download.
+"""
+import logging
+import re
+from datetime import date
+from functools import lru_cache
+
+from django.conf import settings
+
+from .skills import SKILL_CATALOGUE_PATH, load_aliases
+
+logger = logging.getLogger(__name__)
+
+_MONTHS = {m: i for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_POINT = rf"(?:{_MONTH}\s*\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+_DATE_RANGE_RE = re.compile(
+    rf"\b({_POINT})\s*(?:-|–|—|to|until)\s*({_POINT}|present|current|now|today)\b", re.IGNORECASE)
+_STATED_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)\+?\s*(?:years|yrs)\b", re.IGNORECASE)
+# Four-digit numbers before this are not employment years ("from 1000-5000 requests per second")
+EARLIEST_YEAR = 1950
+
+# Highest first; the label is what `calculate_ats_score` looks for in `resume_education`
+DEGREE_LEVELS = [
+    ('PhD', re.compile(r"\b(ph\.?\s?d|doctorate|doctor of)\b", re.IGNORECASE)),
+    ('Master', re.compile(r"\b(master'?s?|m\.?sc|m\.?s\.|mba|m\.?tech|m\.?eng|mca|m\.?a\.)(?=\W|$)", re.IGNORECASE)),
+    ('Bachelor', re.compile(r"\b(bachelor'?s?|b\.?sc|b\.?s\.|b\.?tech|b\.?e\.|b\.?eng|bca|b\.?a\.)(?=\W|$)", re.IGNORECASE)),
+    ('Associate', re.compile(r"\bassociate'?s? (degree|of)\b", re.IGNORECASE)),
+]
+# Outside the education section a degree needs one of these on its line, or "in", "of", "from" or
+# punctuation right after it, so "Mentored MBA students" is not read as an MBA
+_DEGREE_CONTEXT_RE = re.compile(r"\b(university|college|institute|school|academy|degree|diploma|graduated|gpa)\b",
+                                re.IGNORECASE)
+_DEGREE_FOLLOWER_RE = re.compile(r"\s*(?:$|[,(|–-]|(?:in|of|from)\b)", re.IGNORECASE)
+
+_HEADINGS = {
+    'education': re.compile(r"^(education|academic|qualifications?)\b", re.IGNORECASE),
+    'experience': re.compile(r"^(experience|work experience|employment|professional experience|work history)\b",
+                             re.IGNORECASE),
+    'projects': re.compile(r"^(projects?|personal projects|key projects)\b", re.IGNORECASE),
+    'other': re.compile(r"^(summary|profile|skills|technical skills|certifications?|awards|languages|interests)\b",
+                        re.IGNORECASE),
+}
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦‣●]|\d+[.)])\s+(.*\S)")
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """The per-process spaCy pipeline used for tokenization; no tagger, parser or NER is run."""
+    import spacy
+    if settings.SPACY_MODEL:
+        try:
+            return spacy.load(settings.SPACY_MODEL, exclude=['tagger', 'parser', 'ner', 'lemmatizer',
+                                                              'attribute_ruler', 'senter', 'tok2vec', 'textcat'])
+        except OSError:
+            logger.warning("spaCy model %s is not installed, using a blank English pipeline", settings.SPACY_MODEL)
+    return spacy.blank('en')
+
+
+@lru_cache(maxsize=None)
+def skill_matcher(path=SKILL_CATALOGUE_PATH):
+    """PhraseMatcher over the scannable aliases of the skill catalogue, keyed by canonical name."""
+    from spacy.matcher import PhraseMatcher
+    nlp = get_nlp()
+    _, scannable = load_aliases(path)
+    matcher = PhraseMatcher(nlp.vocab)
+    patterns = {}
+    for alias, canonical in scannable.items():
+        patterns.setdefault(canonical, []).append(nlp.make_doc(alias))
+    for canonical, docs in patterns.items():
+        matcher.add(canonical, docs)
+    return matcher
+
+
+def extract_skills(text: str) -> list:
+    """Canonical catalogue skills in the text, in order of first appearance."""
+    from spacy.util import filter_spans
+    nlp = get_nlp()
+    # Tokenize lowercased text like the aliases were: the tokenizer splits "Node.JS" but not "node.js"
+    doc = nlp.make_doc(text.lower())
+    spans = filter_spans(skill_matcher()(doc, as_spans=True))  # longest match wins on overlaps
+    return list(dict.fromkeys(nlp.vocab.strings[span.label] for span in sorted(spans, key=lambda s: s.start)))
+
+
+def _sections(text: str):
+    """Yield (section, line) pairs, where section is the last heading seen ('' before any)."""
+    section = ''
+    for line in text.splitlines():
+        stripped = line.strip().strip(':')
+        if stripped and len(stripped) < 40:
+            for name, heading in _HEADINGS.items():
+                if heading.match(stripped):
+                    section = name
+                    break
+        yield section, line
+
+
+def _month_index(point: str, end=False, today=None):
+    """Months since year 0 for one side of a date range; bare years cover the whole year."""
+    point = point.lower().strip()
+    if point in ('present', 'current', 'now', 'today'):
+        today = today or date.today()
+        return today.year * 12 + today.month
+    if '/' in point:
+        month, year = point.split('/')
+        return int(year) * 12 + int(month)
+    year = int(point[-4:])
+    if point[:3] in _MONTHS:
+        return year * 12 + _MONTHS[point[:3]]
+    return year * 12 + (12 if end else 1)
+
+
+def experience_years(text: str, today=None) -> float:
+    """Years covered by employment date ranges outside the education section, overlaps counted once."""
+    earliest, latest = EARLIEST_YEAR * 12 + 1, (today or date.today()).year * 12 + 12
+    ranges = []
+    for section, line in _sections(text):
+        if section == 'education':
+            continue
+        for start, end in _DATE_RANGE_RE.findall(line):
+            first, last = _month_index(start, today=today), _month_index(end, end=True, today=today)
+            if earliest <= first <= last <= latest:
+                ranges.append((first, last))
+    months, covered_until = 0, None
+    for first, last in sorted(ranges):
+        if covered_until is not None and first <= covered_until:
+            if last > covered_until:
+                months += last - covered_until
+                covered_until = last
+        else:
+            months += last - first + 1
+            covered_until = last
+    if months:
+        return round(months / 12, 1)
+    return stated_years(text)
+
+
+def stated_years(text: str) -> float:
+    return max((float(y) for y in _STATED_YEARS_RE.findall(text)), default=0)
+
+
+def detect_education(text: str) -> str:
+    """The line naming the highest degree, labelled with its level, or '' if none is mentioned."""
+    best = None
+    for section, line in _sections(text):
+        for rank, (level, pattern) in enumerate(DEGREE_LEVELS):
+            match = pattern.search(line)
+            if match and (section == 'education' or _DEGREE_CONTEXT_RE.search(line)
+                          or _DEGREE_FOLLOWER_RE.match(line, match.end())):
+                # Lower rank is a higher degree; a match in the education section beats one elsewhere
+                candidate = (rank, section != 'education', level, line.strip())
+                if best is None or candidate < best:
+                    best = candidate
+                break
+    if best is None:
+        return ''
+    _, _, level, line = best
+    return line if level.lower() in line.lower() else f"{level}: {line}"
+
+
+def extract_projects(text: str) -> list:
+    """Bullet points listed under experience and project headings."""
+    return [match.group(1) for section, line in _sections(text)
+            if section in ('experience', 'projects') and (match := _BULLET_RE.match(line))]
+
+
+def extract_resume_locally(resume_text: str) -> dict:
+    """The fields of an LLM resume extraction, found locally, plus a 0-1 `confidence`."""
+    data = {
+        'resume_skills': extract_skills(resume_text),
+        'resume_experience': experience_years(resume_text),
+        'resume_education': detect_education(resume_text),
+        'resume_projects': extract_projects(resume_text),
+    }
+    signals = (len(data['resume_skills']) >= 3, data['resume_experience'] > 0,
+               bool(data['resume_education']), bool(data['resume_projects']))
+    data['confidence'] = sum(signals) / len(signals)
+    return data
+
+
+def job_requirements_locally(job_text: str) -> dict:
+    return {'job_required_skills': extract_skills(job_text), 'job_required_experience': stated_years(job_text)}
+
+
+def local_suggestions(data: dict) -> list:
+    """Rule-based improvement suggestions from a scored extraction, used when no LLM is consulted."""
+    resume_skills = {s.lower() for s in data.get('resume_skills', [])}
+    missing = [s for s in data.get('job_required_skills', []) if s.lower() not in resume_skills]
+    suggestions = []
+    if missing:
+        suggestions.append(f"Mention your experience with {', '.join(missing[:5])} "
+                           f"if you have used {'it' if len(missing) == 1 else 'them'}.")
+    required = data.get('job_required_experience', 0)
+    if required and data.get('resume_experience', 0) < required:
+        suggestions.append(f"The role asks for {required:g} years of experience; give start and end dates "
+                           "for every position so all of yours is counted.")
+    if not data.get('resume_education'):
+        suggestions.append("Add an education section with your degree and field of study.")
+    if len(data.get('resume_projects', [])) < 3:
+        suggestions.append("Describe more of your projects as bullet points under each role.")
+    suggestions.append("Quantify the impact of your work with numbers (users, revenue, latency, time saved).")
+    return suggestions
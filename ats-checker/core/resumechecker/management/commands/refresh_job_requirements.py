@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from resumechecker.analyzer import ensure_job_requirements
+from resumechecker.embeddings import job_skill_vectors, store_job_skill_vectors
+from resumechecker.job_index import index_job_skills
+from resumechecker.models import JobDesCription
+
+
+class Command(BaseCommand):
+    help = ("Extract required skills and experience for job descriptions whose text has changed, and rebuild "
+            "the skill index (and the stored skill vectors, with SKILL_MATCHING=semantic)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-extract requirements for every job")
+
+    def handle(self, *args, **options):
+        for job in JobDesCription.objects.all():
+            if options['force']:
+                job.requirements_hash = ''
+            if job.requirements_current:
+                # Skill normalization may have changed since the job was indexed
+                index_job_skills(job)
+                if settings.SKILL_MATCHING == 'semantic' and job_skill_vectors(job) is None:
+                    store_job_skill_vectors(job)
+                continue
+            ensure_job_requirements(job)
+            self.stdout.write(f"✓ {job.job_title}: {len(job.required_skills)} skills, {job.required_experience} years")
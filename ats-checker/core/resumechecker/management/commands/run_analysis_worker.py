@@ -0,0 +1,57 @@
+import os
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from resumechecker.tasks import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued resume analyses with a local pool of worker threads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Number of worker threads")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is drained")
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        requeue_stale_jobs()
+        threads = [
+            threading.Thread(target=self.work, args=(f"{socket.gethostname()}:{os.getpid()}:{i}", options), daemon=True)
+            for i in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Started {len(threads)} analysis workers")
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1.0)
+        except KeyboardInterrupt:
+            self.stop.set()
+            self.stdout.write("Stopping after in-flight jobs finish...")
+            for thread in threads:
+                thread.join()
+
+    def work(self, worker_id, options):
+        last_sweep = time.monotonic()
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                if time.monotonic() - last_sweep > 60:
+                    requeue_stale_jobs()
+                    last_sweep = time.monotonic()
+                job = claim_next_job(worker_id)
+                if job is None:
+                    if options['once']:
+                        return
+                    self.stop.wait(options['poll_interval'])
+                    continue
+                self.stdout.write(f"[{worker_id}] Running analysis job {job.id}")
+                run_job(job)
+        finally:
+            connection.close()
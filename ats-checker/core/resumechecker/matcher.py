@@ -0,0 +1,63 @@
+import re
+
+# Words may contain + and # (C++, C#) and inner dots (Node.js, ASP.NET); a leading dot is kept
+# for names like .NET. Hyphens and slashes split words, so "ML-based" contains "ml".
+TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*|\.[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall(text.lower())
+
+
+class KeywordMatcher:
+    """Multi-pattern phrase matcher compiled into a trie over word tokens.
+
+    Text is tokenized once and scanned left to right; at each token the trie is walked for the
+    longest pattern starting there. Matches therefore always fall on word boundaries, and the
+    cost is one regex pass plus a few dict lookups per word, independent of the pattern count.
+    """
+
+    _END = ''  # tokens are never empty, so '' can mark the end of a pattern
+
+    def __init__(self, patterns=None, tokenizer=tokenize):
+        self._root = {}
+        self.max_depth = 0
+        self.tokenize = tokenizer
+        for pattern, value in (patterns or {}).items():
+            self.add(pattern, value)
+
+    def add(self, pattern: str, value):
+        tokens = self.tokenize(pattern)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[self._END] = value
+        self.max_depth = max(self.max_depth, len(tokens))
+
+    def finditer(self, text: str):
+        """Yield the value of each non-overlapping, longest-leftmost match in the text."""
+        yield from self.scan(self.tokenize(text))
+
+    def scan(self, tokens: list):
+        root, end = self._root, self._END
+        i, n = 0, len(tokens)
+        while i < n:
+            node = root.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+            match, length, j = node.get(end), 1, i + 1
+            while j < n:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if end in node:
+                    match, length = node[end], j - i
+            if match is None:
+                i += 1
+            else:
+                yield match
+                i += length
@@ -0,0 +1,207 @@
+"""Per-process request metrics, exposed in the Prometheus text format at /metrics.
+
+Every gunicorn worker keeps its own registry and labels its series with `pid`, so a scrape
+shows the worker that answered it; aggregate across workers in PromQL with `sum without (pid)`.
+
+Stage timings are also collected per request and returned in a `Server-Timing` header by
+`ServerTimingMiddleware`.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_request_timings = ContextVar('request_timings', default=None)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self, pid):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for name, key, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, key, extra + (('pid', pid),))
+            lines.append(f'{name}{labels} {_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Mirror a running total kept elsewhere, such as a cache's own hit count."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                samples.append((f'{self.name}_bucket', key, (('le', le),), cumulative))
+            samples.append((f'{self.name}_sum', key, (), total))
+            samples.append((f'{self.name}_count', key, (), cumulative))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Register a callable run at scrape time, for values read from elsewhere (cache stats)."""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        pid = os.getpid()
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render(pid)
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    'ats_http_request_duration_seconds', 'Time to produce a response, by view.', ['view', 'method']))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    'ats_http_requests_in_flight', 'Requests currently being handled by this worker.'))
+STAGE_SECONDS = registry.register(Histogram(
+    'ats_stage_duration_seconds', 'Time spent in each stage of resume analysis.', ['stage']))
+LLM_REQUESTS = registry.register(Counter(
+    'ats_llm_requests_total', 'LLM completions requested.'))
+LLM_ERRORS = registry.register(Counter(
+    'ats_llm_errors_total', 'LLM completions that failed or returned unparseable JSON.'))
+FALLBACK_RESULTS = registry.register(Counter(
+    'ats_fallback_results_total', 'Analyses answered with a fallback (zero score or local keyword scoring) instead of an LLM result.', ['reason']))
+LLM_RETRIES = registry.register(Counter(
+    'ats_llm_retries_total', 'LLM calls retried after a transient error.', ['reason']))
+LLM_REJECTED = registry.register(Counter(
+    'ats_llm_rejected_total', 'LLM calls refused by the governor without reaching the API.', ['reason']))
+LLM_RATE_LIMIT_WAIT_SECONDS = registry.register(Histogram(
+    'ats_llm_rate_limit_wait_seconds', 'Time LLM calls waited for the request and token buckets.'))
+LLM_CONCURRENCY_LIMIT = registry.register(Gauge(
+    'ats_llm_concurrency_limit', 'Current adaptive (AIMD) limit on concurrent LLM calls.'))
+LLM_CIRCUIT_STATE = registry.register(Gauge(
+    'ats_llm_circuit_state', 'LLM circuit breaker state: 0 closed, 1 half-open, 2 open.'))
+ANALYSIS_ENGINE = registry.register(Counter(
+    'ats_analysis_engine_total', 'Analyses by the engine that scored them (local, hybrid or llm).', ['engine']))
+COALESCED_REQUESTS = registry.register(Counter(
+    'ats_coalesced_requests_total', 'Calls answered by an identical call already in flight instead of their own.',
+    ['flight', 'scope']))
+SINGLEFLIGHT_CALLS = registry.register(Counter(
+    'ats_singleflight_calls_total', 'Calls that ran because no identical call was in flight.', ['flight']))
+CACHE_LOOKUPS = registry.register(Counter(
+    'ats_cache_lookups_total', 'Cache lookups by cache and outcome.', ['cache', 'result']))
+
+
+@contextmanager
+def timed(stage):
+    """Time a block: observed in the stage histogram and added to the current request's Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def start_request_timings():
+    """Begin collecting stage timings for the current request; returns a token for `end_request_timings`."""
+    timings = {}
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token):
+    _request_timings.reset(token)
+
+
+def server_timing_header(timings, total=None):
+    entries = [f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in timings.items()]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
@@ -0,0 +1,81 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from .metrics import (REQUEST_SECONDS, REQUESTS_IN_FLIGHT, end_request_timings, server_timing_header,
+                      start_request_timings)
+
+
+class ServerTimingMiddleware:
+    """Time every request, count in-flight requests and return stage timings in a Server-Timing header.
+
+    Streaming responses are timed up to their first byte; the stages they run later still land in
+    the stage histograms. Works in both sync and async stacks, so async views stay on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        REQUESTS_IN_FLIGHT.inc()
+        timings, token = start_request_timings()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            end_request_timings(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        REQUESTS_IN_FLIGHT.inc()
+        timings, token = start_request_timings()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            end_request_timings(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    def _finish(self, request, response, timings, elapsed):
+        match = request.resolver_match
+        REQUEST_SECONDS.observe(elapsed, view=match.url_name if match else 'unmatched', method=request.method)
+        response.headers['Server-Timing'] = server_timing_header(timings, elapsed)
+        return response
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise marked async-capable.
+
+    The stock middleware is sync-only, which makes Django run the whole async stack below it
+    through one thread, one request at a time. Finding a static file is an in-memory lookup,
+    so it is safe to do on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = self.find_file(request.path_info) if self.autorefresh else self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
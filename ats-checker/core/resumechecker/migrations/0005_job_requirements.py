@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:06
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    JobDesCription = apps.get_model('resumechecker', 'JobDesCription')
+    for job in JobDesCription.objects.all():
+        job.content_hash = hashlib.sha256(job.job_description.encode('utf-8')).hexdigest()
+        job.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0004_llmextraction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='required_experience',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='required_skills',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='requirements_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
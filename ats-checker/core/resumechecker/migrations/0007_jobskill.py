@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_skill_index(apps, schema_editor):
+    JobDesCription = apps.get_model('resumechecker', 'JobDesCription')
+    JobSkill = apps.get_model('resumechecker', 'JobSkill')
+    for job in JobDesCription.objects.exclude(requirements_hash=''):
+        if job.requirements_hash != job.content_hash:
+            continue
+        skills = {str(s).lower().strip() for s in job.required_skills} - {''}
+        JobSkill.objects.bulk_create([JobSkill(skill=skill[:100], job=job) for skill in sorted(skills)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0006_analysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='resumechecker.jobdescription')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'job'), name='unique_job_skill')],
+            },
+        ),
+        migrations.RunPython(build_skill_index, migrations.RunPython.noop),
+    ]
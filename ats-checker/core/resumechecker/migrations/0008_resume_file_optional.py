@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0007_jobskill'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resume',
+            name='resume',
+            field=models.FileField(blank=True, upload_to='resume'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0008_resume_file_optional'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analysishistory',
+            index=models.Index(fields=['analyzed_at', 'id'], name='resumecheck_analyze_f79a86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysishistory',
+            index=models.Index(fields=['job_description', 'analyzed_at', 'id'], name='resumecheck_job_des_de0d96_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysishistory',
+            index=models.Index(fields=['job_description', 'rank', 'id'], name='resumecheck_job_des_2aefae_idx'),
+        ),
+    ]
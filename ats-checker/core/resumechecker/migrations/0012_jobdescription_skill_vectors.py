@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0011_llmcalllease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='skill_vectors',
+            field=models.BinaryField(blank=True, default=b'', editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='skill_vectors_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,212 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:20
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# Skill aliases as of this migration (alias -> normalized name), so the backfill does not change
+# when data/skills.json does
+SKILL_ALIASES = {
+    '.net core': '.net', 'advanced excel': 'excel', 'agile methodologies': 'agile',
+    'amazon web services': 'aws', 'android development': 'android', 'android sdk': 'android',
+    'angular js': 'angular', 'angular.js': 'angular', 'angularjs': 'angular', 'apache airflow': 'airflow',
+    'apache cassandra': 'cassandra', 'apache hadoop': 'hadoop', 'apache kafka': 'kafka', 'asp net': 'asp.net',
+    'asp.net core': 'asp.net', 'async programming': 'asynchronous programming',
+    'async/await': 'asynchronous programming', 'asyncio': 'asynchronous programming', 'aws ec2': 'amazon ec2',
+    'aws s3': 'amazon s3', 'bash scripting': 'bash', 'big query': 'bigquery', 'c language': 'c',
+    'c plus plus': 'c++', 'c programming': 'c', 'c sharp': 'c#', 'ci cd': 'ci/cd',
+    'continuous delivery': 'ci/cd', 'continuous deployment': 'ci/cd', 'continuous integration': 'ci/cd',
+    'core java': 'java', 'cpp': 'c++', 'csharp': 'c#', 'css 3': 'css', 'css3': 'css', 'cv2': 'opencv',
+    'data analytics': 'data analysis', 'data build tool': 'dbt', 'data pipeline': 'data pipelines',
+    'data structures and algorithms': 'data structures', 'data visualisation': 'data visualization',
+    'django framework': 'django', 'django rest': 'django rest framework', 'dl': 'deep learning',
+    'docker compose': 'docker', 'docker-compose': 'docker', 'dot net': '.net', 'dotnet': '.net',
+    'drf': 'django rest framework', 'dsa': 'data structures', 'dynamo db': 'dynamodb', 'ec2': 'amazon ec2',
+    'ecmascript': 'javascript', 'eda': 'data analysis', 'elastic search': 'elasticsearch',
+    'elk': 'elasticsearch', 'elt': 'etl', 'es6': 'javascript', 'etl pipelines': 'etl', 'etl processes': 'etl',
+    'exploratory data analysis': 'data analysis', 'express': 'express.js', 'express js': 'express.js',
+    'expressjs': 'express.js', 'fast api': 'fastapi', 'gen ai': 'generative ai', 'genai': 'generative ai',
+    'git version control': 'git', 'go lang': 'go', 'golang': 'go', 'google bigquery': 'bigquery',
+    'google cloud': 'gcp', 'google cloud platform': 'gcp', 'hdfs': 'hadoop', 'html 5': 'html', 'html5': 'html',
+    'hugging face transformers': 'hugging face', 'huggingface': 'hugging face', 'ios development': 'ios',
+    'java ee': 'java', 'java se': 'java', 'javascript es6': 'javascript', 'jest': 'unit testing',
+    'js': 'javascript', 'json web token': 'jwt', 'json web tokens': 'jwt', 'k8s': 'kubernetes',
+    'lambda': 'aws lambda', 'llm': 'large language models', 'llms': 'large language models',
+    'micro services': 'microservices', 'microservice': 'microservices', 'microsoft azure': 'azure',
+    'microsoft excel': 'excel', 'microsoft power bi': 'power bi', 'microsoft sql server': 'sql server',
+    'ml': 'machine learning', 'ml ops': 'mlops', 'mongo': 'mongodb', 'mongo db': 'mongodb', 'ms excel': 'excel',
+    'ms sql': 'sql server', 'mssql': 'sql server', 'multi threading': 'multithreading',
+    'multi-threading': 'multithreading', 'my sql': 'mysql', 'next js': 'next.js', 'nextjs': 'next.js',
+    'nlp': 'natural language processing', 'no sql': 'nosql', 'no-sql': 'nosql', 'node': 'node.js',
+    'node js': 'node.js', 'nodejs': 'node.js', 'numpy arrays': 'numpy', 'oauth 2.0': 'oauth', 'oauth2': 'oauth',
+    'open cv': 'opencv', 'oracle database': 'oracle', 'oracle db': 'oracle',
+    'parallel processing': 'parallel computing', 'postgre': 'postgresql', 'postgres': 'postgresql',
+    'postgresql db': 'postgresql', 'power-bi': 'power bi', 'powerbi': 'power bi', 'psql': 'postgresql',
+    'py spark': 'pyspark', 'py torch': 'pytorch', 'pytest': 'unit testing', 'python 3': 'python',
+    'python programming': 'python', 'python3': 'python', 'r language': 'r', 'r programming': 'r',
+    'rabbit mq': 'rabbitmq', 'rails': 'ruby on rails', 'react context': 'context api',
+    'react context api': 'context api', 'react js': 'react', 'react-native': 'react native',
+    'react.js': 'react', 'reactjs': 'react', 'redux toolkit': 'redux', 'rest': 'rest api',
+    'rest apis': 'rest api', 'restful': 'rest api', 'restful api': 'rest api', 'restful apis': 'rest api',
+    'restful services': 'rest api', 'ror': 'ruby on rails', 'rust lang': 'rust', 's3': 'amazon s3',
+    'scikit': 'scikit-learn', 'scikit learn': 'scikit-learn', 'scrum': 'agile', 'scss': 'sass', 'sh': 'bash',
+    'shell script': 'bash', 'shell scripting': 'bash', 'sklearn': 'scikit-learn', 'spark': 'apache spark',
+    'spark sql': 'apache spark', 'spring': 'spring boot', 'spring framework': 'spring boot',
+    'springboot': 'spring boot', 'sqlite3': 'sqlite', 'statistical analysis': 'statistics',
+    'structured query language': 'sql', 'tailwind': 'tailwind css', 'tailwindcss': 'tailwind css',
+    'tensor flow': 'tensorflow', 'tf': 'tensorflow', 'torch': 'pytorch', 'transformers': 'hugging face',
+    'ts': 'typescript', 'unit tests': 'unit testing', 'unittest': 'unit testing', 'unix': 'linux',
+    'vanilla javascript': 'javascript', 'vanilla js': 'javascript', 'vue': 'vue.js', 'vue js': 'vue.js',
+    'vuejs': 'vue.js', 'web sockets': 'websockets', 'websocket': 'websockets', 'yolov5': 'yolo',
+    'yolov8': 'yolo',
+}
+
+
+def normalize_skill(skill) -> str:
+    """resumechecker.skills.normalize_skill, frozen with SKILL_ALIASES."""
+    key = " ".join(str(skill).lower().split())
+    return SKILL_ALIASES.get(key, key)
+
+
+def _intern(model, names, ids):
+    missing = names - ids.keys()
+    if missing:
+        model.objects.bulk_create([model(name=name) for name in sorted(missing)], ignore_conflicts=True)
+        ids.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+
+
+def backfill_tags(apps, schema_editor):
+    """Link every existing history row to its normalized skills and project categories."""
+    AnalysisHistory = apps.get_model('resumechecker', 'AnalysisHistory')
+    Skill = apps.get_model('resumechecker', 'Skill')
+    ProjectCategory = apps.get_model('resumechecker', 'ProjectCategory')
+    AnalysisSkill = apps.get_model('resumechecker', 'AnalysisSkill')
+    AnalysisCategory = apps.get_model('resumechecker', 'AnalysisCategory')
+
+    skill_ids, category_ids = {}, {}
+    skill_counts, category_counts = Counter(), Counter()
+    rows = AnalysisHistory.objects.order_by('id').values_list('id', 'job_description_id', 'rank', 'skills',
+                                                              'project_categories')
+    batch = []
+
+    def flush():
+        skills = [{normalize_skill(s)[:100] for s in row[3] or []} - {''} for row in batch]
+        categories = [{str(c).lower().strip()[:100] for c in row[4] or []} - {''} for row in batch]
+        _intern(Skill, set().union(*skills), skill_ids)
+        _intern(ProjectCategory, set().union(*categories), category_ids)
+        skill_links, category_links = [], []
+        for (analysis_id, job_id, rank, _, _), row_skills, row_categories in zip(batch, skills, categories):
+            links = {'analysis_id': analysis_id, 'job_description_id': job_id, 'rank': rank}
+            skill_links += [AnalysisSkill(skill_id=skill_ids[name], **links) for name in row_skills]
+            category_links += [AnalysisCategory(category_id=category_ids[name], **links) for name in row_categories]
+            skill_counts.update(skill_ids[name] for name in row_skills)
+            category_counts.update(category_ids[name] for name in row_categories)
+        AnalysisSkill.objects.bulk_create(skill_links, batch_size=BATCH_SIZE)
+        AnalysisCategory.objects.bulk_create(category_links, batch_size=BATCH_SIZE)
+        batch.clear()
+
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+    Skill.objects.bulk_update([Skill(id=i, analysis_count=n) for i, n in skill_counts.items()],
+                              ['analysis_count'], batch_size=BATCH_SIZE)
+    ProjectCategory.objects.bulk_update([ProjectCategory(id=i, analysis_count=n) for i, n in category_counts.items()],
+                                        ['analysis_count'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0012_jobdescription_skill_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('analysis_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Project categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('analysis_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnalysisCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.IntegerField()),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resumechecker.analysishistory')),
+                ('job_description', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='resumechecker.jobdescription')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resumechecker.projectcategory')),
+            ],
+            options={
+                'verbose_name_plural': 'Analysis categories',
+            },
+        ),
+        migrations.AddField(
+            model_name='analysishistory',
+            name='category_set',
+            field=models.ManyToManyField(related_name='analyses', through='resumechecker.AnalysisCategory', to='resumechecker.projectcategory'),
+        ),
+        migrations.CreateModel(
+            name='AnalysisSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.IntegerField()),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resumechecker.analysishistory')),
+                ('job_description', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='resumechecker.jobdescription')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='resumechecker.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='analysishistory',
+            name='skill_set',
+            field=models.ManyToManyField(related_name='analyses', through='resumechecker.AnalysisSkill', to='resumechecker.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='analysishistory',
+            index=models.Index(fields=['rank', 'id'], name='resumecheck_rank_1dc66d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysiscategory',
+            index=models.Index(fields=['category', 'rank', 'analysis'], name='resumecheck_categor_f1b038_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysiscategory',
+            index=models.Index(fields=['category', 'job_description', 'rank', 'analysis'], name='resumecheck_categor_91aaa7_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='analysiscategory',
+            constraint=models.UniqueConstraint(fields=('analysis', 'category'), name='unique_analysis_category'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisskill',
+            index=models.Index(fields=['skill', 'rank', 'analysis'], name='resumecheck_skill_i_484e32_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisskill',
+            index=models.Index(fields=['skill', 'job_description', 'rank', 'analysis'], name='resumecheck_skill_i_a64d76_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='analysisskill',
+            constraint=models.UniqueConstraint(fields=('analysis', 'skill'), name='unique_analysis_skill'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumechecker', '0013_talent_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+    ]
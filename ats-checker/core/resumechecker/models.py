@@ -1,16 +1,117 @@
+import hashlib
+
 from django.db import models
 
 # Create your models here.
 class Resume(models.Model):
-    resume=models.FileField(upload_to="resume")
+    # Empty when the upload was analysed from memory and not (yet) persisted, see RESUME_STORAGE
+    resume=models.FileField(upload_to="resume", blank=True)
+    content_hash=models.CharField(max_length=64, blank=True, db_index=True)
+
+class ResumeText(models.Model):
+    """Extracted PDF text, stored once per SHA-256 of the uploaded bytes."""
+    content_hash=models.CharField(max_length=64, unique=True)
+    text=models.TextField()
+    created_at=models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.content_hash
+
+class LLMExtraction(models.Model):
+    """Raw extraction JSON returned by the LLM, keyed on inputs, model and prompt version."""
+    cache_key=models.CharField(max_length=64, unique=True)
+    model_name=models.CharField(max_length=100)
+    prompt_version=models.PositiveIntegerField()
+    payload=models.JSONField()
+    created_at=models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model_name} v{self.prompt_version} - {self.cache_key[:12]}"
+
+class LLMCallLease(models.Model):
+    """Held by the worker currently making an LLM call, so other workers wait for its cached result."""
+    key=models.CharField(max_length=64, unique=True)
+    owner=models.CharField(max_length=200)
+    expires_at=models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key[:12]} - {self.owner}"
 
 class JobDesCription(models.Model):
     job_title=models.CharField(max_length=100)
     job_description=models.TextField()
+    content_hash=models.CharField(max_length=64, blank=True, editable=False)
+    # Requirements extracted once per job text; requirements_hash records which text they came from
+    required_skills=models.JSONField(default=list, blank=True)
+    required_experience=models.FloatField(default=0)
+    requirements_hash=models.CharField(max_length=64, blank=True, editable=False)
+    # float32 embedding matrix of required_skills for semantic matching (embeddings.py); the key
+    # covers the embedder and the skills it was computed from
+    skill_vectors=models.BinaryField(blank=True, default=b'', editable=False)
+    skill_vectors_key=models.CharField(max_length=64, blank=True, editable=False)
+    updated_at=models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.job_title
 
+    def compute_content_hash(self):
+        return hashlib.sha256(self.job_description.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra = {'updated_at', 'content_hash'} if 'job_description' in update_fields else {'updated_at'}
+            kwargs['update_fields'] = set(update_fields) | extra
+        super().save(*args, **kwargs)
+
+    @property
+    def requirements_current(self):
+        return bool(self.requirements_hash) and self.requirements_hash == self.compute_content_hash()
+
+    @property
+    def requirements(self):
+        return {
+            'job_required_skills': self.required_skills,
+            'job_required_experience': self.required_experience,
+        }
+
+class CatalogueDeletion(models.Model):
+    """When a catalogue job was last deleted, a single row. A delete leaves no updated_at behind,
+    so the listing's Last-Modified takes the later of this and the newest job's updated_at."""
+    deleted_at=models.DateTimeField()
+
+class JobSkill(models.Model):
+    """Inverted index from normalized skill to the catalogue jobs that require it."""
+    skill=models.CharField(max_length=100)
+    job=models.ForeignKey(JobDesCription, on_delete=models.CASCADE, related_name='skill_index')
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['skill', 'job'], name='unique_job_skill')]
+
+    def __str__(self):
+        return f"{self.skill} → {self.job_id}"
+
+class Skill(models.Model):
+    """A normalized skill name (`normalize_skill`) found on at least one analysed resume."""
+    name=models.CharField(max_length=100, unique=True)
+    # Analyses with this skill; talent search starts from the rarest skill or category asked for
+    analysis_count=models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+class ProjectCategory(models.Model):
+    """A project category found on at least one analysed resume, lower-cased."""
+    name=models.CharField(max_length=100, unique=True)
+    analysis_count=models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Project categories'
+
+    def __str__(self):
+        return self.name
+
 class AnalysisHistory(models.Model):
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='analyses')
     job_description = models.ForeignKey(JobDesCription, on_delete=models.CASCADE)
@@ -20,10 +121,90 @@ class AnalysisHistory(models.Model):
     project_categories = models.JSONField()
     suggestions = models.JSONField(default=list)
     analyzed_at = models.DateTimeField(auto_now_add=True)
+    # The skills and project_categories lists above, normalized for talent search (history.py)
+    skill_set = models.ManyToManyField(Skill, through='AnalysisSkill', related_name='analyses')
+    category_set = models.ManyToManyField(ProjectCategory, through='AnalysisCategory', related_name='analyses')
     
     class Meta:
         ordering = ['-analyzed_at']
         verbose_name_plural = 'Analysis Histories'
+        # Keyset pagination (newest first, optionally per job), per-job leaderboards and talent
+        # search by rank
+        indexes = [
+            models.Index(fields=['analyzed_at', 'id']),
+            models.Index(fields=['job_description', 'analyzed_at', 'id']),
+            models.Index(fields=['job_description', 'rank', 'id']),
+            models.Index(fields=['rank', 'id']),
+        ]
     
     def __str__(self):
-        return f"Analysis {self.id} - Score: {self.rank}%"
\ No newline at end of file
+        return f"Analysis {self.id} - Score: {self.rank}%"
+
+class AnalysisSkill(models.Model):
+    """A skill of an analysed resume. The analysis's job and rank are copied here (history rows
+    never change), so a search for a skill, job and rank range is one index range scan."""
+    analysis = models.ForeignKey(AnalysisHistory, on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+    job_description = models.ForeignKey(JobDesCription, on_delete=models.CASCADE, related_name='+')
+    rank = models.IntegerField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['analysis', 'skill'], name='unique_analysis_skill')]
+        indexes = [
+            models.Index(fields=['skill', 'rank', 'analysis']),
+            models.Index(fields=['skill', 'job_description', 'rank', 'analysis']),
+        ]
+
+    def __str__(self):
+        return f"{self.analysis_id} → {self.skill_id}"
+
+class AnalysisCategory(models.Model):
+    """A project category of an analysed resume, laid out like AnalysisSkill."""
+    analysis = models.ForeignKey(AnalysisHistory, on_delete=models.CASCADE)
+    category = models.ForeignKey(ProjectCategory, on_delete=models.CASCADE)
+    job_description = models.ForeignKey(JobDesCription, on_delete=models.CASCADE, related_name='+')
+    rank = models.IntegerField()
+
+    class Meta:
+        verbose_name_plural = 'Analysis categories'
+        constraints = [models.UniqueConstraint(fields=['analysis', 'category'], name='unique_analysis_category')]
+        indexes = [
+            models.Index(fields=['category', 'rank', 'analysis']),
+            models.Index(fields=['category', 'job_description', 'rank', 'analysis']),
+        ]
+
+    def __str__(self):
+        return f"{self.analysis_id} → {self.category_id}"
+
+class AnalysisJob(models.Model):
+    """An analysis queued by the async API and processed by `manage.py run_analysis_worker`."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='jobs')
+    job_description = models.ForeignKey(JobDesCription, on_delete=models.CASCADE, null=True, blank=True)
+    custom_job_description = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    stage = models.CharField(max_length=30, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"Job {self.id} - {self.status}"
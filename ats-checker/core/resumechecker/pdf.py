@@ -0,0 +1,323 @@
+"""PDF text extraction with per-document limits.
+
+This module deliberately has no Django imports so it can run in a freshly spawned
+subprocess; callers pass the limits explicitly. The parsers (pdfplumber, pdfminer, pypdfium2)
+are imported by the functions that use them, so importing this module, and with it the views,
+does not load them at worker start.
+"""
+import io
+import multiprocessing
+import os
+import time
+from functools import lru_cache
+
+
+class PDFRejected(ValueError):
+    """The PDF cannot or should not be parsed (encrypted, image-only, malformed or over a limit)."""
+
+
+class PDFLimitExceeded(PDFRejected):
+    pass
+
+
+# Triage verdicts that mean the document is over a configured limit rather than unreadable
+LIMIT_VERDICTS = frozenset({'too_large', 'too_many_pages'})
+
+
+def pdf_size(source) -> int:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if hasattr(source, 'seek'):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+        return size
+    return os.path.getsize(source)
+
+
+def _as_stream(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def _open(source, **kwargs):
+    import pdfplumber
+
+    return pdfplumber.open(_as_stream(source), **kwargs)
+
+
+def page_count(pdf) -> int:
+    from pdfminer.pdftypes import resolve1
+
+    return int(resolve1(resolve1(pdf.doc.catalog['Pages'])['Count']))
+
+
+def _check_deadline(deadline, max_seconds):
+    if deadline and time.monotonic() > deadline:
+        raise PDFLimitExceeded(f"PDF took longer than {max_seconds} seconds to read")
+
+
+def _pdfplumber_pages(source, max_pages, max_seconds, deadline):
+    """Full layout analysis: best reading order, slowest."""
+    pages = range(1, max_pages + 1) if max_pages else None
+    with _open(source, pages=pages) as pdf:
+        if max_pages and page_count(pdf) > max_pages:
+            raise PDFLimitExceeded(f"PDF has more than {max_pages} pages")
+        for page in pdf.pages:
+            _check_deadline(deadline, max_seconds)
+            text = page.extract_text()
+            page.close()
+            # Pages without a text layer (scans, images) return None
+            yield text or ""
+
+
+@lru_cache(maxsize=None)
+def _line_text_converter():
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LTChar, LTContainer
+
+    class LineTextConverter(TextConverter):
+        """Writes characters in content-stream order, breaking lines on baseline changes.
+
+        This skips pdfminer's layout analysis (grouping into lines and boxes) entirely; a plain
+        TextConverter without LAParams would run words from consecutive lines together.
+        """
+
+        def receive_layout(self, ltpage):
+            last = None
+            stack = [iter(ltpage)]
+            while stack:
+                item = next(stack[-1], None)
+                if item is None:
+                    stack.pop()
+                    continue
+                if isinstance(item, LTContainer):
+                    stack.append(iter(item))
+                    continue
+                if not isinstance(item, LTChar):
+                    continue
+                if last is not None:
+                    if abs(item.y0 - last.y0) > last.height / 2:
+                        self.write_text("\n")
+                    elif item.x0 - last.x1 > last.size * 0.25:
+                        self.write_text(" ")
+                self.write_text(item.get_text())
+                last = item
+
+    return LineTextConverter
+
+
+def _pdfminer_pages(source, max_pages, max_seconds, deadline):
+    """pdfminer text in content-stream order, without layout analysis; pure Python, no native code."""
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    stream = _as_stream(source)
+    close = not hasattr(stream, 'read')
+    if close:
+        stream = open(stream, 'rb')
+    try:
+        manager = PDFResourceManager()
+        output = io.StringIO()
+        device = _line_text_converter()(manager, output, laparams=None)
+        interpreter = PDFPageInterpreter(manager, device)
+        for number, page in enumerate(PDFPage.get_pages(stream), start=1):
+            if max_pages and number > max_pages:
+                raise PDFLimitExceeded(f"PDF has more than {max_pages} pages")
+            _check_deadline(deadline, max_seconds)
+            interpreter.process_page(page)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+        device.close()
+    finally:
+        if close:
+            stream.close()
+
+
+def _pdfium_pages(source, max_pages, max_seconds, deadline):
+    """PDFium's native text extraction: close to pdfplumber's output at a fraction of the cost."""
+    import pypdfium2
+
+    if hasattr(source, 'read'):
+        source = _read_bytes(source)
+    pdf = pypdfium2.PdfDocument(bytes(source) if isinstance(source, (bytearray, memoryview)) else source)
+    try:
+        if max_pages and len(pdf) > max_pages:
+            raise PDFLimitExceeded(f"PDF has more than {max_pages} pages")
+        for index in range(len(pdf)):
+            _check_deadline(deadline, max_seconds)
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range().replace('\r\n', '\n')
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+BACKENDS = {
+    'pdfplumber': _pdfplumber_pages,
+    'pdfminer': _pdfminer_pages,
+    'pdfium': _pdfium_pages,
+}
+
+
+def iter_pdf_pages(source, max_pages=None, max_seconds=None, backend='pdfplumber'):
+    """Yield each page's text, releasing per-page state as soon as a page is read.
+
+    Raises PDFLimitExceeded if the document has more than `max_pages` pages or reading it takes
+    longer than `max_seconds` (checked between pages).
+    """
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    yield from BACKENDS[backend](source, max_pages, max_seconds, deadline)
+
+
+def _resource_kinds(resources, seen=None) -> tuple:
+    """(has fonts, has images) for a resource dictionary, including those of the Form XObjects it
+    draws, which can carry a page's whole text layer."""
+    from pdfminer.psparser import LIT
+    from pdfminer.pdftypes import resolve1
+
+    seen = set() if seen is None else seen
+    resources = resolve1(resources) or {}
+    has_fonts, has_images = bool(resolve1(resources.get('Font'))), False
+    for xobject in (resolve1(resources.get('XObject')) or {}).values():
+        xobject = resolve1(xobject)
+        if id(xobject) in seen or not hasattr(xobject, 'get'):
+            continue
+        seen.add(id(xobject))
+        if xobject.get('Subtype') is LIT('Form'):
+            fonts, images = _resource_kinds(xobject.get('Resources'), seen)
+            has_fonts, has_images = has_fonts or fonts, has_images or images
+        else:
+            has_images = True
+        if has_fonts and has_images:
+            break
+    return has_fonts, has_images
+
+
+def triage_pdf(source, max_pages=None, max_bytes=None, sample_pages=3) -> dict:
+    """Cheap pre-flight check that reads only the PDF's structure, not its content streams.
+
+    Returns {'verdict': ..., 'pages': ..., 'reason': ...} where verdict is one of 'ok',
+    'too_large', 'too_many_pages', 'encrypted', 'image_only' or 'invalid'.
+    """
+    from pdfminer.pdfdocument import PDFDocument, PDFPasswordIncorrect
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    size = pdf_size(source)
+    if max_bytes and size > max_bytes:
+        return {'verdict': 'too_large', 'pages': None, 'reason': f"PDF is larger than {max_bytes} bytes"}
+    stream = _as_stream(source)
+    close = not hasattr(stream, 'read')
+    if close:
+        stream = open(stream, 'rb')
+    position = stream.tell()
+    try:
+        document = PDFDocument(PDFParser(stream))
+        pages = int(resolve1(resolve1(document.catalog['Pages'])['Count']))
+        if max_pages and pages > max_pages:
+            return {'verdict': 'too_many_pages', 'pages': pages, 'reason': f"PDF has more than {max_pages} pages"}
+        has_fonts = has_images = False
+        for number, page in enumerate(PDFPage.create_pages(document)):
+            if number >= sample_pages:
+                break
+            fonts, images = _resource_kinds(page.resources)
+            has_fonts, has_images = has_fonts or fonts, has_images or images
+        if has_images and not has_fonts:
+            return {'verdict': 'image_only', 'pages': pages,
+                    'reason': "PDF appears to be scanned images with no text layer"}
+        return {'verdict': 'ok', 'pages': pages, 'reason': ''}
+    except PDFPasswordIncorrect:
+        return {'verdict': 'encrypted', 'pages': None, 'reason': "PDF is password protected"}
+    except Exception as e:
+        return {'verdict': 'invalid', 'pages': None, 'reason': f"PDF could not be parsed ({type(e).__name__})"}
+    finally:
+        if close:
+            stream.close()
+        else:
+            stream.seek(position)
+
+
+def extract_text(source, max_pages=None, max_bytes=None, max_seconds=None, backend='pdfplumber', triage=True) -> str:
+    if triage:
+        result = triage_pdf(source, max_pages, max_bytes)
+        if result['verdict'] in LIMIT_VERDICTS:
+            raise PDFLimitExceeded(result['reason'])
+        if result['verdict'] != 'ok':
+            raise PDFRejected(result['reason'])
+    elif max_bytes and pdf_size(source) > max_bytes:
+        raise PDFLimitExceeded(f"PDF is larger than {max_bytes} bytes")
+    return "\f".join(iter_pdf_pages(source, max_pages, max_seconds, backend)).strip()
+
+
+def _read_bytes(source) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        position = source.tell()
+        data = source.read()
+        source.seek(position)
+        return data
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _isolated_worker(data, conn, limits, max_memory_mb, cpu_seconds):
+    try:
+        import resource
+        if max_memory_mb:
+            memory = max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        if cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    except (ImportError, ValueError, OSError):
+        pass  # Resource limits are best effort (not available on Windows)
+    try:
+        conn.send((True, extract_text(data, **limits)))
+    except PDFRejected as e:
+        conn.send((False, str(e)))
+    except MemoryError:
+        conn.send((False, f"PDF needs more than {max_memory_mb} MB to read"))
+    except Exception as e:
+        conn.send((None, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def extract_text_isolated(source, max_pages=None, max_bytes=None, max_seconds=None, backend='pdfplumber',
+                          triage=True, max_memory_mb=None) -> str:
+    """Run extract_text in a child process with memory and CPU rlimits, killing it at the deadline."""
+    if max_bytes and pdf_size(source) > max_bytes:
+        raise PDFLimitExceeded(f"PDF is larger than {max_bytes} bytes")
+    limits = {'max_pages': max_pages, 'max_seconds': max_seconds, 'backend': backend, 'triage': triage}
+    cpu_seconds = int(max_seconds) + 1 if max_seconds else None
+    ctx = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_isolated_worker,
+                          args=(_read_bytes(source), sender, limits, max_memory_mb, cpu_seconds), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        # Allow a little longer than the in-process deadline, which is only checked between pages
+        if not receiver.poll((max_seconds or 60) + 2):
+            raise PDFLimitExceeded(f"PDF took longer than {max_seconds} seconds to read")
+        ok, payload = receiver.recv()
+    except EOFError:
+        raise PDFLimitExceeded("PDF extraction process ran out of resources")
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+    if ok is None:
+        raise RuntimeError(payload)
+    if not ok:
+        raise PDFRejected(payload)
+    return payload
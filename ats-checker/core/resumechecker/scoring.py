@@ -0,0 +1,127 @@
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+
+from .skills import normalize_skill
+
+
+# Upper bound on distinct skills in one batch; keeps row * stride + skill id within int64
+VOCAB_STRIDE = 1 << 24
+
+
+def _education_points(education: str) -> int:
+    if any(degree in education for degree in ['phd', 'doctorate', 'ph.d']):
+        return 10
+    if any(degree in education for degree in ['master', 'msc', 'mba', 'ms']):
+        return 9
+    if any(degree in education for degree in ['bachelor', 'bsc', 'ba', 'bs', 'btech', 'be']):
+        return 7
+    return 5 if education else 0
+
+
+def _skill_keys(skill_lists, n, vocab, raw_ids):
+    """Encode each row's skills as unique int64 keys row * VOCAB_STRIDE + skill id."""
+    lengths = np.fromiter(map(len, skill_lists), dtype=np.int64, count=n)
+    flat = list(chain.from_iterable(skill_lists))
+    for raw in set(flat).difference(raw_ids):
+        raw_ids[raw] = vocab.setdefault(normalize_skill(raw), len(vocab))
+    ids = np.fromiter(map(raw_ids.__getitem__, flat), dtype=np.int64, count=len(flat))
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    keys = np.sort(rows * VOCAB_STRIDE + ids)
+    # Drop duplicate skills within a row (e.g. "Python" and "python ")
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def _similar_counts(job_keys, job_exact, resume_keys, vocab, n, threshold):
+    """Per-row count of job skills without an exact match that a resume skill in the same row is
+    close enough to, by the same rule as embeddings.matched_job_skills."""
+    from .embeddings import NGRAM_DIM, _catalogue_keys, embed_skills
+
+    open_keys = job_keys[~job_exact]
+    if not len(open_keys) or not len(resume_keys):
+        return np.zeros(n, dtype=np.int64)
+    # Pair every unmatched job skill with each resume skill of its row; rows are contiguous in
+    # the sorted resume keys
+    job_rows, resume_rows = open_keys // VOCAB_STRIDE, resume_keys // VOCAB_STRIDE
+    starts = np.searchsorted(resume_rows, job_rows, side='left')
+    counts = np.searchsorted(resume_rows, job_rows, side='right') - starts
+    pair_job = np.repeat(np.arange(len(open_keys)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    job_ids = open_keys[pair_job] % VOCAB_STRIDE
+    resume_ids = resume_keys[np.repeat(starts, counts) + offsets] % VOCAB_STRIDE
+
+    # Each skill in a pair is embedded once for the whole batch
+    used, inverse = np.unique(np.concatenate((job_ids, resume_ids)), return_inverse=True)
+    names = dict(zip(vocab.values(), vocab))
+    used_keys = [names[i] for i in used.tolist()]
+    vectors = embed_skills(used_keys)
+    job_rows_at, resume_rows_at = inverse[:len(job_ids)], inverse[len(job_ids):]
+    similarity = np.einsum('ij,ij->i', vectors[job_rows_at, :NGRAM_DIM], vectors[resume_rows_at, :NGRAM_DIM])
+    if vectors.shape[1] > NGRAM_DIM:
+        similarity = np.maximum(similarity, np.einsum('ij,ij->i', vectors[job_rows_at, NGRAM_DIM:],
+                                                      vectors[resume_rows_at, NGRAM_DIM:]))
+    catalogue = _catalogue_keys()
+    known = np.fromiter((key in catalogue for key in used_keys), dtype=bool, count=len(used_keys))
+    similarity[known[job_rows_at] & known[resume_rows_at]] = 0
+
+    matched = np.zeros(len(open_keys), dtype=bool)
+    matched[pair_job[similarity >= threshold]] = True
+    return np.bincount(job_rows[matched], minlength=n)
+
+
+def calculate_ats_scores(items: list, threshold: float = None) -> np.ndarray:
+    """Score many extraction results at once; element i equals calculate_ats_score(items[i]).
+
+    Skills are interned to integer ids and held as sparse (row, skill id) keys, so the
+    per-candidate intersection becomes one np.isin over the keys plus a bincount. The
+    experience, project and education bands are evaluated over whole arrays with np.select.
+
+    With SKILL_MATCHING=semantic, a job skill without an exact match also counts when a resume
+    skill's embedding is within `threshold` (SKILL_SIMILARITY_THRESHOLD) of it; each distinct
+    skill in the batch is embedded once, so no stored job matrices are needed.
+    """
+    n = len(items)
+    vocab, raw_ids = {}, {}
+    job_keys = _skill_keys([d.get('job_required_skills', []) for d in items], n, vocab, raw_ids)
+    resume_keys = _skill_keys([d.get('resume_skills', []) for d in items], n, vocab, raw_ids)
+    required_exp = np.fromiter((d.get('job_required_experience', 0) for d in items), dtype=np.float64, count=n)
+    candidate_exp = np.fromiter((d.get('resume_experience', 0) for d in items), dtype=np.float64, count=n)
+    num_projects = np.fromiter((len(d.get('resume_projects', [])) for d in items), dtype=np.int64, count=n)
+    education_cache = {}
+    for d in items:
+        edu = d.get('resume_education', '').lower()
+        if edu not in education_cache:
+            education_cache[edu] = _education_points(edu)
+    education = np.fromiter((education_cache[d.get('resume_education', '').lower()] for d in items),
+                            dtype=np.int64, count=n)
+
+    # 1. Keyword/Skill Match (50 points maximum)
+    job_counts = np.bincount(job_keys // VOCAB_STRIDE, minlength=n)
+    # Both key arrays are sorted and unique, so membership is a binary search
+    positions = np.searchsorted(resume_keys, job_keys).clip(max=max(len(resume_keys) - 1, 0))
+    job_exact = resume_keys[positions] == job_keys if len(resume_keys) else np.zeros(len(job_keys), dtype=bool)
+    matched = np.bincount(job_keys[job_exact] // VOCAB_STRIDE, minlength=n)
+    if settings.SKILL_MATCHING == 'semantic':
+        threshold = settings.SKILL_SIMILARITY_THRESHOLD if threshold is None else threshold
+        matched += _similar_counts(job_keys, job_exact, resume_keys, vocab, n, threshold)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skill_points = np.where(job_counts > 0, np.trunc(matched / job_counts * 50), 25).astype(np.int64)
+
+    # 2. Experience Match (25 points maximum)
+    experience_points = np.select(
+        [required_exp == 0, candidate_exp >= required_exp, candidate_exp >= required_exp * 0.75,
+         candidate_exp >= required_exp * 0.5, candidate_exp >= required_exp * 0.25],
+        [20, 25, 20, 15, 10],
+        default=5,
+    )
+
+    # 3. Project Diversity (15 points maximum)
+    project_points = np.select(
+        [num_projects >= 5, num_projects >= 3, num_projects >= 2, num_projects >= 1],
+        [15, 12, 9, 6],
+        default=0,
+    )
+
+    # 4. Education (10 points maximum)
+    return np.minimum(100, skill_points + experience_points + project_points + education)
@@ -1,20 +1,29 @@
 from rest_framework import serializers
-from.models import JobDesCription,Resume,AnalysisHistory
+from.models import JobDesCription,Resume,AnalysisHistory,AnalysisJob
 
 class JobDescriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobDesCription
-        fields = '__all__'
+        exclude = ['skill_vectors', 'skill_vectors_key']
 
 class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = '__all__'
+        read_only_fields = ['content_hash']
 
 class AnalysisHistorySerializer(serializers.ModelSerializer):
     job_title = serializers.CharField(source='job_description.job_title', read_only=True)
     
     class Meta:
         model = AnalysisHistory
-        fields = ['id', 'rank', 'skills', 'total_experience', 'project_categories', 
-                  'suggestions', 'analyzed_at', 'job_title']
\ No newline at end of file
+        fields = ['id', 'resume', 'rank', 'skills', 'total_experience', 'project_categories',
+                  'suggestions', 'analyzed_at', 'job_title']
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    job_title = serializers.CharField(source='job_description.job_title', read_only=True, default=None)
+
+    class Meta:
+        model = AnalysisJob
+        fields = ['id', 'status', 'stage', 'result', 'error', 'attempts', 'created_at',
+                  'started_at', 'finished_at', 'job_title']
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogue import catalogue_cache, record_deletion
+from .embeddings import store_job_skill_vectors
+from .history import index_history_entry
+from .job_index import index_job_skills
+from .models import AnalysisHistory, JobDesCription
+
+
+@receiver(post_save, sender=JobDesCription)
+def update_job_skill_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_job_skills(instance)
+        if settings.SKILL_MATCHING == 'semantic':
+            store_job_skill_vectors(instance)
+
+
+@receiver(post_delete, sender=JobDesCription)
+def record_job_deletion(sender, **kwargs):
+    # Moves the listing's Last-Modified forward, which the remaining rows' updated_at would not
+    record_deletion()
+
+
+@receiver([post_save, post_delete], sender=JobDesCription)
+def invalidate_job_catalogue(sender, **kwargs):
+    # After commit, so a request racing the save cannot cache the listing from before it
+    transaction.on_commit(catalogue_cache.invalidate)
+
+
+@receiver(post_save, sender=AnalysisHistory)
+def index_history_tags(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        index_history_entry(instance)
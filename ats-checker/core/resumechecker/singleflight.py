@@ -0,0 +1,139 @@
+import asyncio
+import copy
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .metrics import COALESCED_REQUESTS, SINGLEFLIGHT_CALLS
+from .models import LLMCallLease
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time in this process; concurrent callers share its result.
+
+    Followers get a deep copy of the leader's result (or its exception), so no caller can mutate
+    what another one sees.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            COALESCED_REQUESTS.inc(flight=self.name, scope='process')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        SINGLEFLIGHT_CALLS.inc(flight=self.name)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` for coroutines on one event loop: concurrent awaits of a key share one call.
+
+    It does not coordinate with threads running the sync `SingleFlight` of the same name; the
+    extraction cache and the LLM lease still stop those from storing duplicate results.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+
+    async def do(self, key, fn):
+        loop = asyncio.get_running_loop()
+        slot = (loop, key)
+        future = self._calls.get(slot)
+        if future is not None:
+            COALESCED_REQUESTS.inc(flight=self.name, scope='process')
+            # shield: a follower that is cancelled must not cancel the leader's call
+            return copy.deepcopy(await asyncio.shield(future))
+
+        SINGLEFLIGHT_CALLS.inc(flight=self.name)
+        future = self._calls[slot] = loop.create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, so an unawaited failure is not logged as lost
+            raise
+        finally:
+            del self._calls[slot]
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _acquire_lease(key, ttl):
+    now = timezone.now()
+    LLMCallLease.objects.filter(key=key, expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            return LLMCallLease.objects.create(key=key, owner=_owner(), expires_at=now + timedelta(seconds=ttl))
+    except IntegrityError:
+        return None
+
+
+def run_with_lease(name, key, lookup, compute, ttl, poll_interval):
+    """Compute a shared result once across processes, using a row in LLMCallLease as the lock.
+
+    The process holding the lease runs `compute`, which must store its result where `lookup` finds
+    it. Others poll `lookup` until the result appears, the lease is released or `ttl` passes, and
+    compute it themselves only if it never shows up.
+    """
+    deadline = time.monotonic() + ttl
+    while True:
+        lease = _acquire_lease(key, ttl)
+        if lease is not None:
+            try:
+                # The previous holder may have finished between our lookup and acquiring the lease
+                result = lookup()
+                return result if result is not None else compute()
+            finally:
+                LLMCallLease.objects.filter(id=lease.id).delete()
+        result = lookup()
+        if result is not None:
+            COALESCED_REQUESTS.inc(flight=name, scope='lease')
+            return result
+        if time.monotonic() > deadline:
+            logger.warning("Gave up waiting for lease %s held by another worker", key)
+            return compute()
+        time.sleep(poll_interval)
@@ -0,0 +1,62 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from .matcher import KeywordMatcher
+
+SKILL_CATALOGUE_PATH = Path(__file__).resolve().parent / 'data' / 'skills.json'
+
+
+def _alias_key(text) -> str:
+    return " ".join(str(text).lower().split())
+
+
+@lru_cache(maxsize=None)
+def load_aliases(path=SKILL_CATALOGUE_PATH):
+    """Return (alias → canonical name, the same mapping for aliases safe to scan free text for)."""
+    with open(path, encoding='utf-8') as f:
+        catalogue = json.load(f)
+    no_scan = {_alias_key(a) for a in catalogue.get('no_scan', [])}
+    aliases = {}
+    for canonical, names in catalogue['skills'].items():
+        for name in [canonical, *names]:
+            aliases[_alias_key(name)] = canonical
+    return aliases, {alias: canonical for alias, canonical in aliases.items() if alias not in no_scan}
+
+
+@lru_cache(maxsize=None)
+def load_catalogue(path=SKILL_CATALOGUE_PATH):
+    """Return (alias → canonical name, KeywordMatcher over scannable aliases) for a skill catalogue."""
+    aliases, scannable = load_aliases(path)
+    return aliases, KeywordMatcher(scannable)
+
+
+def canonical_skill(skill) -> str:
+    """Display name for a skill: the catalogue name for known aliases, otherwise the input trimmed."""
+    aliases, _ = load_catalogue()
+    return aliases.get(_alias_key(skill), str(skill).strip())
+
+
+def normalize_skill(skill) -> str:
+    """Key used to compare skills between resumes and job descriptions."""
+    aliases, _ = load_catalogue()
+    key = _alias_key(skill)
+    canonical = aliases.get(key)
+    return canonical.lower() if canonical else key
+
+
+def find_skills(text: str) -> list:
+    """Catalogue skills mentioned in free text, in order of first appearance."""
+    _, matcher = load_catalogue()
+    return list(dict.fromkeys(matcher.finditer(text)))
+
+
+def merge_skills(*skill_lists) -> list:
+    """Combine skill lists into canonical names, dropping duplicates and keeping first-seen order."""
+    merged = {}
+    for skills in skill_lists:
+        for skill in skills:
+            key = normalize_skill(skill)
+            if key and key not in merged:
+                merged[key] = canonical_skill(skill)
+    return list(merged.values())
@@ -0,0 +1,240 @@
+"""Progressive resume analysis as Server-Sent Events, served at /api/resume/stream/.
+
+Each stage is sent as soon as it is ready instead of after the whole analysis:
+
+- extracted: the resume text has been read (a PDF parse, or a cache hit);
+- skills: the resume's skills, and which of the job's required skills they match or miss;
+- score: the ATS rank and years of experience;
+- categories: the project categories;
+- suggestions: improvement suggestions as text deltas, one suggestion per line, streamed from
+  the LLM token by token when it writes them;
+- error: reading or analyzing the resume failed; `done` follows with the fallback result;
+- done: the full result, the `data` that /api/resume/ returns.
+
+The resume is extracted the way ANALYSIS_MODE says, except that in llm mode (and hybrid mode at low
+local confidence) the extraction is asked for without suggestions: that completion is a fraction
+of the length, so the score arrives sooner, and the suggestions are then streamed by a second
+call. A cached full extraction is used as is.
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.http import StreamingHttpResponse
+
+from .analyzer import (LLM_MODEL, PROMPT_VERSION, analysis_fallback, calculate_ats_score, completion_request,
+                       ensure_job_requirements, extract_job_requirements, extract_resume_data_first, get_resume_text,
+                       governed, job_requirements_for, processing_fallback, suggestions_prompt)
+from .cache import extraction_cache
+from .categories import categorize_projects
+from .embeddings import job_skill_vectors, matched_job_skills, skill_keys
+from .governor import get_governor
+from .llm import get_client
+from .local_engine import extract_resume_locally, local_suggestions
+from .metrics import ANALYSIS_ENGINE, LLM_ERRORS, LLM_REQUESTS, timed
+from .models import JobDesCription
+from .skills import normalize_skill
+
+logger = logging.getLogger(__name__)
+
+_SUGGESTION_LINE_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])?\s*(.*\S)")
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def suggestion_lines(text: str) -> list:
+    """The suggestions in a streamed completion: one per non-empty line, bullets and numbering removed."""
+    return [match.group(1) for line in text.splitlines() if (match := _SUGGESTION_LINE_RE.match(line))]
+
+
+def extract_for_streaming(resume_text: str, job_description):
+    """Return (data, suggestions) for scoring a resume under ANALYSIS_MODE.
+
+    `data` holds the merged job requirements and resume fields. `suggestions` is None when the LLM
+    is still to write them (`stream_suggestions`).
+    """
+    mode = settings.ANALYSIS_MODE
+    if mode != 'llm':
+        with timed('local'):
+            local = extract_resume_locally(resume_text)
+        if mode == 'local':
+            ANALYSIS_ENGINE.inc(engine='local')
+            data = {**job_requirements_for(job_description, use_llm=False), **local}
+            return data, local_suggestions(data)
+        if local['confidence'] >= settings.LOCAL_CONFIDENCE_THRESHOLD:
+            ANALYSIS_ENGINE.inc(engine='hybrid')
+            return {**job_requirements_for(job_description, use_llm=True), **local}, None
+
+    ANALYSIS_ENGINE.inc(engine='llm')
+    if isinstance(job_description, JobDesCription):
+        job_requirements = ensure_job_requirements(job_description)
+    else:
+        job_requirements = extract_job_requirements(job_description)
+    data, suggestions = extract_resume_data_first(resume_text, job_requirements)
+    return {**data, **job_requirements}, suggestions
+
+
+def stream_suggestions(resume_text: str, data: dict):
+    """Yield the text of the LLM's suggestions for a scored resume as it is generated.
+
+    A cached answer is yielded whole; a completed stream is cached for the next request.
+    """
+    cache_key, prompt = suggestions_prompt(resume_text, data, as_lines=True)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        yield ''.join(f"{s}\n" for s in cached.get('improvement_suggestions', []))
+        return
+
+    LLM_REQUESTS.inc()
+    text = []
+    try:
+        with timed('llm_stream'):
+            chunks = get_governor().stream(
+                lambda: get_client().chat.completions.create(**completion_request(prompt, stream=True)),
+                estimated_tokens=governed(prompt)['estimated_tokens'])
+            for chunk in chunks:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    text.append(delta)
+                    yield delta
+    except Exception:
+        LLM_ERRORS.inc()
+        raise
+    extraction_cache.set(cache_key, {'improvement_suggestions': suggestion_lines(''.join(text))},
+                         LLM_MODEL, PROMPT_VERSION)
+
+
+def _skills_event(skills: list, job_skills: list, job_vectors=None) -> dict:
+    if settings.SKILL_MATCHING == 'semantic':
+        mask = dict(zip(skill_keys(job_skills), matched_job_skills(job_skills, skills, job_vectors)))
+        has = lambda s: mask[normalize_skill(s)]
+    else:
+        resume_skills = {normalize_skill(s) for s in skills}
+        has = lambda s: normalize_skill(s) in resume_skills
+    return {
+        'skills': skills,
+        'matched': [s for s in job_skills if has(s)],
+        'missing': [s for s in job_skills if not has(s)],
+    }
+
+
+def analysis_events(source, job_description, content_hash=None):
+    """Yield (event, data) pairs for the analysis of the resume PDF at `source`, ending with 'done'."""
+    try:
+        with timed('extract'):
+            resume_text = get_resume_text(source, content_hash)
+    except Exception as e:
+        result = processing_fallback(e, source)
+        yield 'error', {'message': result['suggestions'][0]}
+        yield 'done', result
+        return
+    yield 'extracted', {'characters': len(resume_text)}
+
+    try:
+        data, suggestions = extract_for_streaming(resume_text, job_description)
+    except Exception as e:
+        result = analysis_fallback(e, resume_text, job_description)
+        yield 'skills', _skills_event(result['skills'], [])
+        yield 'score', {'rank': result['rank'], 'total_experience': result['total_experience']}
+        yield 'categories', {'project_categories': result['project_categories']}
+        for suggestion in result['suggestions']:
+            yield 'suggestions', {'delta': f"{suggestion}\n"}
+        yield 'done', result
+        return
+
+    job_vectors = job_skill_vectors(job_description)
+    yield 'skills', _skills_event(data['resume_skills'], data['job_required_skills'], job_vectors)
+    with timed('score'):
+        rank = calculate_ats_score(data, job_vectors)
+    yield 'score', {'rank': rank, 'total_experience': data['resume_experience']}
+    with timed('score'):
+        project_categories = categorize_projects(data.get('resume_projects', []))
+    yield 'categories', {'project_categories': project_categories}
+
+    if suggestions is None:
+        streamed = []
+        try:
+            for delta in stream_suggestions(resume_text, data):
+                streamed.append(delta)
+                yield 'suggestions', {'delta': delta}
+        except Exception as e:
+            logger.warning("Suggestions stream failed: %s", e)
+        suggestions = suggestion_lines(''.join(streamed))
+    else:
+        for suggestion in suggestions:
+            yield 'suggestions', {'delta': f"{suggestion}\n"}
+    if not suggestions:
+        suggestions = local_suggestions(data)
+        for suggestion in suggestions:
+            yield 'suggestions', {'delta': f"{suggestion}\n"}
+
+    yield 'done', {
+        "rank": rank,
+        "skills": data['resume_skills'],
+        "total_experience": data['resume_experience'],
+        "project_categories": project_categories,
+        "suggestions": suggestions,
+    }
+
+
+async def iterate_in_thread(iterator):
+    """Yield the items of a sync iterator that runs in its own thread.
+
+    Served from an ASGI handler, a StreamingHttpResponse consumes a sync iterator completely
+    before sending anything; this keeps each event flowing as it is produced. The thread closes
+    its database connection when the iterator ends or the client goes away.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:  # the loop has closed
+            stop.set()
+
+    def run():
+        error = None
+        try:
+            for item in iterator:
+                put(item)
+                if stop.is_set():
+                    break
+        except Exception as e:
+            error = e
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            connection.close()
+            put((end, error))
+
+    threading.Thread(target=run, name='sse', daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, tuple) and item[0] is end:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def event_stream_response(events, asgi=False) -> StreamingHttpResponse:
+    """A text/event-stream response sending (event, data) pairs as SSE events."""
+    content = (sse_event(event, data) for event, data in events)
+    response = StreamingHttpResponse(iterate_in_thread(content) if asgi else content,
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx would otherwise buffer the events
+    return response
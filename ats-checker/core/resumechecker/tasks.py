@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .analyzer import process_resume
+from .models import AnalysisHistory, AnalysisJob, Resume
+
+logger = logging.getLogger(__name__)
+
+_storage_executor = None
+_storage_lock = threading.Lock()
+
+
+def _get_storage_executor():
+    global _storage_executor
+    with _storage_lock:
+        if _storage_executor is None:
+            _storage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-storage')
+        return _storage_executor
+
+
+def _write_resume_file(resume_id, name, data):
+    try:
+        resume = Resume.objects.filter(id=resume_id).first()
+        if resume is not None and not resume.resume:
+            resume.resume.save(name, ContentFile(data), save=False)
+            resume.save(update_fields=['resume'])
+    except Exception as e:
+        logger.error("Could not store resume %s: %s", resume_id, e, exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def store_resume_file(resume, upload, mode=None):
+    """Persist the original PDF of a resume that was analysed straight from its upload.
+
+    `mode` defaults to RESUME_STORAGE. Deferred writes return the Future of the background write.
+    """
+    mode = mode or settings.RESUME_STORAGE
+    if mode == 'none' or resume.resume:
+        return None
+    if mode == 'sync':
+        upload.seek(0)
+        resume.resume.save(upload.name, upload, save=False)
+        resume.save(update_fields=['resume'])
+        return None
+    # The upload buffer (or its temp file) is released with the request, so the thread gets a copy
+    data = b''.join(upload.chunks())
+    return _get_storage_executor().submit(_write_resume_file, resume.id, upload.name, data)
+
+
+def record_history(resume, job_description, analysis_data):
+    """Save an analysis result against a catalogue job description."""
+    return AnalysisHistory.objects.create(
+        resume=resume,
+        job_description=job_description,
+        rank=analysis_data.get('rank', 0),
+        skills=analysis_data.get('skills', []),
+        total_experience=analysis_data.get('total_experience', 0),
+        project_categories=analysis_data.get('project_categories', []),
+        suggestions=analysis_data.get('suggestions', [])
+    )
+
+
+def enqueue_analysis(resume, job_description=None, custom_job_description=''):
+    return AnalysisJob.objects.create(
+        resume=resume,
+        job_description=job_description,
+        custom_job_description=custom_job_description or '',
+    )
+
+
+def claim_next_job(worker_id):
+    """Atomically move the oldest pending job to running and return it, or None if the queue is empty.
+
+    Claiming is a conditional UPDATE on the job's status, so it is safe on SQLite (which has no
+    row locks) as well as Postgres: when two workers race for the same row only one update matches.
+    """
+    while True:
+        job_id = (AnalysisJob.objects
+                  .filter(status=AnalysisJob.STATUS_PENDING)
+                  .order_by('created_at')
+                  .values_list('id', flat=True)
+                  .first())
+        if job_id is None:
+            return None
+        claimed = AnalysisJob.objects.filter(id=job_id, status=AnalysisJob.STATUS_PENDING).update(
+            status=AnalysisJob.STATUS_RUNNING,
+            stage='claimed',
+            worker=worker_id,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return AnalysisJob.objects.select_related('resume', 'job_description').get(id=job_id)
+
+
+def requeue_stale_jobs():
+    """Return jobs whose worker died mid-run to the queue, or fail them after too many attempts."""
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYSIS_JOB_TIMEOUT)
+    stale = AnalysisJob.objects.filter(status=AnalysisJob.STATUS_RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=settings.ANALYSIS_JOB_MAX_ATTEMPTS).update(
+        status=AnalysisJob.STATUS_FAILED,
+        error='Analysis timed out',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=AnalysisJob.STATUS_PENDING, stage='', worker='')
+    if failed or requeued:
+        logger.warning("Stale analysis jobs: %s requeued, %s failed", requeued, failed)
+    return requeued
+
+
+def run_job(job):
+    """Run a claimed job to completion, recording history for catalogue job descriptions."""
+    def progress(stage):
+        AnalysisJob.objects.filter(id=job.id).update(stage=stage)
+
+    try:
+        job_description = job.job_description or job.custom_job_description
+        # The view stores the resume text before queueing; the PDF is only on the disk of the
+        # machine that received the upload, which need not be this one
+        stored = job.resume.resume
+        resume_file = stored.path if stored and os.path.exists(stored.path) else None
+        analysis_data = process_resume(resume_file, job_description,
+                                       job.resume.content_hash or None, progress=progress)
+        if job.job_description:
+            progress('saving')
+            record_history(job.resume, job.job_description, analysis_data)
+        AnalysisJob.objects.filter(id=job.id).update(
+            status=AnalysisJob.STATUS_DONE,
+            stage='done',
+            result=analysis_data,
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.error("Analysis job %s failed: %s", job.id, e, exc_info=True)
+        AnalysisJob.objects.filter(id=job.id).update(
+            status=AnalysisJob.STATUS_FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+        )
@@ -1,3 +1,1350 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.urls import path
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from benchmarks.fake_llm import start_fake_llm
+from benchmarks.corpus import LINES_PER_PAGE, make_pdf, make_resume, make_resume_pdf
+from .analyzer import (analyze_resume, analyze_resume_with_llm, calculate_ats_score, compute_content_hash,
+                       ensure_job_requirements, extract_resume_data_first, get_resume_text, match_resume_to_jobs,
+                       set_job_requirements)
+from .batch import SpooledPDF, collect_uploads, rank_resumes
+from .job_index import jobs_matching_skills
+from .compaction import compact_text, compaction_stats, estimate_tokens
+from . import embeddings
+from .embeddings import job_skill_vectors, matched_job_skills, skill_vector_cache
+from .cache import ExtractionCache, LRUCache, extraction_cache
+from .categories import categorize_projects, categorize_projects_batch
+from .llm import get_async_client, get_client, reset_clients
+from .local_engine import detect_education, experience_years, extract_resume_locally, extract_skills
+from .matcher import KeywordMatcher
+from .metrics import Histogram
+from .catalogue import catalogue_cache
+from .governor import AIMDLimiter, CircuitBreaker, LLMGovernor, LLMUnavailable, TokenBucket, reset_governor
+from .history import filter_history, history_page, job_leaderboard, search_history
+from .models import (AnalysisHistory, AnalysisJob, AnalysisSkill, JobDesCription, JobSkill, LLMCallLease, LLMExtraction, ProjectCategory,
+                     Resume, ResumeText, Skill)
+from .pdf import BACKENDS, PDFLimitExceeded, PDFRejected, extract_text, extract_text_isolated, triage_pdf
+from .scoring import calculate_ats_scores
+from .singleflight import AsyncSingleFlight, SingleFlight, run_with_lease
+from .streaming import suggestion_lines
+from .tasks import claim_next_job, requeue_stale_jobs, run_job
+from .skills import canonical_skill, find_skills, merge_skills, normalize_skill
+from .views import AnalyzeResmeAPI, analyze_resume_async
+
+SKILLS = ['Python', 'python ', 'Django', 'React', 'SQL', 'AWS', 'Docker', 'Java', 'Go', 'Kubernetes', 'Pandas', 'NumPy']
+SKILL_VARIANTS = {'Python': ['Python 3', 'python3'], 'Docker': ['Docker Compose'], 'Kubernetes': ['Kubernetes operators'],
+                  'SQL': ['SQL Server', 'MySQL'], 'React': ['React Native', 'ReactJS'], 'Go': ['Golang']}
+EDUCATION = ['', 'PhD in Physics', 'MSc Data Science', 'MBA', 'B.Tech CSE', 'Bachelor of Arts', 'High School', 'Diploma']
+
+
+def make_extraction(rng):
+    return {
+        'job_required_skills': rng.sample(SKILLS, rng.randint(0, 6)),
+        'job_required_experience': rng.choice([0, 1, 2, 3, 4.5, 5, 8]),
+        'resume_skills': rng.sample(SKILLS, rng.randint(0, 8)),
+        'resume_experience': rng.choice([0, 0.5, 1, 2, 3, 3.75, 6, 10]),
+        'resume_education': rng.choice(EDUCATION),
+        'resume_projects': ['project'] * rng.randint(0, 7),
+    }
+
+
+class ResumeTextCacheTests(TestCase):
+    def test_content_hash_hit_skips_the_parser(self):
+        pdf, _ = make_resume_pdf(1)
+        content_hash = compute_content_hash(pdf)
+        text = get_resume_text(pdf, content_hash)
+        self.assertIn('Candidate 1', text)
+        with mock.patch('resumechecker.analyzer.extraxt_text_from_pdf') as parse:
+            self.assertEqual(get_resume_text(pdf, content_hash), text)
+            self.assertEqual(get_resume_text(None, content_hash), text)  # the PDF itself is not needed
+        parse.assert_not_called()
+        self.assertEqual(ResumeText.objects.filter(content_hash=content_hash).count(), 1)
+
+
+class ExtractionCacheTests(TestCase):
+    def test_lru_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        self.assertEqual({k: cache.stats()[k] for k in ('size', 'hits', 'misses', 'evictions')},
+                         {'size': 2, 'hits': 3, 'misses': 1, 'evictions': 1})
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUCache(maxsize=4, ttl=10)
+        with mock.patch('resumechecker.cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with mock.patch('resumechecker.cache.time.monotonic', return_value=109.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('resumechecker.cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_memory_miss_falls_back_to_the_database(self):
+        writer = ExtractionCache(LRUCache(maxsize=4, ttl=60))
+        self.assertIsNone(writer.get('key'))
+        self.assertEqual(writer.db_misses, 1)
+        writer.set('key', {'resume_skills': ['Python']}, 'model', 1)
+
+        # A fresh process: empty memory tier, same table
+        reader = ExtractionCache(LRUCache(maxsize=4, ttl=60))
+        with self.assertNumQueries(1):
+            self.assertEqual(reader.get('key'), {'resume_skills': ['Python']})
+        with self.assertNumQueries(0):
+            self.assertEqual(reader.get('key'), {'resume_skills': ['Python']})
+        self.assertEqual((reader.db_hits, reader.memory.hits), (1, 1))
+
+
+@mock.patch('resumechecker.analyzer.extract_job_requirements',
+            return_value={'job_required_skills': ['Python', 'Django'], 'job_required_experience': 2})
+class JobRequirementsTests(TestCase):
+    def test_requirements_are_extracted_once_per_job_text(self, extract):
+        job = JobDesCription.objects.create(job_title='Backend', job_description='Python and Django, 2 years')
+        self.assertEqual(ensure_job_requirements(job),
+                         {'job_required_skills': ['Python', 'Django'], 'job_required_experience': 2})
+        ensure_job_requirements(JobDesCription.objects.get(id=job.id))
+        job.job_title = 'Senior Backend'
+        job.save()
+        ensure_job_requirements(JobDesCription.objects.get(id=job.id))
+        self.assertEqual(extract.call_count, 1)
+
+        job.job_description = 'Python and Django, 5 years'
+        job.save()
+        self.assertFalse(job.requirements_current)
+        ensure_job_requirements(JobDesCription.objects.get(id=job.id))
+        self.assertEqual(extract.call_count, 2)
+        extract.assert_called_with('Python and Django, 5 years')
+
+
+class AnalysisQueueTests(TestCase):
+    def setUp(self):
+        self.resume = Resume.objects.create(content_hash='queued')
+
+    def test_workers_racing_for_a_job_never_both_claim_it(self):
+        first, second = [AnalysisJob.objects.create(resume=self.resume, custom_job_description='Python') for _ in range(2)]
+        raced = []
+
+        # Worker b claims the oldest job between worker a's SELECT of it and a's UPDATE
+        def other_worker_first(execute, sql, params, many, context):
+            if sql.startswith('UPDATE') and not raced:
+                raced.append(None)
+                raced[0] = claim_next_job('worker-b')
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(other_worker_first):
+            claimed = claim_next_job('worker-a')
+        self.assertEqual(raced[0].id, first.id)
+        self.assertEqual(claimed.id, second.id)
+        self.assertEqual(dict(AnalysisJob.objects.values_list('id', 'worker')), {first.id: 'worker-b', second.id: 'worker-a'})
+        self.assertEqual(set(AnalysisJob.objects.values_list('attempts', flat=True)), {1})
+        self.assertIsNone(claim_next_job('worker-c'))
+
+    @override_settings(ANALYSIS_JOB_TIMEOUT=60, ANALYSIS_JOB_MAX_ATTEMPTS=3)
+    def test_only_expired_leases_are_requeued(self):
+        now = timezone.now()
+
+        def running(started_ago, attempts=1):
+            return AnalysisJob.objects.create(resume=self.resume, status=AnalysisJob.STATUS_RUNNING, worker='w',
+                                              started_at=now - timedelta(seconds=started_ago), attempts=attempts)
+
+        live, expired, exhausted = running(30), running(90), running(90, attempts=3)
+        pending = AnalysisJob.objects.create(resume=self.resume)
+        self.assertEqual(requeue_stale_jobs(), 1)
+        status = dict(AnalysisJob.objects.values_list('id', 'status'))
+        self.assertEqual([status[job.id] for job in (live, expired, exhausted, pending)],
+                         ['running', 'pending', 'failed', 'pending'])
+        self.assertEqual(AnalysisJob.objects.get(id=expired.id).worker, '')
+
+
+def fake_analysis(text, job):
+    seed = int(re.search(r'Candidate (\d+)', text).group(1))
+    if seed == 5:
+        raise RuntimeError('extraction failed')
+    return {'rank': seed * 10, 'skills': [], 'total_experience': 0, 'project_categories': [], 'suggestions': []}
+
+
+def catalogue_job(title='Backend', skills=('Python',), experience=0):
+    job = JobDesCription.objects.create(job_title=title, job_description=f'{title}: {", ".join(skills)}')
+    set_job_requirements(job, {'job_required_skills': list(skills), 'job_required_experience': experience})
+    job.save()
+    return job
+
+
+@mock.patch('resumechecker.batch.analyze_resume', side_effect=fake_analysis)
+class BatchRankTests(TestCase):
+    def setUp(self):
+        self.job = catalogue_job()
+
+    def post(self, files, **data):
+        response = self.client.post('/api/resume/batch/', {'job_description': self.job.id, **data, 'resumes': [
+            SimpleUploadedFile(name, content, content_type='application/pdf') for name, content in files]})
+        if response.streaming:
+            return response, [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        return response, response.json()
+
+    def test_results_and_per_file_errors_stream_before_the_ranked_summary(self, analyze):
+        response, lines = self.post([('a.pdf', make_resume_pdf(3)[0]), ('b.pdf', make_resume_pdf(7)[0]),
+                                     ('broken.pdf', b'not a pdf'), ('c.pdf', make_resume_pdf(5)[0])])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([line['type'] for line in lines[:-1]].count('result'), 2)
+        errors = {line['filename']: line['message'] for line in lines if line['type'] == 'error'}
+        self.assertTrue(errors['broken.pdf'].startswith('Could not read PDF'))
+        self.assertEqual(errors['c.pdf'], 'Could not analyze resume: extraction failed')
+        summary = lines[-1]
+        self.assertEqual((summary['type'], summary['total'], summary['analyzed']), ('summary', 4, 2))
+        self.assertEqual([(r['filename'], r['rank']) for r in summary['ranking']], [('b.pdf', 70), ('a.pdf', 30)])
+
+    def test_job_requirement_failure_is_reported_in_the_stream(self, analyze):
+        with mock.patch('resumechecker.batch.ensure_job_requirements',
+                        side_effect=ValueError('GROQ_API_KEY environment variable is not set')):
+            response, lines = self.post([('a.pdf', make_resume_pdf(3)[0])])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([line['type'] for line in lines], ['error', 'summary'])
+        self.assertIn('GROQ_API_KEY', lines[0]['message'])
+        self.assertEqual(lines[1]['analyzed'], 0)
+        analyze.assert_not_called()
+
+    @override_settings(ANALYSIS_MODE='local', GROQ_API_KEY=None)
+    def test_local_mode_ranks_without_an_llm(self, analyze):
+        analyze.side_effect = analyze_resume
+        self.job = JobDesCription.objects.create(job_title='Data', job_description=JOB_POSTING)
+        files = [(f'{seed}.pdf', make_resume_pdf(seed)[0]) for seed in (3, 7)]
+        _, lines = self.post(files)
+        self.assertEqual([line['type'] for line in lines], ['result', 'result', 'summary'])
+        expected = {name: analyze_resume(get_resume_text(pdf, compute_content_hash(pdf)), self.job)['rank']
+                    for name, pdf in files}
+        self.assertEqual({r['filename']: r['rank'] for r in lines[-1]['ranking']}, expected)
+
+    @override_settings(BATCH_MAX_FILE_SIZE=1000)
+    def test_file_size_limit_applies_to_every_upload(self, analyze):
+        _, body = self.post([('big.pdf', make_resume_pdf(3)[0])])
+        self.assertEqual(body['message'], 'big.pdf is larger than 1000 bytes')
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_large_pdfs_are_spooled_to_disk(self, analyze):
+        pdf = make_resume_pdf(3)[0]
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('zipped.pdf', pdf)
+        archive.seek(0)
+        uploads = collect_uploads([], archive)
+        self.assertIsInstance(uploads[0][1], SpooledPDF)
+        lines = list(rank_resumes(uploads, self.job))
+        self.assertEqual(json.loads(lines[-1])['ranking'][0]['rank'], 30)
+        self.assertFalse(os.path.exists(uploads[0][1]))
+
+        archive.seek(0)
+        _, lines = self.post([('a.pdf', pdf)], archive=SimpleUploadedFile('cvs.zip', archive.read()))
+        self.assertEqual(lines[-1]['analyzed'], 2)
+
+    @override_settings(BATCH_LLM_CONCURRENCY=1)
+    def test_disconnect_cancels_queued_work(self, analyze):
+        analyze.side_effect = lambda text, job: time.sleep(0.3) or fake_analysis(text, job)
+        uploads = []
+        for seed in (1, 2, 3, 4):
+            pdf = make_resume_pdf(seed)[0]
+            ResumeText.objects.create(content_hash=compute_content_hash(pdf), text=f'Candidate {seed}')
+            uploads.append((f'{seed}.pdf', pdf))
+        stream = rank_resumes(uploads, self.job)
+        self.assertEqual(json.loads(next(stream))['type'], 'result')
+        started = time.perf_counter()
+        stream.close()
+        self.assertLess(time.perf_counter() - started, 0.2)
+        time.sleep(0.5)
+        self.assertEqual(analyze.call_count, 2)  # the one running at disconnect finished, the rest never ran
+
+
+class JobMatchingTests(TestCase):
+    RESUME = {'resume_skills': ['Python'], 'resume_experience': 1, 'resume_education': 'BSc',
+              'resume_projects': ['api', 'etl']}
+
+    def match(self, top_k, resume=None):
+        with mock.patch('resumechecker.analyzer.extract_resume_data', return_value=resume or self.RESUME):
+            return match_resume_to_jobs('resume text', top_k)
+
+    def test_skill_index_follows_job_requirements(self):
+        job = catalogue_job(skills=('Python', 'postgres', 'PostgreSQL'))
+        self.assertEqual(sorted(JobSkill.objects.filter(job=job).values_list('skill', flat=True)), ['postgresql', 'python'])
+        self.assertEqual(jobs_matching_skills(['Postgres', 'Python', 'Go']), {job.id: 2})
+        job.job_description = 'Rewritten'
+        job.save()
+        self.assertFalse(JobSkill.objects.filter(job=job).exists())  # stale requirements are not indexed
+
+    def test_job_sharing_no_skill_can_still_rank_first(self):
+        catalogue_job('Overlap', skills=('Python', 'Java', 'Go', 'Rust', 'Scala', 'Kotlin', 'Swift', 'C', 'Ruby', 'PHP'),
+                      experience=10)
+        cobol = catalogue_job('Cobol', skills=('Cobol',), experience=0)
+        self.assertEqual([m['job_id'] for m in self.match(1)['matches']], [cobol.id])
+
+    def test_matches_equal_scoring_every_job(self):
+        rng = random.Random(11)
+        for i in range(30):
+            catalogue_job(f'Job {i}', skills=rng.sample(SKILLS, rng.randint(0, 4)), experience=rng.choice([0, 1, 3, 8]))
+        for _ in range(10):
+            resume = make_extraction(rng)
+            expected = sorted(({'job_id': job.id, 'rank': calculate_ats_score({**resume, **job.requirements})}
+                               for job in JobDesCription.objects.all()), key=lambda m: (-m['rank'], m['job_id']))
+            for k in (1, 5, 40):
+                matches = self.match(k, resume)['matches']
+                self.assertEqual([(m['job_id'], m['rank']) for m in matches],
+                                 [(m['job_id'], m['rank']) for m in expected[:k]])
+
+    def test_endpoint(self):
+        job = catalogue_job(skills=('Python', 'Django'))
+        upload = SimpleUploadedFile('cv.pdf', make_resume_pdf(2)[0], content_type='application/pdf')
+        with mock.patch('resumechecker.analyzer.extract_resume_data', return_value=self.RESUME):
+            body = self.client.post('/api/resume/match-jobs/', {'resume': upload, 'top_k': 3}).json()
+        self.assertTrue(body['status'])
+        self.assertEqual(body['data']['matches'], [
+            {'job_id': job.id, 'job_title': 'Backend', 'rank': 25 + 20 + 9 + 7, 'matched_skills': ['Python']}])
+        self.assertFalse(self.client.post('/api/resume/match-jobs/', {}).json()['status'])
+
+    @override_settings(ANALYSIS_MODE='local', GROQ_API_KEY=None)
+    def test_local_mode_needs_no_llm(self):
+        current = catalogue_job(skills=('Python', 'Django'))
+        stale = JobDesCription.objects.create(job_title='Data', job_description=JOB_POSTING)
+        pdf = make_resume_pdf(2)[0]
+        upload = SimpleUploadedFile('cv.pdf', pdf, content_type='application/pdf')
+        body = self.client.post('/api/resume/match-jobs/', {'resume': upload}).json()
+        self.assertTrue(body['status'], body['message'])
+        text = get_resume_text(pdf, compute_content_hash(pdf))
+        self.assertEqual({m['job_id']: m['rank'] for m in body['data']['matches']},
+                         {job.id: analyze_resume(text, job)['rank'] for job in (current, stale)})
+        self.assertFalse(JobDesCription.objects.get(id=stale.id).requirements_current)  # local ones are not stored
+
+
+class BatchScoringTests(SimpleTestCase):
+    def test_matches_scalar_score(self):
+        rng = random.Random(7)
+        items = [make_extraction(rng) for _ in range(2000)]
+        # Variants that only semantic matching credits ("Docker Compose" for Docker)
+        for d in items[::2]:
+            d['resume_skills'] = [rng.choice(SKILL_VARIANTS.get(s.strip(), [s])) for s in d['resume_skills']]
+        for mode in ('exact', 'semantic'):
+            with self.subTest(mode=mode), override_settings(SKILL_MATCHING=mode):
+                self.assertEqual(calculate_ats_scores(items).tolist(), [calculate_ats_score(d) for d in items])
+
+    @override_settings(SKILL_MATCHING='semantic')
+    def test_semantic_matching(self):
+        item = {'job_required_skills': ['Kubernetes'], 'resume_skills': ['Kubernetes operators']}
+        self.assertEqual(calculate_ats_scores([item]).tolist(), [calculate_ats_score(item)])
+        self.assertEqual(calculate_ats_scores([item]).tolist(), [70])
+        self.assertEqual(calculate_ats_scores([item], threshold=1.01).tolist(), [20])
+
+    def test_missing_fields_and_empty_batch(self):
+        self.assertEqual(calculate_ats_scores([{}]).tolist(), [calculate_ats_score({})])
+        self.assertEqual(calculate_ats_scores([]).tolist(), [])
+
+
+class SkillNormalizationTests(SimpleTestCase):
+    def test_aliases_map_to_canonical_names(self):
+        self.assertEqual(canonical_skill('React.js'), 'React')
+        self.assertEqual(canonical_skill(' JS '), 'JavaScript')
+        self.assertEqual(normalize_skill('Postgres'), normalize_skill('PostgreSQL'))
+        self.assertEqual(canonical_skill('Some Internal Tool'), 'Some Internal Tool')
+
+    def test_distinct_skills_are_not_aliases(self):
+        self.assertNotEqual(normalize_skill('Jest'), normalize_skill('pytest'))
+        self.assertEqual([canonical_skill(s) for s in ['unix', 'scrum', 'tf', 'transformers']],
+                         ['Unix', 'Scrum', 'tf', 'transformers'])
+        data = {'job_required_skills': ['Jest'], 'resume_skills': ['pytest']}
+        self.assertEqual(calculate_ats_score(data), calculate_ats_score({**data, 'resume_skills': []}))
+        self.assertEqual(find_skills("Tested with pytest and Jest on Unix"), ['Pytest', 'Unix'])
+
+    def test_scan_respects_word_boundaries(self):
+        text = "Built ML-based REST APIs with Node.js, scikit-learn and C++; maintained a Java app.\nGoing to Spring."
+        self.assertEqual(find_skills(text), ['Machine Learning', 'REST API', 'Node.js', 'Scikit-learn', 'C++', 'Java'])
+        self.assertEqual(find_skills("Used JavaScript daily"), ['JavaScript'])
+
+    def test_matcher_prefers_longest_match(self):
+        matcher = KeywordMatcher({'react': 'React', 'react native': 'React Native'})
+        self.assertEqual(list(matcher.finditer("React Native and React")), ['React Native', 'React'])
+
+    def test_merge_keeps_first_spelling_and_order(self):
+        self.assertEqual(merge_skills(['reactjs', 'Python'], ['React', 'Docker']), ['React', 'Python', 'Docker'])
+
+    def test_score_uses_canonical_skills(self):
+        data = {'job_required_skills': ['React', 'JavaScript'], 'resume_skills': ['React.js', 'JS']}
+        self.assertEqual(calculate_ats_score(data), calculate_ats_score({**data, 'resume_skills': ['React', 'JavaScript']}))
+
+
+class ProjectCategorizationTests(SimpleTestCase):
+    def test_keywords_match_whole_words_only(self):
+        self.assertEqual(categorize_projects(['Maintained a payroll application']), ['General Software Development'])
+        self.assertEqual(categorize_projects(['AI-powered chatbot', 'Flutter app']), ['AI/ML', 'Mobile'])
+
+    def test_plural_keywords(self):
+        self.assertEqual(categorize_projects(['Built two iPhone apps']), ['Mobile'])
+        self.assertEqual(categorize_projects(['Migrated databases']), ['Data Science'])
+        self.assertEqual(categorize_projects(['Client websites']), ['Web Development'])
+        self.assertEqual(categorize_projects(['Recurrent neural networks for deployments']), ['AI/ML', 'DevOps'])
+        self.assertEqual(categorize_projects(['AWS Lambda']), ['Cloud'])
+        self.assertEqual(categorize_projects(['Maintained applications']), ['General Software Development'])
+
+    def test_multi_word_keywords_and_taxonomy_order(self):
+        self.assertEqual(categorize_projects(['CI/CD pipeline on AWS', 'React Native client']),
+                         ['Web Development', 'Mobile', 'Cloud', 'DevOps'])
+
+    def test_batch_matches_single_calls(self):
+        batch = [['Django website'], [], ['Sales dashboard with Pandas and SQL']]
+        self.assertEqual(categorize_projects_batch(batch), [categorize_projects(p) for p in batch])
+
+
+class PDFExtractionTests(SimpleTestCase):
+    def test_backends_extract_the_same_skills(self):
+        data, facts = make_resume_pdf(3, pages=2)
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                found = {normalize_skill(s) for s in find_skills(extract_text(data, backend=backend))}
+                self.assertTrue({normalize_skill(s) for s in facts['skills']} <= found)
+
+    def test_triage_rejects_before_parsing(self):
+        self.assertEqual(triage_pdf(make_resume_pdf(1)[0])['verdict'], 'ok')
+        self.assertEqual(triage_pdf(make_pdf([[]], image_only=True))['verdict'], 'image_only')
+        self.assertEqual(triage_pdf(b'not a pdf')['verdict'], 'invalid')
+        with self.assertRaises(PDFRejected):
+            extract_text(make_pdf([[]], image_only=True))
+
+    def test_triage_finds_text_in_form_xobjects(self):
+        data = make_pdf([['Python Django engineer']], in_form=True)
+        self.assertEqual(triage_pdf(data)['verdict'], 'ok')
+        self.assertEqual(extract_text(data), 'Python Django engineer')
+
+    def test_limits(self):
+        data, _ = make_resume_pdf(2, pages=3)
+        for backend in BACKENDS:
+            with self.assertRaises(PDFLimitExceeded):
+                extract_text(data, max_pages=2, backend=backend, triage=False)
+        with self.assertRaises(PDFLimitExceeded):
+            extract_text(data, max_bytes=100)
+        with self.assertRaises(PDFLimitExceeded):
+            extract_text(data, max_pages=2)
+
+
+def _address_space_mb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) // 1024 for line in f if line.startswith('VmSize:'))
+
+
+class IsolatedExtractionTests(SimpleTestCase):
+    # The child is forked, so patching extract_text here replaces what it runs
+
+    def test_returns_the_child_text_and_rejections(self):
+        data, _ = make_resume_pdf(4)
+        self.assertEqual(extract_text_isolated(data, max_seconds=30), extract_text(data))
+        with self.assertRaisesMessage(PDFRejected, "scanned images"):
+            extract_text_isolated(make_pdf([[]], image_only=True), max_seconds=30)
+
+    def test_hung_parser_is_killed_at_the_deadline(self):
+        started = time.monotonic()
+        with mock.patch('resumechecker.pdf.extract_text', side_effect=lambda *a, **k: time.sleep(30)):
+            with self.assertRaises(PDFLimitExceeded):
+                extract_text_isolated(b'%PDF', max_seconds=0.5)
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_crashed_parser_is_rejected(self):
+        with mock.patch('resumechecker.pdf.extract_text', side_effect=lambda *a, **k: os._exit(1)):
+            with self.assertRaisesMessage(PDFRejected, "ran out of resources"):
+                extract_text_isolated(b'%PDF', max_seconds=5)
+
+    @skipUnless(os.path.exists('/proc/self/status'), "needs /proc to size the memory cap")
+    def test_memory_cap_rejects_oversized_documents(self):
+        cap = _address_space_mb() + 64
+        with mock.patch('resumechecker.pdf.extract_text', side_effect=lambda *a, **k: bytearray(256 * 1024 * 1024)):
+            with self.assertRaisesMessage(PDFRejected, f"more than {cap} MB"):
+                extract_text_isolated(b'%PDF', max_seconds=5, max_memory_mb=cap)
+
+
+@mock.patch('resumechecker.analyzer.analyze_resume_with_llm', return_value={'rank': 50})
+class UploadParsingTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.settings_override = override_settings(MEDIA_ROOT=media.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.pdf, self.facts = make_resume_pdf(5)
+
+    def post(self, **extra):
+        upload = SimpleUploadedFile('cv.pdf', self.pdf, content_type='application/pdf')
+        return self.client.post('/api/resume/', {'resume': upload, 'custom_job_description': 'Python developer', **extra})
+
+    @override_settings(RESUME_STORAGE='none')
+    def test_parses_upload_without_storing_it(self, analyze):
+        self.assertEqual(self.post().json()['data'], {'rank': 50})
+        resume = Resume.objects.get()
+        self.assertFalse(resume.resume)
+        text = ResumeText.objects.get(content_hash=resume.content_hash).text
+        self.assertIn('Candidate 5', text)
+        analyze.assert_called_once_with(text, 'Python developer')
+
+    @override_settings(RESUME_STORAGE='none')
+    def test_stage_timings_and_metrics(self, analyze):
+        stages = [entry.split(';')[0] for entry in self.post()['Server-Timing'].split(', ')]
+        self.assertEqual(stages, ['upload', 'extract', 'storage', 'total'])
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('ats_stage_duration_seconds_bucket{stage="extract",le="+Inf",pid="', body)
+        self.assertIn('ats_http_request_duration_seconds_count{view="analyze-resume",method="POST",pid="', body)
+        self.assertIn('ats_cache_lookups_total{cache="resume_text",result="miss",pid="', body)
+
+    @override_settings(RESUME_STORAGE='sync')
+    def test_sync_storage_writes_file_once(self, analyze):
+        self.post()
+        self.post()
+        resume = Resume.objects.get()
+        with resume.resume.open('rb') as f:
+            self.assertEqual(f.read(), self.pdf)
+
+    @override_settings(RESUME_STORAGE='none')
+    def test_async_mode_stores_text_for_worker(self, analyze):
+        self.assertEqual(self.post(**{'async': 'true'}).json()['data']['status'], 'pending')
+        # The worker may be on another machine, so it gets the text, not the PDF
+        self.assertTrue(ResumeText.objects.filter(content_hash=Resume.objects.get().content_hash).exists())
+        self.assertFalse(Resume.objects.get().resume)
+
+
+JOB_POSTING = """About the job
+
+Globex is a fast-growing company on a mission to make   logistics delightful. We value curiosity,
+ownership and kindness, and we have offices in five countries with a hybrid working model.
+
+Responsibilities
+- Build and maintain REST APIs in Python and Django
+- Own deployments on AWS with Docker and Kubernetes
+
+Requirements
+- 3+ years of professional experience
+- Strong PostgreSQL and Redis skills
+
+Benefits
+Private health insurance, a learning budget, 30 days of paid leave and a yearly team retreat.
+
+Equal Opportunity Employer
+Globex is an equal opportunity employer and welcomes applications from everyone.
+"""
+
+
+class PromptCompactionTests(SimpleTestCase):
+    def resume_fixture(self, seed):
+        lines, facts = make_resume(seed, pages=3)
+        lines += ['', 'REFERENCES'] + [f'Referee {i}, Manager at Globex, referee{i}@example.com' for i in range(40)]
+        body = LINES_PER_PAGE - 2
+        pages = [[f'Candidate {seed}   |   Resume'] + [f'  {line}  ' for line in lines[i:i + body]] + [f'Page {n + 1} of 4']
+                 for n, i in enumerate(range(0, len(lines), body))]
+        return pages, facts
+
+    def test_compacted_resumes_keep_extraction_facts(self):
+        for seed in range(8):
+            pages, facts = self.resume_fixture(seed)
+            text = extract_text(make_pdf(pages), backend='pdfium')
+            budget = estimate_tokens(text) // 2
+            compacted, report = compact_text(text, budget)
+            with self.subTest(seed=seed):
+                self.assertLessEqual(report['tokens_after'], budget)
+                self.assertEqual(report['dropped_sections'], ['references'])
+                self.assertEqual(compacted.count(f'Candidate {seed} | Resume'), 1)
+                self.assertNotIn('Page 2 of 4', compacted)
+                self.assertNotIn('  ', compacted)
+                self.assertEqual({normalize_skill(s) for s in find_skills(compacted)},
+                                 {normalize_skill(s) for s in find_skills(text)})
+                self.assertIn(f"{facts['years']} years of experience", compacted)
+
+    def test_job_boilerplate_is_dropped_first(self):
+        compacted, report = compact_text(JOB_POSTING, 60, kind='job')
+        self.assertNotIn('Private health insurance', compacted)
+        self.assertNotIn('mission', compacted)
+        self.assertIn('3+ years of professional experience', compacted)
+        self.assertEqual(set(find_skills(compacted)), set(find_skills(JOB_POSTING)))
+        self.assertLess(report['tokens_after'], report['tokens_before'])
+
+    def test_no_budget_only_cleans(self):
+        compacted, report = compact_text('Python   developer\n\n\n\nPage 1 of 1\nDjango')
+        self.assertEqual(compacted, 'Python developer\n\nDjango')
+        self.assertEqual(report['dropped_sections'], [])
+
+    def test_year_lines_are_not_page_numbers(self):
+        compacted, _ = compact_text('B.Sc. Computer Science\n2020\n- 2 -\nPage 3 (of 4)\n3/4')
+        self.assertEqual(compacted, 'B.Sc. Computer Science\n2020')
+
+
+class AnalysisHistoryTests(TestCase):
+    def setUp(self):
+        self.job = JobDesCription.objects.create(job_title='Backend', job_description='Python developer')
+        other = JobDesCription.objects.create(job_title='Frontend', job_description='React developer')
+        self.resumes = [Resume.objects.create(content_hash=str(i)) for i in range(6)]
+        for i in range(12):
+            AnalysisHistory.objects.create(resume=self.resumes[i % 6], job_description=self.job if i % 4 else other,
+                                           rank=i * 7 % 100, skills=[], total_experience=0, project_categories=[])
+
+    def test_cursor_pages_cover_history_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                rows, cursor = history_page(filter_history({}), cursor, limit=5)
+                titles = [row.job_description.job_title for row in rows]
+            seen += [row.id for row in rows]
+            self.assertEqual(len(titles), len(rows))
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(AnalysisHistory.objects.order_by('-analyzed_at', '-id').values_list('id', flat=True)))
+
+    def test_filters(self):
+        rows, _ = history_page(filter_history({'job': str(self.job.id), 'min_rank': '30', 'max_rank': '70'}), limit=100)
+        self.assertTrue(rows)
+        self.assertTrue(all(row.job_description_id == self.job.id and 30 <= row.rank <= 70 for row in rows))
+        self.assertEqual(filter_history({'until': '2000-01-01'}).count(), 0)
+        with self.assertRaises(ValueError):
+            filter_history({'since': 'yesterday'})
+
+    def test_api_pagination_and_leaderboard(self):
+        body = self.client.get('/api/history/', {'limit': 4}).json()
+        self.assertEqual(len(body['data']), 4)
+        body = self.client.get('/api/history/', {'limit': 100, 'cursor': body['next_cursor']}).json()
+        self.assertEqual(len(body['data']), 8)
+        self.assertIsNone(body['next_cursor'])
+
+        leaders = self.client.get(f'/api/jobs/{self.job.id}/leaderboard/', {'k': 3}).json()['data']
+        self.assertEqual([entry['rank'] for entry in leaders], [77, 70, 63])
+        resumes = [entry.resume_id for entry in job_leaderboard(self.job, 10)]
+        self.assertEqual(len(resumes), len(set(resumes)))
+        self.assertEqual(len(resumes), 6)
+
+
+class TalentSearchTests(TestCase):
+    SKILL_POOL = ['Kubernetes', 'Golang', 'Python', 'Docker', 'React', 'SQL']
+    CATEGORY_POOL = ['Web Development', 'Cloud', 'AI']
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.jobs = [JobDesCription.objects.create(job_title=f'Job {i}', job_description=f'Job {i}') for i in range(2)]
+        resume = Resume.objects.create(content_hash='r')
+        for i in range(60):
+            AnalysisHistory.objects.create(resume=resume, job_description=self.jobs[i % 2], rank=rng.randint(0, 100),
+                                           skills=rng.sample(self.SKILL_POOL, rng.randint(0, 4)), total_experience=0,
+                                           project_categories=rng.sample(self.CATEGORY_POOL, rng.randint(0, 2)))
+
+    def expected(self, skills=(), categories=(), job=None, min_rank=0):
+        rows = [row for row in AnalysisHistory.objects.all()
+                if {normalize_skill(s) for s in skills} <= {normalize_skill(s) for s in row.skills}
+                and {c.lower() for c in categories} <= {c.lower() for c in row.project_categories}
+                and (job is None or row.job_description_id == job.id) and row.rank >= min_rank]
+        return [row.id for row in sorted(rows, key=lambda row: (-row.rank, -row.id))]
+
+    def search_all(self, params, limit=7):
+        ids, cursor = [], None
+        while True:
+            rows, cursor = search_history(params, cursor, limit)
+            ids += [row.id for row in rows]
+            if cursor is None:
+                return ids
+
+    def test_results_match_a_full_scan(self):
+        cases = [
+            ({'skills': 'kubernetes,go', 'min_rank': '40'}, dict(skills=['Kubernetes', 'Go'], min_rank=40)),
+            ({'skills': 'Python', 'categories': 'cloud', 'job': str(self.jobs[0].id)},
+             dict(skills=['Python'], categories=['Cloud'], job=self.jobs[0])),
+            ({'categories': 'AI'}, dict(categories=['AI'])),
+            ({'job': str(self.jobs[1].id), 'min_rank': '50'}, dict(job=self.jobs[1], min_rank=50)),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                self.assertTrue(self.expected(**expected))
+                self.assertEqual(self.search_all(params), self.expected(**expected))
+
+    def test_history_rows_are_linked_to_interned_tags(self):
+        entry = AnalysisHistory.objects.create(resume=Resume.objects.first(), job_description=self.jobs[0], rank=88,
+                                               skills=['golang', 'Go', 'Rust'], total_experience=0,
+                                               project_categories=['Cloud'])
+        self.assertEqual(sorted(entry.skill_set.values_list('name', flat=True)), ['go', 'rust'])
+        self.assertEqual(Skill.objects.get(name='rust').analysis_count, 1)
+        self.assertEqual(AnalysisSkill.objects.get(analysis=entry, skill__name='go').rank, 88)
+        self.assertEqual(ProjectCategory.objects.get(name='cloud').analysis_count,
+                         AnalysisHistory.objects.filter(category_set__name='cloud').count())
+
+    def test_unknown_tag_finds_nothing_without_scanning(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(search_history({'skills': 'kubernetes,cobol'}), ([], None))
+
+    def test_page_costs_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(4):  # two tag lookups, the index scan and the rows
+            rows, cursor = search_history({'skills': 'python', 'categories': 'web development'}, limit=2)
+            [row.job_description.job_title for row in rows]
+        self.assertTrue(cursor)
+
+    def test_backfill_migration_rebuilds_the_links(self):
+        from importlib import import_module
+        from django.apps import apps
+        expected = sorted(AnalysisSkill.objects.values_list('analysis_id', 'skill__name', 'rank'))
+        counts = dict(Skill.objects.values_list('name', 'analysis_count'))
+        Skill.objects.all().delete()
+        ProjectCategory.objects.all().delete()
+        import_module('resumechecker.migrations.0013_talent_search').backfill_tags(apps, None)
+        self.assertEqual(sorted(AnalysisSkill.objects.values_list('analysis_id', 'skill__name', 'rank')), expected)
+        self.assertEqual(dict(Skill.objects.values_list('name', 'analysis_count')), counts)
+
+    def test_api(self):
+        body = self.client.get('/api/history/search/', {'skills': ['kubernetes', 'go'], 'limit': 3}).json()
+        self.assertTrue(body['status'])
+        self.assertEqual([row['id'] for row in body['data']], self.expected(skills=['Kubernetes', 'Go'])[:3])
+        self.assertIn('Kubernetes', body['data'][0]['skills'])
+        body = self.client.get('/api/history/search/', {'min_rank': 'high'}).json()
+        self.assertEqual(body, {'status': False, 'message': 'min_rank must be an integer', 'data': []})
+
+
+class JobCatalogueTests(TestCase):
+    def setUp(self):
+        catalogue_cache.invalidate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job = JobDesCription.objects.create(job_title='Backend', job_description='Python developer ' * 500)
+
+    def test_conditional_get_and_invalidation(self):
+        first = self.client.get('/api/jobs/')
+        self.assertEqual(first.json()['data'][0]['job_description'], self.job.job_description)
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            JobDesCription.objects.create(job_title='Frontend', job_description='React developer')
+        changed = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.json()['data']), 2)
+
+    def test_delete_moves_last_modified_forward(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            JobDesCription.objects.create(job_title='Frontend', job_description='React developer')
+        first = self.client.get('/api/jobs/')
+        # HTTP dates have one-second resolution, so delete a little later than the last save
+        later = timezone.now() + timedelta(seconds=5)
+        with mock.patch('resumechecker.catalogue.timezone.now', return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.job.delete()
+        changed = self.client.get('/api/jobs/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual([job['job_title'] for job in changed.json()['data']], ['Frontend'])
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_MODIFIED_SINCE=changed['Last-Modified']).status_code, 304)
+
+    def test_compact_gzip_and_detail(self):
+        full = self.client.get('/api/jobs/')
+        compact = self.client.get('/api/jobs/', {'view': 'compact'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compact['Content-Encoding'], 'gzip')
+        self.assertLess(len(compact.content), len(full.content) // 10)
+        self.assertEqual(json.loads(gzip.decompress(compact.content))['data'], [{'id': self.job.id, 'job_title': 'Backend'}])
+
+        detail = self.client.get(f'/api/jobs/{self.job.id}/')
+        self.assertEqual(detail.json()['data']['job_description'], self.job.job_description)
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/', HTTP_IF_NONE_MATCH=detail['ETag']).status_code, 304)
+
+
+class MetricsTests(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('latency_seconds', 'Latency.', ['stage'], buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, stage='llm')
+        self.assertEqual(histogram.render(7)[2:], [
+            'latency_seconds_bucket{stage="llm",le="0.1",pid="7"} 2',
+            'latency_seconds_bucket{stage="llm",le="1",pid="7"} 3',
+            'latency_seconds_bucket{stage="llm",le="+Inf",pid="7"} 4',
+            'latency_seconds_sum{stage="llm",pid="7"} 3.65',
+            'latency_seconds_count{stage="llm",pid="7"} 4',
+        ])
+        with self.assertRaises(ValueError):
+            histogram.observe(1, kind='llm')
+
+
+@override_settings(GROQ_API_KEY='fake')
+class LLMClientTests(SimpleTestCase):
+    def setUp(self):
+        reset_clients()
+        self.addCleanup(reset_clients)
+
+    def test_client_is_shared_within_a_process(self):
+        self.assertIs(get_client(), get_client())
+
+    def test_forked_process_builds_its_own_client(self):
+        parent = get_client()
+        with mock.patch('resumechecker.llm.os.getpid', return_value=os.getpid() + 1):
+            child = get_client()
+            self.assertIsNot(child, parent)
+            self.assertIs(get_client(), child)
+
+    def test_reset_closes_clients(self):
+        client = get_client()
+        with mock.patch.object(client, 'close') as close:
+            reset_clients()
+        close.assert_called_once()
+        self.assertIsNot(get_client(), client)
+
+    def test_async_client_per_event_loop(self):
+        async def pair():
+            return get_async_client(), get_async_client()
+
+        first, again = asyncio.run(pair())
+        self.assertIs(first, again)
+        second, _ = asyncio.run(pair())
+        self.assertIsNot(first, second)
+
+    def test_views_import_without_parsers_or_llm_client(self):
+        code = ("import sys, django; django.setup(); import core.urls; "
+                "print(sorted(m for m in ('pdfplumber', 'pdfminer', 'pypdfium2', 'groq') if m in sys.modules))")
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='core.settings')
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+
+class FakeLLMMixin:
+    llm_latency = 0
+
+    def setUp(self):
+        server, url = start_fake_llm(latency=self.llm_latency, jitter=0)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        override = override_settings(GROQ_BASE_URL=url, GROQ_API_KEY='fake', GROQ_MAX_RETRIES=2,
+                                     LLM_BACKOFF_BASE=0.01, LLM_CIRCUIT_FAILURES=1)
+        override.enable()
+        self.addCleanup(override.disable)
+        for reset in (reset_clients, reset_governor):
+            reset()
+            self.addCleanup(reset)
+        extraction_cache.memory.clear()
+
+
+class FakeLLMTests(FakeLLMMixin, TestCase):
+    def test_analysis_runs_offline_against_fake_llm(self):
+        pdf, facts = make_resume_pdf(11)
+        result = analyze_resume_with_llm(extract_text(pdf), JOB_POSTING)
+        self.assertGreater(result['rank'], 0)
+        self.assertEqual(result['total_experience'], facts['years'])
+        self.assertTrue({normalize_skill(s) for s in facts['skills']} <= {normalize_skill(s) for s in result['skills']})
+
+    def test_rate_limits_are_retried(self):
+        self.server.config.update(fail_first=2, retry_after=0)
+        result = analyze_resume_with_llm(extract_text(make_resume_pdf(12)[0]), JOB_POSTING)
+        self.assertEqual(self.server.config['rate_limited'], 2)
+        self.assertNotIn('degraded', result)
+        self.assertGreater(result['rank'], 0)
+
+    def test_degrades_to_local_scoring_when_llm_is_unavailable(self):
+        self.server.config.update(rate_limit_rate=1, retry_after=0)
+        pdf, facts = make_resume_pdf(13)
+        result = analyze_resume_with_llm(extract_text(pdf), JOB_POSTING)
+        self.assertTrue(result['degraded'])
+        self.assertGreater(result['rank'], 0)
+        self.assertEqual(set(result['skills']), set(find_skills(extract_text(pdf))))
+        requests = self.server.config['requests']
+        # The breaker is now open: the next analysis does not reach the API at all
+        self.assertTrue(analyze_resume_with_llm(extract_text(pdf), JOB_POSTING)['degraded'])
+        self.assertEqual(self.server.config['requests'], requests)
+
+    @override_settings(ANALYSIS_MODE='hybrid')
+    def test_hybrid_mode_asks_the_llm_only_for_suggestions(self):
+        pdf, facts = make_resume_pdf(14)
+        with mock.patch('resumechecker.analyzer.extract_with_llm') as extract:
+            result = analyze_resume(extract_text(pdf), JOB_POSTING)
+        extract.assert_not_called()
+        self.assertEqual(self.server.config['requests'], 2)  # job requirements and suggestions
+        self.assertEqual(result['suggestions'], ['Quantify the impact of each project.'])
+        self.assertEqual(result['rank'], analyze_resume(extract_text(pdf), JOB_POSTING, mode='local')['rank'])
+
+    @override_settings(ANALYSIS_MODE='hybrid')
+    def test_hybrid_mode_uses_the_llm_when_local_confidence_is_low(self):
+        result = analyze_resume("Python developer.", JOB_POSTING)
+        self.assertEqual(self.server.config['requests'], 2)  # job requirements and full extraction
+        self.assertEqual(result['skills'], ['Python'])
+
+    def test_extraction_without_suggestions_compacts_the_resume_once(self):
+        text = extract_text(make_resume_pdf(15)[0])
+        requirements = {'job_required_skills': ['Python'], 'job_required_experience': 2}
+        before = compaction_stats.stats().get('resume', {}).get('requests', 0)
+        data, suggestions = extract_resume_data_first(text, requirements)
+        self.assertIsNone(suggestions)
+        self.assertIn('Python', data['resume_skills'])
+        self.assertEqual(compaction_stats.stats()['resume']['requests'], before + 1)
+        self.assertEqual(self.server.config['requests'], 1)
+
+
+class SingleFlightTests(TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight, calls, barrier = SingleFlight('test'), [], threading.Barrier(5)
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'rank': 80}
+
+        def call():
+            barrier.wait()
+            return flight.do('key', work)
+
+        with ThreadPoolExecutor(5) as pool:
+            results = list(pool.map(lambda _: call(), range(5)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'rank': 80}] * 5)
+        self.assertEqual(len({id(r) for r in results}), 5)
+
+    def test_waits_for_result_of_lease_holder(self):
+        LLMCallLease.objects.create(key='k', owner='other', expires_at=timezone.now() + timedelta(seconds=30))
+        polls = iter([None, None, {'done': True}])
+        result = run_with_lease('test', 'k', lambda: next(polls), lambda: self.fail('computed twice'), 5, 0.01)
+        self.assertEqual(result, {'done': True})
+
+        LLMCallLease.objects.filter(key='k').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(run_with_lease('test', 'k', lambda: None, lambda: 'mine', 5, 0.01), 'mine')
+        self.assertFalse(LLMCallLease.objects.exists())
+
+
+class QueuedAnalysisTests(FakeLLMMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        override = override_settings(MEDIA_ROOT=self.temp_dir(), RESUME_STORAGE='sync')
+        override.enable()
+        self.addCleanup(override.disable)
+        self.job = catalogue_job(skills=('Python', 'Django'))
+
+    def temp_dir(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, True)
+        return path
+
+    def enqueue(self, seed):
+        upload = SimpleUploadedFile(f'{seed}.pdf', make_resume_pdf(seed)[0], content_type='application/pdf')
+        body = self.client.post('/api/resume/', {'resume': upload, 'job_description': self.job.id, 'async': 'true'}).json()
+        self.assertTrue(body['status'], body)
+        return body['data']['job_id']
+
+    def test_worker_does_not_need_the_uploaded_pdf(self):
+        job_id = self.enqueue(3)
+        # A worker on another machine: the stored PDF is not on its disk
+        with override_settings(MEDIA_ROOT=self.temp_dir()):
+            run_job(claim_next_job('worker'))
+        job = AnalysisJob.objects.get(id=job_id)
+        self.assertEqual(job.status, AnalysisJob.STATUS_DONE)
+        self.assertGreater(job.result['rank'], 0)
+
+    def status(self, job_id):
+        body = self.client.get(f'/api/analysis/{job_id}/').json()
+        self.assertTrue(body['status'])
+        return body['data']
+
+    def test_worker_runs_queued_analyses_to_completion(self):
+        job_ids = [self.enqueue(seed) for seed in (3, 4)]
+        self.assertEqual([self.status(job_id)['status'] for job_id in job_ids], ['pending', 'pending'])
+        out = io.StringIO()
+        call_command('run_analysis_worker', '--workers', '1', '--once', stdout=out)
+        self.assertIn('Started 1 analysis workers', out.getvalue())
+        for job_id in job_ids:
+            data = self.status(job_id)
+            self.assertEqual((data['status'], data['stage'], data['job_title']), ('done', 'done', 'Backend'))
+            self.assertGreater(data['result']['rank'], 0)
+            history = AnalysisHistory.objects.get(resume__jobs__id=job_id)
+            self.assertEqual((history.job_description_id, history.rank), (self.job.id, data['result']['rank']))
+        self.assertFalse(self.client.get('/api/analysis/0/').json()['status'])
+
+    def test_failed_analysis_is_reported(self):
+        job_id = self.enqueue(3)
+        with mock.patch('resumechecker.tasks.record_history', side_effect=RuntimeError('database is gone')):
+            call_command('run_analysis_worker', '--workers', '1', '--once', stdout=io.StringIO())
+        data = self.status(job_id)
+        self.assertEqual((data['status'], data['error']), ('failed', 'database is gone'))
+        self.assertIsNone(data['result'])
+        self.assertFalse(AnalysisHistory.objects.exists())
+
+
+class CoalescedAnalysisTests(TransactionTestCase):
+    def test_identical_analyses_make_one_set_of_llm_calls(self):
+        server, url = start_fake_llm(latency=0.3, jitter=0)
+        self.addCleanup(server.shutdown)
+        extraction_cache.memory.clear()
+        with override_settings(GROQ_BASE_URL=url, GROQ_API_KEY='fake', GROQ_MAX_RETRIES=0):
+            reset_clients()
+            self.addCleanup(reset_clients)
+            text = extract_text(make_resume_pdf(21)[0])
+            with ThreadPoolExecutor(4) as pool:
+                results = list(pool.map(lambda _: analyze_resume_with_llm(text, JOB_POSTING), range(4)))
+        self.assertEqual(server.config['requests'], 2)  # job requirements + resume extraction
+        self.assertTrue(all(result == results[0] and result['rank'] > 0 for result in results))
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after='3'):
+        self.response = mock.Mock(headers={'retry-after': retry_after})
+
+
+class LLMGovernorTests(SimpleTestCase):
+    def test_retries_with_backoff_honouring_retry_after(self):
+        sleeps = []
+        governor = LLMGovernor(max_retries=3, sleep=sleeps.append)
+        outcomes = iter([RateLimited(), RateLimited(), 'ok'])
+
+        def call():
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        self.assertEqual(governor.call(call), 'ok')
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(all(s >= 3 for s in sleeps))
+        self.assertEqual(governor.limiter.limit, 2.5)  # 4 halved once per burst, then +1/limit
+
+    def test_non_retryable_errors_are_raised_at_once(self):
+        governor = LLMGovernor(sleep=self.fail)
+        with self.assertRaises(KeyError):
+            governor.call(lambda: {}['missing'])
+        self.assertEqual(governor.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_circuit_opens_then_half_opens_for_one_probe(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        now[0] = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+    def test_open_circuit_fails_fast(self):
+        governor = LLMGovernor(max_retries=0, failure_threshold=1, sleep=lambda s: None)
+        with self.assertRaises(LLMUnavailable):
+            governor.call(lambda: (_ for _ in ()).throw(RateLimited('0')))
+        with self.assertRaises(LLMUnavailable):
+            governor.call(self.fail)
+
+    def test_token_bucket_reports_debt(self):
+        now = [0.0]
+        bucket = TokenBucket(600, clock=lambda: now[0])
+        self.assertEqual(bucket.reserve(500), 0)
+        self.assertAlmostEqual(bucket.reserve(200), 10)  # 100 tokens short at 10 tokens/s
+        now[0] = 10
+        self.assertEqual(bucket.reserve(0), 0)
+
+    def test_aimd_limit(self):
+        limiter = AIMDLimiter(8, minimum=1, decrease_interval=0)
+        self.assertTrue(limiter.acquire())
+        limiter.release(overloaded=True)
+        self.assertEqual(limiter.limit, 4)
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release()
+        self.assertGreater(limiter.limit, 4.9)
+
+    def test_stream_holds_its_slot_until_closed(self):
+        governor = LLMGovernor(initial_concurrency=1, max_concurrency=1, max_retries=1, max_wait=0,
+                               sleep=lambda s: None)
+        opened = iter([RateLimited('0'), [1, 2, 3]])
+
+        def open_stream():
+            outcome = next(opened)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return iter(outcome)
+
+        chunks = governor.stream(open_stream)
+        self.assertEqual(next(chunks), 1)  # after one retry of opening the stream
+        self.assertFalse(governor.limiter.acquire(timeout=0))
+        chunks.close()
+        self.assertTrue(governor.limiter.acquire(timeout=0))
+
+
+@override_settings(SKILL_MATCHING='semantic')
+class SemanticSkillMatchingTests(TestCase):
+    def test_near_equivalent_skills_match(self):
+        mask = matched_job_skills(['Redis', 'Python', 'Kubernetes', 'Java', 'SQL', 'React'],
+                                  ['Redis Cluster', 'Python 3.12', 'JavaScript', 'NoSQL', 'React Native'])
+        # Catalogue skills are distinct from each other however alike their names
+        self.assertEqual(mask.tolist(), [True, True, False, False, False, False])
+
+    def test_semantic_scores_credit_what_exact_matching_misses(self):
+        data = {'job_required_skills': ['Python', 'GraphQL', 'Terraform', 'Rust'],
+                'resume_skills': ['Python 3.12', 'GraphQL APIs', 'Terraform Cloud', 'Ruby']}
+        self.assertEqual(calculate_ats_score(data), 37 + 20)  # 3 of 4 skills, no experience required
+        with override_settings(SKILL_MATCHING='exact'):
+            self.assertEqual(calculate_ats_score(data), 0 + 20)
+
+    def test_job_skill_matrix_is_stored_and_reused(self):
+        job = JobDesCription.objects.create(job_title='Platform engineer', job_description=JOB_POSTING,
+                                            required_skills=['Python', 'Docker', 'python'])
+        job.requirements_hash = job.compute_content_hash()
+        job.save()
+        job.refresh_from_db()
+        vectors = job_skill_vectors(job)
+        self.assertEqual(vectors.shape[0], 2)
+        self.assertEqual(matched_job_skills(job.required_skills, ['Docker Swarm'], vectors).tolist(), [False, True])
+        self.assertNotIn('skill_vectors', self.client.get(f'/api/jobs/{job.id}/').json()['data'])
+
+        with mock.patch('resumechecker.embeddings._embed') as embed:
+            calculate_ats_score({**job.requirements, 'resume_skills': ['Python']}, vectors)
+        embed.assert_not_called()  # job rows are stored, the resume skill is in the LRU
+        job.required_skills = ['Python', 'Rust']
+        self.assertIsNone(job_skill_vectors(job))  # stale until the job is saved again
+        with override_settings(SKILL_MATCHING='exact'):
+            self.assertIsNone(job_skill_vectors(job))
+
+    def test_skill_vectors_are_cached(self):
+        skill_vector_cache.clear()
+        with mock.patch('resumechecker.embeddings._embed', wraps=embeddings._embed) as embed:
+            for _ in range(3):
+                matched_job_skills(['Redis'], ['Redis Cluster'])
+        self.assertEqual(embed.call_count, 2)
+
+
+class LocalEngineTests(SimpleTestCase):
+    def test_skills_match_the_keyword_scanner(self):
+        for seed in range(10):
+            text = extract_text(make_resume_pdf(seed)[0])
+            self.assertEqual(extract_skills(text), find_skills(text))
+        self.assertEqual(extract_skills("Shipped C++ and ASP.NET services; ci/cd with Node.JS"),
+                         find_skills("Shipped C++ and ASP.NET services; ci/cd with Node.JS"))
+
+    def test_experience_merges_overlapping_date_ranges(self):
+        text = ("EXPERIENCE\nLead, Acme  Mar 2020 - Present\nDeveloper, Globex  01/2019 - 06/2020\n"
+                "Intern, Initech 2017 to 2017\nEDUCATION\nBSc Physics 2013 - 2017")
+        # Jan 2019 to Jun 2024 plus all of 2017
+        self.assertEqual(experience_years(text, today=date(2024, 6, 1)), 6.5)
+        self.assertEqual(experience_years("Engineer with 7+ years of experience"), 7)
+
+    def test_experience_ignores_numbers_that_are_not_years(self):
+        text = "EXPERIENCE\nDeveloper, Acme  Jan 2021 - Dec 2022\n- Scaled API from 1000-5000 requests per second"
+        self.assertEqual(experience_years(text, today=date(2024, 6, 1)), 2.0)
+        self.assertEqual(experience_years("Roadmap 2030 - 2035", today=date(2024, 6, 1)), 0)
+
+    def test_highest_degree_is_reported_with_its_level(self):
+        self.assertEqual(detect_education("EDUCATION\nB.Tech in Computer Science\nM.Sc. Data Science, 2020"),
+                         "Master: M.Sc. Data Science, 2020")
+        self.assertEqual(detect_education("PhD in Physics, MIT"), "PhD in Physics, MIT")
+        self.assertEqual(detect_education("No degrees here"), "")
+
+    def test_degrees_outside_education_need_degree_context(self):
+        text = "EXPERIENCE\n- Mentored MBA students on product strategy\nEDUCATION\nB.Sc. Economics, 2015"
+        self.assertEqual(detect_education(text), "Bachelor: B.Sc. Economics, 2015")
+        self.assertEqual(detect_education("Mentored MBA students"), "")
+        self.assertEqual(detect_education("MBA, Wharton School"), "Master: MBA, Wharton School")
+
+    def test_extraction_has_the_llm_shape(self):
+        data = extract_resume_locally(extract_text(make_resume_pdf(3)[0]))
+        self.assertEqual(data['confidence'], 1)
+        self.assertEqual(set(data) - {'confidence'},
+                         {'resume_skills', 'resume_experience', 'resume_education', 'resume_projects'})
+        self.assertGreater(calculate_ats_score({**data, 'job_required_skills': data['resume_skills'][:2],
+                                                'job_required_experience': 2}), 50)
+
+    @override_settings(ANALYSIS_MODE='local')
+    def test_local_mode_makes_no_llm_calls(self):
+        text = extract_text(make_resume_pdf(4)[0])
+        with mock.patch('resumechecker.analyzer.get_client', side_effect=AssertionError("LLM called")):
+            result = analyze_resume(text, JOB_POSTING)
+        self.assertGreater(result['rank'], 0)
+        self.assertTrue(result['suggestions'])
+        self.assertNotIn('degraded', result)
+
+
+# Both analyze views side by side, for AsyncAnalyzeViewTests
+urlpatterns = [
+    path('api/resume/', analyze_resume_async, name='analyze-resume'),
+    path('api/resume/sync/', AnalyzeResmeAPI.as_view(), name='analyze-resume-sync'),
+]
+
+
+@override_settings(ROOT_URLCONF='resumechecker.tests', RESUME_STORAGE='none', ASYNC_PDF_POOL='thread',
+                   LLM_INITIAL_CONCURRENCY=16)
+class AsyncAnalyzeViewTests(FakeLLMMixin, TestCase):
+    llm_latency = 0.5
+
+    @staticmethod
+    def upload(seed):
+        return SimpleUploadedFile(f'cv{seed}.pdf', make_resume_pdf(seed)[0], content_type='application/pdf')
+
+    def test_matches_the_sync_view(self):
+        job = JobDesCription.objects.create(job_title='Backend engineer', job_description=JOB_POSTING)
+        sync = self.client.post('/api/resume/sync/', {'resume': self.upload(31), 'job_description': job.id}).json()
+        extraction_cache.memory.clear()
+        LLMExtraction.objects.all().delete()
+        ResumeText.objects.all().delete()
+        response = async_to_sync(self.async_client.post)(
+            '/api/resume/', {'resume': self.upload(31), 'job_description': job.id})
+        self.assertEqual(response.json(), sync)
+        self.assertIn('llm;dur=', response['Server-Timing'])
+        self.assertEqual(AnalysisHistory.objects.count(), 2)
+
+    async def test_one_worker_holds_many_analyses_in_flight(self):
+        async def post(seed):
+            response = await self.async_client.post(
+                '/api/resume/', {'resume': self.upload(seed), 'custom_job_description': JOB_POSTING})
+            return response.json()['data']
+
+        # Texts are cached up front so the timing measures waiting on the LLM, not parsing PDFs
+        for seed in range(40, 52):
+            pdf = make_resume_pdf(seed)[0]
+            await ResumeText.objects.acreate(content_hash=compute_content_hash(pdf), text=extract_text(pdf))
+        get_async_client()  # imports groq
+        # Long enough that handling all twelve uploads on one slow core fits within one completion
+        self.server.config['latency'] = 1.5
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(post(seed) for seed in range(40, 52)))
+        elapsed = time.perf_counter() - start
+        self.assertTrue(all(r['rank'] > 0 and 'degraded' not in r for r in results))
+        self.assertEqual(self.server.config['requests'], 13)
+        self.assertEqual(self.server.config['max_in_flight'], 12)
+        # One job extraction, then twelve resume extractions at once: 19.5s if run one at a time
+        self.assertLess(elapsed, 6)
+
+    async def test_async_single_flight_coalesces(self):
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {'value': [1]}
+
+        flight = AsyncSingleFlight('test')
+        results = await asyncio.gather(*(flight.do('k', slow) for _ in range(5)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': [1]}] * 5)
+        results[1]['value'].append(2)
+        self.assertEqual(results[0], {'value': [1]})
+
+
+def read_events(chunks):
+    """(event, data, seconds since the first chunk was requested) for each SSE event in a response."""
+    start = time.perf_counter()
+    events = []
+    for chunk in chunks:
+        for block in (chunk.decode() if isinstance(chunk, bytes) else chunk).strip().split('\n\n'):
+            name, data = (line.split(': ', 1)[1] for line in block.splitlines())
+            events.append((name, json.loads(data), time.perf_counter() - start))
+    return events
+
+
+@override_settings(RESUME_STORAGE='none')
+class StreamingAnalysisTests(FakeLLMMixin, TestCase):
+    llm_latency = 0.5
+
+    def setUp(self):
+        super().setUp()
+        self.server.config['token_latency'] = 0.01
+        self.job = JobDesCription.objects.create(job_title='Backend engineer', job_description=JOB_POSTING)
+
+    def post(self, seed):
+        pdf = SimpleUploadedFile(f'cv{seed}.pdf', make_resume_pdf(seed)[0], content_type='application/pdf')
+        return self.client.post('/api/resume/stream/', {'resume': pdf, 'job_description': self.job.id})
+
+    def test_stages_arrive_before_the_suggestions(self):
+        response = self.post(61)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = read_events(response.streaming_content)
+        names = [name for name, _, _ in events]
+        self.assertEqual(names[:4], ['extracted', 'skills', 'score', 'categories'])
+        self.assertEqual(names[-1], 'done')
+        self.assertTrue(all(name == 'suggestions' for name in names[4:-1]))
+        # The text is sent before any LLM call; suggestions come token by token after the score
+        self.assertLess(events[0][2], self.llm_latency)
+        self.assertGreater(len(names) - 5, 10)
+        self.assertGreater(events[-1][2] - events[2][2], self.llm_latency)
+
+        done = events[-1][1]
+        self.assertEqual(suggestion_lines(''.join(data['delta'] for name, data, _ in events if name == 'suggestions')),
+                         done['suggestions'])
+        self.assertEqual(done['rank'], events[2][1]['rank'])
+        self.assertEqual(AnalysisHistory.objects.get().rank, done['rank'])
+
+        # Scores match /api/resume/, whose extraction also carries the suggestions
+        extraction_cache.memory.clear()
+        LLMExtraction.objects.all().delete()
+        pdf = SimpleUploadedFile('cv61.pdf', make_resume_pdf(61)[0], content_type='application/pdf')
+        full = self.client.post('/api/resume/', {'resume': pdf, 'job_description': self.job.id}).json()['data']
+        self.assertEqual({k: full[k] for k in ('rank', 'skills', 'total_experience', 'project_categories')},
+                         {k: done[k] for k in ('rank', 'skills', 'total_experience', 'project_categories')})
+
+    def test_repeat_requests_are_served_from_cache(self):
+        first = read_events(self.post(62).streaming_content)[-1][1]
+        requests = self.server.config['requests']
+        self.assertEqual(requests, 3)  # job requirements, extraction, suggestions
+        second = read_events(self.post(62).streaming_content)[-1][1]
+        self.assertEqual(self.server.config['requests'], requests)
+        self.assertEqual(second, first)
+
+    def test_unavailable_llm_streams_the_local_result(self):
+        self.server.config.update(rate_limit_rate=1, retry_after=0)
+        events = read_events(self.post(63).streaming_content)
+        done = events[-1][1]
+        self.assertTrue(done['degraded'])
+        self.assertGreater(done['rank'], 0)
+        self.assertEqual([name for name, _, _ in events][:4], ['extracted', 'skills', 'score', 'categories'])
+
+    def test_unreadable_pdf_sends_an_error(self):
+        upload = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 not really', content_type='application/pdf')
+        response = self.client.post('/api/resume/stream/', {'resume': upload, 'job_description': self.job.id})
+        events = read_events(response.streaming_content)
+        self.assertEqual([name for name, _, _ in events], ['error', 'done'])
+        self.assertEqual(events[-1][1]['rank'], 0)
+
+
+
+@override_settings(RESUME_STORAGE='none')
+class BatchASGITests(TransactionTestCase):
+    @override_settings(BATCH_LLM_CONCURRENCY=1)
+    async def test_lines_are_not_buffered_under_asgi(self):
+        job = await sync_to_async(catalogue_job)()
+        files = []
+        for seed in (1, 2, 3):
+            pdf = make_resume_pdf(seed)[0]
+            await ResumeText.objects.acreate(content_hash=compute_content_hash(pdf), text=f'Candidate {seed}')
+            files.append(SimpleUploadedFile(f'{seed}.pdf', pdf, content_type='application/pdf'))
+        slow = lambda text, job: time.sleep(0.3) or fake_analysis(text, job)
+        with mock.patch('resumechecker.batch.analyze_resume', side_effect=slow):
+            response = await self.async_client.post('/api/resume/batch/', {'job_description': job.id, 'resumes': files})
+            start = time.perf_counter()
+            arrivals = [(json.loads(chunk)['type'], time.perf_counter() - start) async for chunk in response]
+        self.assertEqual([kind for kind, _ in arrivals], ['result', 'result', 'result', 'summary'])
+        self.assertLess(arrivals[0][1], 0.6)  # the first result, not the whole batch
+
+
+class StreamingASGITests(FakeLLMMixin, TransactionTestCase):
+    # The events are produced in their own thread, which cannot write through TestCase's transaction
+    llm_latency = 0.5
+
+    async def test_events_are_not_buffered_under_asgi(self):
+        job = await JobDesCription.objects.acreate(job_title='Backend engineer', job_description=JOB_POSTING)
+        pdf = SimpleUploadedFile('cv64.pdf', make_resume_pdf(64)[0], content_type='application/pdf')
+        response = await self.async_client.post('/api/resume/stream/', {'resume': pdf, 'job_description': job.id})
+        events = []
+        start = time.perf_counter()
+        async for chunk in response.streaming_content:
+            events.append((chunk.decode().split('\n', 1)[0], time.perf_counter() - start))
+        self.assertEqual(events[0][0], 'event: extracted')
+        self.assertEqual(events[-1][0], 'event: done')
+        self.assertLess(events[0][1], self.llm_latency)
@@ -1,24 +1,44 @@
-from django.shortcuts import render
-
 # Create your views here.
+from django.http import HttpResponse,JsonResponse,StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from.serializer import JobDescriptionSerializer,JobDesCription,ResumeSerializer,Resume,AnalysisHistorySerializer,AnalysisHistory
-from.analyzer import process_resume
+from.serializer import JobDescriptionSerializer,JobDesCription,ResumeSerializer,Resume,AnalysisHistorySerializer,AnalysisJobSerializer,AnalysisJob
+from.analyzer import process_resume,compute_content_hash,get_resume_text,match_resume_to_jobs
+from.async_analyzer import aget_resume_text,aprocess_resume
+from.streaming import analysis_events,event_stream_response,iterate_in_thread
+from.tasks import enqueue_analysis,record_history,store_resume_file
+from.batch import BatchUploadError,collect_uploads,rank_resumes
+from.cache import extraction_cache
+from.catalogue import RenderedJSON,catalogue_cache,conditional_json_response
+from.compaction import compaction_stats
+from.embeddings import skill_vector_cache
+from.metrics import CACHE_LOOKUPS,registry,timed
+from.history import filter_history,history_page,job_leaderboard,search_history,DEFAULT_PAGE_SIZE
 import logging
 
 logger = logging.getLogger(__name__)
 
 class JobDescriptionAPI(APIView):
     def get(self,request):
-        queryset=JobDesCription.objects.all()
-        serializer=JobDescriptionSerializer(queryset,many=True)
-        return Response(
-    {
-        'status':True,
-        'data':serializer.data
+        # ?view=compact lists only id and title; full text is fetched per job from /api/jobs/<id>/
+        view = 'compact' if request.query_params.get('view') == 'compact' else 'full'
+        return conditional_json_response(request, catalogue_cache.get(view))
 
-    })
+class JobDescriptionDetailAPI(APIView):
+    def get(self, request, job_id):
+        job = JobDesCription.objects.filter(id=job_id).first()
+        if job is None:
+            return Response({
+                'status': False,
+                'message': 'Job description not found',
+                'data': {}
+            })
+        serializer = JobDescriptionSerializer(job)
+        return conditional_json_response(request, RenderedJSON({'status': True, 'data': serializer.data}, job.updated_at))
 
 class AnalyzeResmeAPI(APIView):
     def post(self, request):
@@ -48,11 +68,15 @@ class AnalyzeResmeAPI(APIView):
                     }
                 )
 
-            serializer.save()
-            _data = serializer.data
-            resume_instance = Resume.objects.get(id=_data['id'])
-            resume_path = resume_instance.resume.path
-            
+            # The PDF is parsed straight from the upload buffer; repeat uploads of the same
+            # file reuse the existing resume row and its cached text
+            upload = request.FILES['resume']
+            with timed('upload'):
+                content_hash = compute_content_hash(upload)
+                resume_instance = Resume.objects.filter(content_hash=content_hash).first()
+                if resume_instance is None:
+                    resume_instance = Resume.objects.create(content_hash=content_hash)
+
             # Use custom job description if provided, otherwise get from database
             if custom_job_description:
                 job_text = custom_job_description
@@ -60,21 +84,35 @@ class AnalyzeResmeAPI(APIView):
             else:
                 job_desc_obj = JobDesCription.objects.get(id=job_description_id)
                 job_text = job_desc_obj.job_description
+
+            # Async mode: hand the analysis to `run_analysis_worker` and return immediately
+            if str(data.get('async', '')).lower() in ('1', 'true', 'yes'):
+                # The worker may run on another machine, so it reads the resume text from the
+                # database rather than the PDF from this one's disk
+                with timed('extract'):
+                    get_resume_text(upload, content_hash)
+                with timed('storage'):
+                    store_resume_file(resume_instance, upload)
+                job = enqueue_analysis(resume_instance, job_desc_obj, custom_job_description)
+                return Response({
+                    'status': True,
+                    'message': 'Resume analysis queued',
+                    'data': {
+                        'job_id': job.id,
+                        'status': job.status,
+                        'status_url': f'/api/analysis/{job.id}/'
+                    }
+                })
             
-            # Analyze resume
-            analysis_data = process_resume(resume_path, job_text)
-            
+            # Analyze resume (catalogue jobs reuse their stored requirements)
+            analysis_data = process_resume(upload, job_desc_obj or job_text, content_hash)
+            with timed('storage'):
+                store_resume_file(resume_instance, upload)
+
             # Save to history (only if using database job description)
             if job_desc_obj:
-                AnalysisHistory.objects.create(
-                    resume=resume_instance,
-                    job_description=job_desc_obj,
-                    rank=analysis_data.get('rank', 0),
-                    skills=analysis_data.get('skills', []),
-                    total_experience=analysis_data.get('total_experience', 0),
-                    project_categories=analysis_data.get('project_categories', []),
-                    suggestions=analysis_data.get('suggestions', [])
-                )
+                with timed('db_write'):
+                    record_history(resume_instance, job_desc_obj, analysis_data)
 
             return Response({
                 'status': True,
@@ -90,15 +128,183 @@ class AnalyzeResmeAPI(APIView):
                 'data': {}
             })
 
+@csrf_exempt
+@require_POST
+async def analyze_resume_async(request):
+    """AnalyzeResmeAPI.post as a native async view, served at /api/resume/ when ASYNC_ANALYZE_VIEW is on.
+
+    Run under an ASGI server, the worker's event loop keeps serving other requests while this one
+    waits on the LLM, the PDF pool or the database.
+    """
+    try:
+        data = request.POST
+        job_description_id = data.get('job_description')
+        custom_job_description = data.get('custom_job_description')
+        upload = request.FILES.get('resume')
+
+        if (not job_description_id and not custom_job_description) or upload is None:
+            return JsonResponse({
+                'status': False,
+                'messages': 'Job description (or custom) and resume are required',
+                'data': {}
+            })
+
+        serializer = ResumeSerializer(data={'resume': upload})
+        if not serializer.is_valid():
+            return JsonResponse({
+                'status': False,
+                'messages': 'Validation errors',
+                'data': serializer.errors
+            })
+
+        with timed('upload'):
+            pdf_bytes = b''.join(upload.chunks())
+            content_hash = compute_content_hash(pdf_bytes)
+            resume_instance = await Resume.objects.filter(content_hash=content_hash).afirst()
+            if resume_instance is None:
+                resume_instance = await Resume.objects.acreate(content_hash=content_hash)
+
+        if custom_job_description:
+            job_text = custom_job_description
+            job_desc_obj = None
+        else:
+            job_desc_obj = await JobDesCription.objects.aget(id=job_description_id)
+            job_text = job_desc_obj.job_description
+
+        if str(data.get('async', '')).lower() in ('1', 'true', 'yes'):
+            with timed('extract'):
+                await aget_resume_text(pdf_bytes, content_hash)
+            with timed('storage'):
+                await sync_to_async(store_resume_file)(resume_instance, upload)
+            job = await sync_to_async(enqueue_analysis)(resume_instance, job_desc_obj, custom_job_description)
+            return JsonResponse({
+                'status': True,
+                'message': 'Resume analysis queued',
+                'data': {
+                    'job_id': job.id,
+                    'status': job.status,
+                    'status_url': f'/api/analysis/{job.id}/'
+                }
+            })
+
+        analysis_data = await aprocess_resume(pdf_bytes, job_desc_obj or job_text, content_hash)
+        with timed('storage'):
+            await sync_to_async(store_resume_file)(resume_instance, upload)
+
+        if job_desc_obj:
+            with timed('db_write'):
+                await sync_to_async(record_history)(resume_instance, job_desc_obj, analysis_data)
+
+        return JsonResponse({
+            'status': True,
+            'message': 'Resume analyzed successfully',
+            'data': analysis_data
+        })
+
+    except Exception as e:
+        logger.error(f"Error analyzing resume: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'status': False,
+            'message': f'Error: {str(e)}',
+            'data': {}
+        })
+
+class AnalyzeResumeStreamAPI(APIView):
+    """AnalyzeResmeAPI.post as Server-Sent Events: each stage is sent as soon as it is ready (streaming.py).
+
+    Invalid requests get the usual JSON error response instead of a stream.
+    """
+    def post(self, request):
+        data = request.data
+        job_description_id = data.get('job_description')
+        custom_job_description = data.get('custom_job_description')
+
+        if (not job_description_id and not custom_job_description) or not data.get('resume'):
+            return Response({
+                'status': False,
+                'messages': 'Job description (or custom) and resume are required',
+                'data': {}
+            })
+
+        serializer = ResumeSerializer(data=data)
+        if not serializer.is_valid():
+            return Response({
+                'status': False,
+                'messages': 'Validation errors',
+                'data': serializer.errors
+            })
+
+        job_desc_obj = None
+        if not custom_job_description:
+            job_desc_obj = JobDesCription.objects.filter(id=job_description_id).first()
+            if job_desc_obj is None:
+                return Response({
+                    'status': False,
+                    'message': 'Job description not found',
+                    'data': {}
+                })
+
+        upload = request.FILES['resume']
+        with timed('upload'):
+            content_hash = compute_content_hash(upload)
+            resume_instance = Resume.objects.filter(content_hash=content_hash).first()
+            if resume_instance is None:
+                resume_instance = Resume.objects.create(content_hash=content_hash)
+
+        def events():
+            for event, payload in analysis_events(upload, job_desc_obj or custom_job_description, content_hash):
+                if event == 'done':
+                    store_resume_file(resume_instance, upload)
+                    if job_desc_obj:
+                        record_history(resume_instance, job_desc_obj, payload)
+                yield event, payload
+
+        return event_stream_response(events(), asgi=isinstance(request._request, ASGIRequest))
+
 class AnalysisHistoryAPI(APIView):
     def get(self, request):
         try:
-            # Get the last 10 analyses
-            analyses = AnalysisHistory.objects.all()[:10]
+            params = request.query_params
+            limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+            analyses, next_cursor = history_page(filter_history(params), params.get('cursor'), limit)
+            serializer = AnalysisHistorySerializer(analyses, many=True)
+            return Response({
+                'status': True,
+                'data': serializer.data,
+                'next_cursor': next_cursor
+            })
+        except ValueError as e:
+            return Response({
+                'status': False,
+                'message': str(e),
+                'data': []
+            })
+        except Exception as e:
+            return Response({
+                'status': False,
+                'message': f'Error: {str(e)}',
+                'data': []
+            })
+
+
+class TalentSearchAPI(APIView):
+    """History rows with all of the given `skills` and `categories`, best rank first (history.search_history)."""
+    def get(self, request):
+        try:
+            params = request.query_params
+            limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+            analyses, next_cursor = search_history(params, params.get('cursor'), limit)
             serializer = AnalysisHistorySerializer(analyses, many=True)
             return Response({
                 'status': True,
-                'data': serializer.data
+                'data': serializer.data,
+                'next_cursor': next_cursor
+            })
+        except ValueError as e:
+            return Response({
+                'status': False,
+                'message': str(e),
+                'data': []
             })
         except Exception as e:
             return Response({
@@ -107,3 +313,123 @@ class AnalysisHistoryAPI(APIView):
                 'data': []
             })
 
+
+class JobLeaderboardAPI(APIView):
+    def get(self, request, job_id):
+        job = JobDesCription.objects.filter(id=job_id).first()
+        if job is None:
+            return Response({
+                'status': False,
+                'message': 'Job description not found',
+                'data': []
+            })
+        try:
+            k = int(request.query_params.get('k', 10))
+        except ValueError:
+            return Response({
+                'status': False,
+                'message': 'k must be an integer',
+                'data': []
+            })
+        entries = job_leaderboard(job, k)
+        for entry in entries:
+            entry.job_description = job
+        serializer = AnalysisHistorySerializer(entries, many=True)
+        return Response({
+            'status': True,
+            'data': serializer.data
+        })
+
+class BatchRankAPI(APIView):
+    def post(self, request):
+        job_description_id = request.data.get('job_description')
+        job_desc_obj = JobDesCription.objects.filter(id=job_description_id).first() if job_description_id else None
+        if job_desc_obj is None:
+            return Response({
+                'status': False,
+                'message': 'A valid job description is required',
+                'data': {}
+            })
+        try:
+            uploads = collect_uploads(request.FILES.getlist('resumes'), request.FILES.get('archive'))
+        except BatchUploadError as e:
+            return Response({
+                'status': False,
+                'message': str(e),
+                'data': {}
+            })
+        # One JSON object per line, flushed as each resume finishes (under ASGI a sync iterator
+        # would be drained completely before the first line is sent)
+        lines = rank_resumes(uploads, job_desc_obj)
+        if isinstance(request._request, ASGIRequest):
+            lines = iterate_in_thread(lines)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+class MatchJobsAPI(APIView):
+    def post(self, request):
+        try:
+            upload = request.FILES.get('resume')
+            if not upload:
+                return Response({
+                    'status': False,
+                    'message': 'Resume is required',
+                    'data': {}
+                })
+            top_k = int(request.data.get('top_k', 5))
+            resume_text = get_resume_text(upload, compute_content_hash(upload))
+            return Response({
+                'status': True,
+                'message': 'Resume matched successfully',
+                'data': match_resume_to_jobs(resume_text, top_k)
+            })
+        except Exception as e:
+            logger.error(f"Error matching resume: {str(e)}", exc_info=True)
+            return Response({
+                'status': False,
+                'message': f'Error: {str(e)}',
+                'data': {}
+            })
+
+class AnalysisJobAPI(APIView):
+    def get(self, request, job_id):
+        job = AnalysisJob.objects.select_related('job_description').filter(id=job_id).first()
+        if job is None:
+            return Response({
+                'status': False,
+                'message': 'Analysis job not found',
+                'data': {}
+            })
+        serializer = AnalysisJobSerializer(job)
+        return Response({
+            'status': True,
+            'data': serializer.data
+        })
+
+class CacheStatsAPI(APIView):
+    def get(self, request):
+        return Response({
+            'status': True,
+            'data': {
+                'llm_extraction': extraction_cache.stats(),
+                'prompt_compaction': compaction_stats.stats(),
+                'job_catalogue': catalogue_cache.stats(),
+                'skill_vectors': skill_vector_cache.stats()
+            }
+        })
+
+
+def _collect_cache_metrics():
+    extraction = extraction_cache.stats()
+    CACHE_LOOKUPS.set_total(extraction['memory']['hits'], cache='llm_memory', result='hit')
+    CACHE_LOOKUPS.set_total(extraction['memory']['misses'], cache='llm_memory', result='miss')
+    CACHE_LOOKUPS.set_total(extraction['db_hits'], cache='llm_db', result='hit')
+    CACHE_LOOKUPS.set_total(extraction['db_misses'], cache='llm_db', result='miss')
+    catalogue = catalogue_cache.stats()
+    CACHE_LOOKUPS.set_total(catalogue['hits'], cache='job_catalogue', result='hit')
+    CACHE_LOOKUPS.set_total(catalogue['misses'], cache='job_catalogue', result='miss')
+
+registry.add_collector(_collect_cache_metrics)
+
+def metrics(request):
+    """Prometheus scrape endpoint; values are for the worker process that answers."""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -11,7 +11,8 @@ export const apiService = {
   // Get all job descriptions
   getJobs: async () => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/jobs/`);
+      // Only id and title are needed for the picker
+      const response = await axios.get(`${API_BASE_URL}/jobs/?view=compact`);
       // Backend returns {status: true, data: [...]}
       return response.data.data || [];
     } catch (error) {